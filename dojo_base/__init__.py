@@ -1,2 +1,2 @@
-from . import models, hooks
+from . import models, hooks, tools
 from .hooks import post_init_hook
@@ -0,0 +1 @@
+from . import ttl_cache
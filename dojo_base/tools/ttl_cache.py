@@ -0,0 +1,51 @@
+"""Per-process LRU cache with time-to-live entries.
+
+Shared by the addons that memoize hot-path results in worker memory
+(dojo_bridge auth lookups, dojo_instructor_dashboard payloads).  Nothing is
+shared between workers; callers decide how stale an entry may get via *ttl*.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MAX_ENTRIES = 5000
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire at a monotonic deadline."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self._data: "OrderedDict[object, tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            deadline, value = entry
+            if deadline <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float, max_entries: int | None = None) -> None:
+        """Store *value* for *ttl* seconds.  *max_entries*, when given, replaces
+        the LRU bound (for caches sized by a runtime setting)."""
+        if ttl <= 0:
+            return
+        with self._lock:
+            if max_entries is not None:
+                self._max_entries = max_entries
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def discard_where(self, predicate) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
@@ -22,7 +22,9 @@ The JWT issued by NestJS (after Firebase verification) is the sole gate.
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/bridge_identity_views.xml",
+        "views/bridge_webhook_event_views.xml",
     ],
     "installable": True,
     "auto_install": False,
@@ -8,11 +8,19 @@ Flow per request
 1.  Extract `Authorization: Bearer <token>` from headers.
 2.  Decode the JWT *without* verification just to read the `tenant_db` claim.
 3.  Open `odoo.registry(tenant_db)` to get the tenant-specific DB cursor.
-4.  Load `x_bridge.jwt_secret` from `ir.config_parameter` inside that DB.
-5.  Fully verify the JWT (HS256, exp, iss, aud, required claims).
+4.  Load `x_bridge.jwt_secret` from `ir.config_parameter` inside that DB
+    (cached per process for a minute, see bridge_cache.py).
+5.  Fully verify the JWT (HS256, exp, iss, aud, required claims); a verified
+    token is cached by its SHA-256 until `exp`.
 6.  Assert `firebase_uid` + `company_id` claims are present.
-7.  Look up `x.bridge.identity`; reject if inactive or missing.
-8.  Stamp `last_seen`.
+7.  Look up `x.bridge.identity`; reject if inactive or missing.  The
+    identity → member mapping is cached and dropped on identity writes.
+8.  Buffer a `last_seen` stamp (written behind in bulk, at most once per
+    identity per minute).  A per-worker timer flushes the buffer a minute
+    after the first pending stamp, a later request flushes it once a minute,
+    and the worker flushes it on exit.  Stamps still buffered in a worker
+    that is killed (SIGKILL, hard time/memory limit) are lost: at most the
+    last minute of activity seen by that worker.
 9.  Inject keyword args into the decorated function:
       b_env        – api.Environment(cr, SUPERUSER_ID, {}) in the tenant DB
       b_identity   – x.bridge.identity record
@@ -29,7 +37,10 @@ Conventions for decorated controllers
   decorator commit after the function returns — it will commit once on exit).
 - Never use `request.env` inside a bridge controller; always use `b_env`.
 """
+import atexit
 import functools
+import gzip
+import hashlib
 import json
 import logging
 
@@ -38,6 +49,8 @@ from odoo import api, fields, SUPERUSER_ID
 from odoo.modules.registry import Registry
 from odoo.http import request, Response
 
+from ..models.bridge_cache import BridgeCache
+
 try:
     import jwt as _jwt  # PyJWT
     _HAS_JWT = True
@@ -45,23 +58,144 @@ except ImportError:
     _jwt = None
     _HAS_JWT = False
 
+try:
+    import orjson as _orjson  # optional, several times faster than json.dumps
+except ImportError:
+    _orjson = None
+
+try:
+    import brotli as _brotli  # optional, enables Content-Encoding: br
+except ImportError:
+    _brotli = None
+
 _logger = logging.getLogger(__name__)
 
+# Bodies smaller than this are sent uncompressed; the framing costs more than
+# it saves.
+_COMPRESS_MIN_BYTES = 1024
+_GZIP_LEVEL = 5
+_BROTLI_QUALITY = 4
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
 
-def _json_response(data: dict, status: int = 200) -> Response:
-    """Build a plain JSON HTTP response."""
-    body = json.dumps(data, default=str)
-    return Response(
-        body,
-        status=status,
-        headers=[
-            ("Content-Type", "application/json"),
-            ("X-Bridge-Version", "1"),
-        ],
+def _dumps(data) -> bytes:
+    """Serialise *data* to compact JSON bytes (orjson when installed)."""
+    if _orjson is not None:
+        try:
+            # Pass datetimes through to default=str so both paths emit the
+            # same "YYYY-MM-DD HH:MM:SS" form as the stdlib fallback.
+            return _orjson.dumps(
+                data,
+                default=str,
+                option=_orjson.OPT_NON_STR_KEYS | _orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits — let the stdlib handle them
+    return json.dumps(data, default=str, separators=(",", ":")).encode()
+
+
+def _negotiated_encoding() -> str | None:
+    """Pick "br" or "gzip" from the request's Accept-Encoding, if any."""
+    try:
+        accepted = request.httprequest.accept_encodings
+    except RuntimeError:  # no request bound (e.g. called from a shell)
+        return None
+    if _brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "br":
+        return _brotli.compress(body, quality=_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=_GZIP_LEVEL)
+    return body
+
+
+def _tagged(etag: str, encoding: str | None) -> str:
+    """Strong ETags differ per content-coding: "<tag>" / "<tag>-gzip" / "<tag>-br"."""
+    return f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+
+
+def _json_response(data: dict, status: int = 200, etag: str | None = None) -> Response:
+    """
+    Build a JSON HTTP response, compressed with br/gzip when the client
+    accepts it and the body is large enough, and carrying a strong ETag when
+    *etag* (see bridge_etag) is given.
+    """
+    body = _dumps(data)
+    encoding = _negotiated_encoding()
+    headers = [
+        ("Content-Type", "application/json"),
+        ("X-Bridge-Version", "1"),
+        ("Vary", "Accept-Encoding"),
+    ]
+    if encoding and len(body) >= _COMPRESS_MIN_BYTES:
+        body = _compress(body, encoding)
+        headers.append(("Content-Encoding", encoding))
+    else:
+        encoding = None
+    if etag:
+        headers += [("ETag", _tagged(etag, encoding)), ("Cache-Control", "private, no-cache")]
+    return Response(body, status=status, headers=headers)
+
+
+def _verify_jwt(dbname: str, raw_token: str, settings: tuple) -> dict:
+    """
+    Fully verify *raw_token* (HS256, exp, iss, aud, required claims) against
+    the DB's bridge *settings* and return its payload.
+
+    A successful verification is cached per process until the token's exp,
+    so repeat calls with the same token skip the HMAC and claim checks.
+    Raises the PyJWT exceptions on failure.
+    """
+    payload = BridgeCache.verified_claims(dbname, raw_token, settings)
+    if payload is not None:
+        return payload
+    jwt_secret, jwt_issuer, jwt_audience = settings
+    payload = _jwt.decode(
+        raw_token,
+        jwt_secret,
+        algorithms=["HS256"],
+        issuer=jwt_issuer,
+        audience=jwt_audience,
+        options={
+            "require": ["exp", "iat", "iss", "aud"],
+        },
+        leeway=30,  # 30-second clock-skew tolerance
     )
+    BridgeCache.store_claims(dbname, raw_token, settings, payload)
+    return payload
+
+
+def _flush_last_seen(env) -> None:
+    """Write the buffered last_seen stamps in their own small transaction.
+    Best effort: a failure only loses those stamps."""
+    try:
+        env["x.bridge.identity"]._flush_last_seen()
+        env.cr.commit()
+    except Exception:
+        env.cr.rollback()
+        _logger.warning("Bridge: could not flush last_seen stamps.", exc_info=True)
+
+
+def _flush_last_seen_at_exit() -> None:
+    """Drain every DB's buffered last_seen stamps as the worker shuts down."""
+    for dbname in BridgeCache.seen_dbnames():
+        try:
+            with Registry(dbname).cursor() as cr:
+                _flush_last_seen(api.Environment(cr, SUPERUSER_ID, {}))
+        except Exception:
+            _logger.warning("Bridge: could not flush last_seen stamps of %s at exit.",
+                            dbname, exc_info=True)
+
+
+atexit.register(_flush_last_seen_at_exit)
 
 
 def _unauthorized(reason: str) -> Response:
@@ -80,7 +214,7 @@ def _service_error(reason: str) -> Response:
 
 
 _CORS_METHODS = "GET, POST, DELETE, OPTIONS"
-_CORS_HEADERS_ALLOWED = "Authorization, Content-Type, X-Bridge-Signature, X-Requested-With"
+_CORS_HEADERS_ALLOWED = "Authorization, Content-Type, X-Bridge-Signature, X-Requested-With, Idempotency-Key, If-None-Match"
 _CORS_MAX_AGE = "86400"
 
 
@@ -178,32 +312,18 @@ def require_bridge_auth(fn):
         try:
             with registry.cursor() as cr:
                 env = api.Environment(cr, SUPERUSER_ID, {})
-                params = env["ir.config_parameter"].sudo()
 
-                # 4. Load per-DB JWT secret
-                from ..models.bridge_config import BridgeConfig
-                jwt_secret = BridgeConfig.jwt_secret(params)
-                if not jwt_secret:
+                # 4. Load per-DB JWT secret (process cache, see bridge_cache)
+                settings = BridgeCache.settings(env)
+                if not settings[0]:
                     return _service_error(
                         "Bridge is not configured: missing x_bridge.jwt_secret. "
                         "Set it in Settings → Technical → System Parameters."
                     )
 
-                # 5. Full JWT verification
-                jwt_issuer = BridgeConfig.jwt_issuer(params)
-                jwt_audience = BridgeConfig.jwt_audience(params)
+                # 5. Full JWT verification (skipped while a cached result is valid)
                 try:
-                    payload = _jwt.decode(
-                        raw_token,
-                        jwt_secret,
-                        algorithms=["HS256"],
-                        issuer=jwt_issuer,
-                        audience=jwt_audience,
-                        options={
-                            "require": ["exp", "iat", "iss", "aud"],
-                        },
-                        leeway=30,  # 30-second clock-skew tolerance
-                    )
+                    payload = _verify_jwt(cr.dbname, raw_token, settings)
                 except _jwt.ExpiredSignatureError:
                     return _unauthorized("JWT has expired.")
                 except _jwt.InvalidIssuerError:
@@ -229,35 +349,47 @@ def require_bridge_auth(fn):
                 except (TypeError, ValueError):
                     return _unauthorized("JWT 'company_id' must be an integer.")
 
-                # Verify the company actually exists in this DB
-                company = env["res.company"].browse(company_id).exists()
-                if not company:
-                    return _forbidden(
-                        f"Company {company_id} not found in tenant '{tenant_db}'."
+                # 7. Resolve identity (process cache, dropped on identity writes)
+                cached = BridgeCache.identity(cr.dbname, firebase_uid, company_id)
+                if cached:
+                    identity_id, member_id = cached
+                    identity = env["x.bridge.identity"].browse(identity_id)
+                else:
+                    # Verify the company actually exists in this DB
+                    company = env["res.company"].browse(company_id).exists()
+                    if not company:
+                        return _forbidden(
+                            f"Company {company_id} not found in tenant '{tenant_db}'."
+                        )
+
+                    identity = env["x.bridge.identity"].search(
+                        [
+                            ("firebase_uid", "=", firebase_uid),
+                            ("company_id", "=", company_id),
+                            ("is_active", "=", True),
+                        ],
+                        limit=1,
                     )
-
-                # 7. Resolve identity
-                identity = env["x.bridge.identity"].search(
-                    [
-                        ("firebase_uid", "=", firebase_uid),
-                        ("company_id", "=", company_id),
-                        ("is_active", "=", True),
-                    ],
-                    limit=1,
-                )
-                if not identity:
-                    return _unauthorized(
-                        "No active bridge identity found for this user. "
-                        "Call /bridge/v1/auth/resolve first."
+                    if not identity:
+                        return _unauthorized(
+                            "No active bridge identity found for this user. "
+                            "Call /bridge/v1/auth/resolve first."
+                        )
+                    member_id = identity.member_id.id
+                    BridgeCache.store_identity(
+                        cr.dbname, firebase_uid, company_id, identity.id, member_id
                     )
 
-                # 8. Stamp last_seen (lightweight write)
-                identity.write({"last_seen": fields.Datetime.now()})
+                # 8. Buffer last_seen; flushed in bulk after the response commits
+                flush_seen = BridgeCache.note_seen(
+                    cr.dbname, identity.id, fields.Datetime.now()
+                )
+                env["x.bridge.identity"]._schedule_flush_last_seen()
 
                 # 9. Inject context kwargs
                 kwargs["b_env"] = env
                 kwargs["b_identity"] = identity
-                kwargs["b_member"] = identity.member_id
+                kwargs["b_member"] = env["dojo.member"].browse(member_id)
                 kwargs["b_company_id"] = company_id
                 kwargs["b_payload"] = payload
 
@@ -266,10 +398,12 @@ def require_bridge_auth(fn):
                     result = fn(controller_self, *args, **kwargs)
                     # 11. Commit on success
                     cr.commit()
-                    return result
                 except Exception:
                     cr.rollback()
                     raise
+                if flush_seen:
+                    _flush_last_seen(env)
+                return result
 
         except Response:
             # A Response exception (unusual but defensively handled)
@@ -289,13 +423,53 @@ def require_bridge_auth(fn):
 # Shared utilities used by all controllers
 # ──────────────────────────────────────────────────────────────────────────────
 
-def bridge_response(data: dict | list, status: int = 200) -> Response:
+def bridge_response(data: dict | list, status: int = 200, etag: str | None = None) -> Response:
     """Wrap a data payload in the standard bridge response envelope."""
     envelope = {
         "ok": status < 400,
         "data": data,
     }
-    return _json_response(envelope, status=status)
+    return _json_response(envelope, status=status, etag=etag)
+
+
+def bridge_etag(*parts) -> str:
+    """
+    Opaque validator for a response built from *parts* — typically the
+    request parameters plus the (count, latest write_date) versions returned
+    by x.bridge.service.*_version().  Equal parts give an equal tag.
+    """
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def bridge_not_modified(etag: str) -> Response | None:
+    """
+    Return a bodyless 304 when the request's If-None-Match already holds
+    *etag* (in any content-coding), else None.  Call it before building the
+    payload so an unchanged resource costs only its version query.
+    """
+    header = request.httprequest.headers.get("If-None-Match", "")
+    if not header:
+        return None
+    candidates = [
+        tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")
+    ]
+    matched = next(
+        (tag for tag in candidates if tag == etag or tag.startswith(f"{etag}-")),
+        None,
+    )
+    if matched is None:
+        if "*" not in candidates:
+            return None
+        matched = etag
+    return Response(
+        status=304,
+        headers=[
+            ("ETag", f'"{matched}"'),
+            ("Cache-Control", "private, no-cache"),
+            ("Vary", "Accept-Encoding"),
+            ("X-Bridge-Version", "1"),
+        ],
+    )
 
 
 def bridge_error(message: str, status: int = 400, **extra) -> Response:
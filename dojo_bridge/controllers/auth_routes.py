@@ -25,7 +25,10 @@ from odoo.modules.registry import Registry
 from odoo import http
 from odoo.http import request, Response
 
-from .auth_middleware import bridge_response, bridge_error, _unauthorized, _service_error
+from ..models.bridge_cache import BridgeCache
+from .auth_middleware import (
+    bridge_response, bridge_error, _unauthorized, _service_error, _verify_jwt,
+)
 
 try:
     import jwt as _jwt
@@ -93,26 +96,14 @@ class BridgeAuthController(http.Controller):
         try:
             with registry.cursor() as cr:
                 env = api.Environment(cr, SUPERUSER_ID, {})
-                params = env["ir.config_parameter"].sudo()
 
-                from ..models.bridge_config import BridgeConfig
-                jwt_secret = BridgeConfig.jwt_secret(params)
-                if not jwt_secret:
+                settings = BridgeCache.settings(env)
+                if not settings[0]:
                     return _service_error("Bridge not configured: missing x_bridge.jwt_secret.")
 
                 # ── Full JWT verification ──────────────────────────────────
-                jwt_issuer = BridgeConfig.jwt_issuer(params)
-                jwt_audience = BridgeConfig.jwt_audience(params)
                 try:
-                    payload = _jwt.decode(
-                        raw_token,
-                        jwt_secret,
-                        algorithms=["HS256"],
-                        issuer=jwt_issuer,
-                        audience=jwt_audience,
-                        options={"require": ["exp", "iat", "iss", "aud"]},
-                        leeway=30,
-                    )
+                    payload = _verify_jwt(cr.dbname, raw_token, settings)
                 except _jwt.ExpiredSignatureError:
                     return _unauthorized("JWT has expired.")
                 except _jwt.InvalidTokenError as exc:
@@ -153,7 +144,7 @@ class BridgeAuthController(http.Controller):
             resp = bridge_response(result)
             if origin:
                 resp.headers["Access-Control-Allow-Origin"] = origin
-                resp.headers["Vary"] = "Origin"
+                resp.vary.add("Origin")
             return resp
 
         except Response:
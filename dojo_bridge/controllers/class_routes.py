@@ -5,7 +5,7 @@ Class/session endpoints — all protected by @require_bridge_auth.
 
 Routes
 ──────
-GET    /bridge/v1/classes/sessions                       → schedule
+GET    /bridge/v1/classes/sessions                       → schedule (paginated)
 GET    /bridge/v1/classes/sessions/<id>                  → single session detail
 POST   /bridge/v1/classes/sessions/<id>/enroll           → enroll
 DELETE /bridge/v1/classes/sessions/<id>/enroll           → cancel enrollment
@@ -19,7 +19,13 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import UserError
 
-from .auth_middleware import require_bridge_auth, bridge_response, bridge_error
+from .auth_middleware import (
+    bridge_error,
+    bridge_etag,
+    bridge_not_modified,
+    bridge_response,
+    require_bridge_auth,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -42,9 +48,14 @@ class BridgeClassController(http.Controller):
         Return the class schedule for the tenant company.
 
         Query parameters:
-          from        – ISO datetime string  (start of window)
-          to          – ISO datetime string  (end of window)
-          program_id  – int, filter by program
+          from           – ISO datetime string  (start of window)
+          to             – ISO datetime string  (end of window)
+          program_id     – int, filter by program
+          cursor         – next_cursor of the previous page
+          limit          – page size (default 100, max 500)
+          updated_since  – ISO datetime; switch to delta mode (sessions
+                           changed since then, including seat count changes)
+          fields         – comma-separated projection, e.g. "state,seats_taken"
         """
         origin = request.httprequest.headers.get("Origin", "")
         params = request.httprequest.args
@@ -52,26 +63,50 @@ class BridgeClassController(http.Controller):
         from_dt = _parse_dt(params.get("from"))
         to_dt = _parse_dt(params.get("to"))
         program_id = _parse_int(params.get("program_id"))
+        updated_since = _parse_dt(params.get("updated_since"))
+        projection = [
+            name.strip() for name in params.get("fields", "").split(",") if name.strip()
+        ]
+
+        member_id = b_member.id if b_member else None
 
         try:
             svc = b_env["x.bridge.service"].sudo()
-            data = svc.get_sessions(
-                company_id=b_company_id,
-                from_dt=from_dt,
-                to_dt=to_dt,
-                program_id=program_id,
-                member_id=b_member.id if b_member else None,
+            etag = bridge_etag(
+                "sessions",
+                b_company_id,
+                member_id,
+                sorted(params.items(multi=True)),
+                svc.get_sessions_version(
+                    company_id=b_company_id,
+                    from_dt=from_dt,
+                    to_dt=to_dt,
+                    program_id=program_id,
+                ),
             )
+            resp = bridge_not_modified(etag)
+            if resp is None:
+                data = svc.get_sessions(
+                    company_id=b_company_id,
+                    from_dt=from_dt,
+                    to_dt=to_dt,
+                    program_id=program_id,
+                    member_id=member_id,
+                    cursor=params.get("cursor") or None,
+                    limit=_parse_int(params.get("limit")),
+                    updated_since=updated_since,
+                    projection=projection or None,
+                )
+                resp = bridge_response(data, etag=etag)
         except UserError as exc:
             return bridge_error(str(exc), status=400)
         except Exception as exc:
             _logger.exception("Bridge list_sessions error: %s", exc)
             return bridge_error("Unexpected error.", status=500)
 
-        resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     # ── Session detail ────────────────────────────────────────────────────────
@@ -88,23 +123,32 @@ class BridgeClassController(http.Controller):
                     b_company_id=None, b_identity=None, b_payload=None, **kw):
         """Return detail for a single session + caller's enrollment status."""
         origin = request.httprequest.headers.get("Origin", "")
+        member_id = b_member.id if b_member else None
         try:
             svc = b_env["x.bridge.service"].sudo()
-            data = svc.get_session_detail(
-                session_id=session_id,
-                company_id=b_company_id,
-                member_id=b_member.id if b_member else None,
+            etag = bridge_etag(
+                "session",
+                session_id,
+                member_id,
+                svc.get_session_detail_version(session_id, b_company_id),
             )
+            resp = bridge_not_modified(etag)
+            if resp is None:
+                data = svc.get_session_detail(
+                    session_id=session_id,
+                    company_id=b_company_id,
+                    member_id=member_id,
+                )
+                resp = bridge_response(data, etag=etag)
         except UserError as exc:
             return bridge_error(str(exc), status=404)
         except Exception as exc:
             _logger.exception("Bridge get_session error: %s", exc)
             return bridge_error("Unexpected error.", status=500)
 
-        resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     # ── Enroll ────────────────────────────────────────────────────────────────
@@ -142,7 +186,7 @@ class BridgeClassController(http.Controller):
         resp = bridge_response(data, status=201)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     # ── Cancel enrollment ─────────────────────────────────────────────────────
@@ -179,7 +223,7 @@ class BridgeClassController(http.Controller):
         resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     # ── Check-in ──────────────────────────────────────────────────────────────
@@ -217,7 +261,7 @@ class BridgeClassController(http.Controller):
         resp = bridge_response(data, status=status_code)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
 
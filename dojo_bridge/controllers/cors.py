@@ -24,7 +24,7 @@ _logger = logging.getLogger(__name__)
 
 _CORS_METHODS = "GET, POST, DELETE, OPTIONS"
 _CORS_HEADERS_ALLOWED = (
-    "Authorization, Content-Type, X-Bridge-Signature, X-Requested-With"
+    "Authorization, Content-Type, X-Bridge-Signature, X-Requested-With, Idempotency-Key, If-None-Match"
 )
 _CORS_MAX_AGE = "86400"  # 24 h
 
@@ -65,6 +65,14 @@ class BridgeHealthController(http.Controller):
                     except Exception:
                         status_payload["identity_table"] = False
 
+                    # Webhook queue depth / latency (see bridge_webhook_event)
+                    try:
+                        status_payload["webhook_queue"] = (
+                            env["x.bridge.webhook.event"].queue_metrics()
+                        )
+                    except Exception:
+                        status_payload["webhook_queue"] = None
+
             except Exception as exc:
                 _logger.warning("Bridge health: DB check failed: %s", exc)
                 status_payload["status"] = "degraded"
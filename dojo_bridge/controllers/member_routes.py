@@ -15,7 +15,13 @@ from odoo import http
 from odoo.http import request
 from odoo.exceptions import UserError
 
-from .auth_middleware import require_bridge_auth, bridge_response, bridge_error
+from .auth_middleware import (
+    bridge_error,
+    bridge_etag,
+    bridge_not_modified,
+    bridge_response,
+    require_bridge_auth,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -47,20 +53,33 @@ class BridgeMemberController(http.Controller):
                 "member": None,
                 "hint": "Member not yet linked. Call /bridge/v1/auth/resolve to provision.",
             }
+            resp = bridge_response(data)
         else:
             try:
                 svc = b_env["x.bridge.service"].sudo()
-                data = {
-                    "identity": b_identity.to_api_dict(),
-                    "member": svc.get_member_profile(b_member.id, b_company_id),
-                }
+                etag = bridge_etag(
+                    "profile",
+                    b_identity.id,
+                    b_identity.write_date,
+                    svc.get_member_profile_version(b_member.id, b_company_id),
+                )
+                resp = bridge_not_modified(etag)
+                if resp is None:
+                    # last_seen is stamped behind the request and would change
+                    # the tag on nearly every call; /auth/resolve still has it.
+                    identity = b_identity.to_api_dict()
+                    identity.pop("last_seen", None)
+                    data = {
+                        "identity": identity,
+                        "member": svc.get_member_profile(b_member.id, b_company_id),
+                    }
+                    resp = bridge_response(data, etag=etag)
             except UserError as exc:
                 return bridge_error(str(exc), status=404)
 
-        resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     @http.route(
@@ -81,14 +100,19 @@ class BridgeMemberController(http.Controller):
 
         try:
             svc = b_env["x.bridge.service"].sudo()
-            data = svc.get_member_subscriptions(b_member.id, b_company_id)
+            etag = bridge_etag(
+                "subscriptions", b_member.id, svc.get_member_subscriptions_version(b_member.id, b_company_id)
+            )
+            resp = bridge_not_modified(etag)
+            if resp is None:
+                data = svc.get_member_subscriptions(b_member.id, b_company_id)
+                resp = bridge_response(data, etag=etag)
         except UserError as exc:
             return bridge_error(str(exc), status=404)
 
-        resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
     @http.route(
@@ -109,12 +133,17 @@ class BridgeMemberController(http.Controller):
 
         try:
             svc = b_env["x.bridge.service"].sudo()
-            data = svc.get_member_rank_history(b_member.id, b_company_id)
+            etag = bridge_etag(
+                "rank", b_member.id, svc.get_member_rank_history_version(b_member.id, b_company_id)
+            )
+            resp = bridge_not_modified(etag)
+            if resp is None:
+                data = svc.get_member_rank_history(b_member.id, b_company_id)
+                resp = bridge_response(data, etag=etag)
         except UserError as exc:
             return bridge_error(str(exc), status=404)
 
-        resp = bridge_response(data)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
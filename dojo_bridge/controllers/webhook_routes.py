@@ -17,6 +17,9 @@ This is the same pattern used by Stripe, GitHub, and Twilio webhooks —
 the payload authenticity is guaranteed by the shared secret without needing
 a per-user identity.
 
+Events are persisted to a durable queue and acknowledged with 202; a cron
+worker dispatches them with retries (see bridge_webhook_event.py).
+
 Supported event types (see bridge_webhook.py for implementations):
   subscription.created
   subscription.cancelled
@@ -63,6 +66,12 @@ class BridgeWebhookController(http.Controller):
         Headers:
           X-Bridge-Signature: sha256=<hmac_hex>
           Content-Type: application/json
+          Idempotency-Key: <unique event id>   (optional; falls back to
+                           body "event_id", then a hash of the body)
+
+        The event is stored in x.bridge.webhook.event and processed
+        asynchronously; the response is 202 with the queue entry's id.
+        Re-sending the same event returns the existing entry (duplicate=true).
         """
         if request.httprequest.method == "OPTIONS":
             from .auth_middleware import _options_response
@@ -133,32 +142,35 @@ class BridgeWebhookController(http.Controller):
                         status=403,
                     )
 
-                # ── 5. Dispatch to handler ─────────────────────────────────
-                handler = env["x.bridge.webhook.handler"].sudo()
-                result = handler.dispatch(event_type, payload, company_id)
-
-                if result.get("accepted"):
-                    cr.commit()
-                    _logger.info(
-                        "Bridge webhook: accepted event_type=%r result=%s",
-                        event_type,
-                        result,
-                    )
-                else:
-                    _logger.warning(
-                        "Bridge webhook: not accepted event_type=%r reason=%s",
-                        event_type,
-                        result.get("reason"),
-                    )
+                # ── 5. Persist to the queue (idempotent) and wake a worker ─
+                Event = env["x.bridge.webhook.event"]
+                key = Event.idempotency_key_for(
+                    body, raw_body, request.httprequest.headers.get("Idempotency-Key")
+                )
+                event, duplicate = Event.enqueue(key, event_type, company_id, payload)
+                if not duplicate:
+                    Event.trigger_worker()
+                cr.commit()
+                result = {
+                    "queued": True,
+                    "event_id": event.id,
+                    "idempotency_key": key,
+                    "duplicate": duplicate,
+                    "state": event.state,
+                }
+                _logger.info(
+                    "Bridge webhook: queued event_type=%r event_id=%s duplicate=%s",
+                    event_type, event.id, duplicate,
+                )
 
         except Exception as exc:
             _logger.exception("Bridge webhook unexpected error: %s", exc)
             return _service_error(f"Unexpected error: {exc}")
 
-        resp = bridge_response(result)
+        resp = bridge_response(result, status=202)
         if origin:
             resp.headers["Access-Control-Allow-Origin"] = origin
-            resp.headers["Vary"] = "Origin"
+            resp.vary.add("Origin")
         return resp
 
 
@@ -1,4 +1,7 @@
+from . import bridge_cache
 from . import bridge_config
 from . import bridge_identity
 from . import bridge_service
+from . import bridge_session_ext
 from . import bridge_webhook
+from . import bridge_webhook_event
@@ -0,0 +1,173 @@
+"""
+bridge_cache.py
+───────────────
+Per-process caches that keep @require_bridge_auth close to free for the
+mobile app's chatty traffic.
+
+  BridgeCache.settings(env)        – (jwt_secret, issuer, audience) per DB,
+                                     re-read every _SETTINGS_TTL seconds
+  BridgeCache.verified_claims(...) – verified JWT payload keyed by a SHA-256
+                                     of the token, kept until the token's exp
+  BridgeCache.identity(...)        – (identity_id, member_id) for an active
+                                     firebase_uid × company, dropped on every
+                                     identity write that can change it
+  BridgeCache.note_seen(...)       – write-behind buffer for last_seen, drained
+                                     by x.bridge.identity._flush_last_seen()
+                                     from a per-worker timer, a later request
+                                     and at worker exit
+
+Nothing here is shared between workers.  Another worker's identity write is
+therefore only seen once the entry's TTL runs out (_IDENTITY_TTL); a rotated
+JWT secret is seen after _SETTINGS_TTL and immediately orphans every token
+cached under the old one, because the secret's fingerprint is part of the key.
+"""
+import hashlib
+import threading
+import time
+
+from odoo.addons.dojo_base.tools.ttl_cache import TTLCache
+
+_SETTINGS_TTL = 60       # seconds
+_IDENTITY_TTL = 60       # seconds
+_CLAIMS_MAX_TTL = 900    # never trust a cached verification longer than this
+_LAST_SEEN_INTERVAL = 60  # seconds between stamps of one identity / flushes of one DB
+
+
+_SETTINGS = TTLCache(max_entries=256)
+_CLAIMS = TTLCache()
+_IDENTITIES = TTLCache()
+
+# last_seen write-behind state, guarded by _SEEN_LOCK:
+#   _SEEN_PENDING  {dbname: {identity_id: datetime}}  stamps not yet written
+#   _SEEN_STAMPED  {(dbname, identity_id): monotonic}  last time a stamp was taken
+#   _SEEN_FLUSHED  {dbname: monotonic}                 last flush of that DB
+_SEEN_LOCK = threading.Lock()
+_SEEN_PENDING: dict = {}
+_SEEN_STAMPED: dict = {}
+_SEEN_FLUSHED: dict = {}
+_SEEN_TIMERS: set = set()  # DB names with a flush timer armed in this process
+
+
+class BridgeCache:
+    """
+    Static helper — no Odoo model, just a namespace for the process caches.
+    """
+
+    # ── bridge settings ───────────────────────────────────────────────────────
+
+    @staticmethod
+    def settings(env) -> tuple:
+        """Return (jwt_secret, jwt_issuer, jwt_audience) for env's database."""
+        from .bridge_config import BridgeConfig
+
+        dbname = env.cr.dbname
+        cached = _SETTINGS.get(dbname)
+        if cached is None:
+            params = env["ir.config_parameter"].sudo()
+            cached = (
+                BridgeConfig.jwt_secret(params),
+                BridgeConfig.jwt_issuer(params),
+                BridgeConfig.jwt_audience(params),
+            )
+            _SETTINGS.set(dbname, cached, _SETTINGS_TTL)
+        return cached
+
+    @staticmethod
+    def invalidate_settings(dbname: str) -> None:
+        _SETTINGS.discard_where(lambda key: key == dbname)
+
+    # ── verified JWT claims ───────────────────────────────────────────────────
+
+    @staticmethod
+    def _claims_key(dbname: str, raw_token: str, settings: tuple) -> tuple:
+        secret, issuer, audience = settings
+        fingerprint = hashlib.sha256(
+            f"{secret}\x00{issuer}\x00{audience}".encode()
+        ).hexdigest()
+        token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+        return (dbname, fingerprint, token_hash)
+
+    @staticmethod
+    def verified_claims(dbname: str, raw_token: str, settings: tuple) -> dict | None:
+        """Return (a copy of) the cached verified payload for *raw_token*, if any."""
+        payload = _CLAIMS.get(BridgeCache._claims_key(dbname, raw_token, settings))
+        return dict(payload) if payload is not None else None
+
+    @staticmethod
+    def store_claims(dbname: str, raw_token: str, settings: tuple, payload: dict) -> None:
+        """Cache a freshly verified payload until its ``exp`` claim."""
+        try:
+            remaining = float(payload["exp"]) - time.time()
+        except (KeyError, TypeError, ValueError):
+            return
+        _CLAIMS.set(
+            BridgeCache._claims_key(dbname, raw_token, settings),
+            dict(payload),
+            min(remaining, _CLAIMS_MAX_TTL),
+        )
+
+    # ── identity resolution ───────────────────────────────────────────────────
+
+    @staticmethod
+    def identity(dbname: str, firebase_uid: str, company_id: int) -> tuple | None:
+        """Return cached (identity_id, member_id) or None."""
+        return _IDENTITIES.get((dbname, firebase_uid, company_id))
+
+    @staticmethod
+    def store_identity(dbname: str, firebase_uid: str, company_id: int,
+                       identity_id: int, member_id: int | None) -> None:
+        _IDENTITIES.set((dbname, firebase_uid, company_id), (identity_id, member_id), _IDENTITY_TTL)
+
+    @staticmethod
+    def invalidate_identities(dbname: str) -> None:
+        _IDENTITIES.discard_where(lambda key: key[0] == dbname)
+
+    # ── last_seen write-behind ────────────────────────────────────────────────
+
+    @staticmethod
+    def note_seen(dbname: str, identity_id: int, when) -> bool:
+        """
+        Buffer a last_seen stamp for *identity_id*, at most one per identity
+        per _LAST_SEEN_INTERVAL.  Returns True when the DB's buffer is due
+        for a flush.
+        """
+        now = time.monotonic()
+        with _SEEN_LOCK:
+            key = (dbname, identity_id)
+            if now - _SEEN_STAMPED.get(key, float("-inf")) >= _LAST_SEEN_INTERVAL:
+                _SEEN_STAMPED[key] = now
+                _SEEN_PENDING.setdefault(dbname, {})[identity_id] = when
+            flushed = _SEEN_FLUSHED.setdefault(dbname, now)
+            return bool(_SEEN_PENDING.get(dbname)) and now - flushed >= _LAST_SEEN_INTERVAL
+
+    @staticmethod
+    def claim_seen_timer(dbname: str) -> bool:
+        """True when the caller should arm a flush timer for *dbname*: stamps
+        are pending and no timer is armed yet.  The claim is held until
+        release_seen_timer()."""
+        with _SEEN_LOCK:
+            if dbname in _SEEN_TIMERS or not _SEEN_PENDING.get(dbname):
+                return False
+            _SEEN_TIMERS.add(dbname)
+            return True
+
+    @staticmethod
+    def release_seen_timer(dbname: str) -> None:
+        with _SEEN_LOCK:
+            _SEEN_TIMERS.discard(dbname)
+
+    @staticmethod
+    def seen_dbnames() -> list:
+        """DB names that have last_seen stamps waiting to be flushed."""
+        with _SEEN_LOCK:
+            return [dbname for dbname, pending in _SEEN_PENDING.items() if pending]
+
+    @staticmethod
+    def take_seen(dbname: str) -> dict:
+        """Detach and return the pending {identity_id: datetime} stamps of a DB."""
+        now = time.monotonic()
+        with _SEEN_LOCK:
+            _SEEN_FLUSHED[dbname] = now
+            for key in [k for k, t in _SEEN_STAMPED.items() if now - t >= _LAST_SEEN_INTERVAL]:
+                del _SEEN_STAMPED[key]
+            return _SEEN_PENDING.pop(dbname, {})
@@ -105,4 +105,7 @@ class BridgeConfig:
 
     @staticmethod
     def set(params, key: str, value: str) -> None:
+        from .bridge_cache import BridgeCache
+
         params.set_param(key, value)
+        BridgeCache.invalidate_settings(params.env.cr.dbname)
@@ -16,12 +16,27 @@ Lifecycle
    request context by the @require_bridge_auth middleware.
 """
 import logging
+import threading
 
-from odoo import api, fields, models
+from odoo import api, fields, models, SUPERUSER_ID
+from odoo.modules.registry import Registry
+
+from .bridge_cache import BridgeCache, _LAST_SEEN_INTERVAL
 
 _logger = logging.getLogger(__name__)
 
 
+def _flush_last_seen_timer(dbname):
+    """Timer callback: write *dbname*'s buffered last_seen stamps in a cursor
+    of its own, whether or not the worker is serving requests."""
+    BridgeCache.release_seen_timer(dbname)
+    try:
+        with Registry(dbname).cursor() as cr:
+            api.Environment(cr, SUPERUSER_ID, {})["x.bridge.identity"]._flush_last_seen()
+    except Exception:
+        _logger.warning("Bridge: could not flush last_seen stamps of %s.", dbname, exc_info=True)
+
+
 class BridgeIdentity(models.Model):
     _name = "x.bridge.identity"
     _description = "Bridge Identity: Firebase UID → dojo.member"
@@ -63,7 +78,9 @@ class BridgeIdentity(models.Model):
     last_seen = fields.Datetime(
         string="Last Seen",
         readonly=True,
-        help="Updated on every successfully authenticated request.",
+        help="Time of the latest authenticated request. Written behind in "
+             "bulk, about a minute late; a stamp held by a worker that is "
+             "killed is lost.",
     )
 
     # ── cached JWT claims (informational, not used for enforcement) ───────────
@@ -99,6 +116,35 @@ class BridgeIdentity(models.Model):
         "A Firebase UID can only be linked to one identity per company.",
     )
 
+    # ── ORM overrides ─────────────────────────────────────────────────────────
+
+    # Fields that feed the auth middleware's identity cache.
+    _CACHED_FIELDS = {"firebase_uid", "company_id", "member_id", "is_active"}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._invalidate_identity_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if self._CACHED_FIELDS.intersection(vals):
+            self._invalidate_identity_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self._invalidate_identity_cache()
+        return result
+
+    def _invalidate_identity_cache(self) -> None:
+        """Drop cached identities now and again after commit, so a request
+        racing this transaction cannot re-cache the old state."""
+        dbname = self.env.cr.dbname
+        BridgeCache.invalidate_identities(dbname)
+        self.env.cr.postcommit.add(lambda: BridgeCache.invalidate_identities(dbname))
+
     # ── public API ────────────────────────────────────────────────────────────
 
     @api.model
@@ -188,8 +234,49 @@ class BridgeIdentity(models.Model):
         return identity
 
     def touch(self) -> None:
-        """Stamp last_seen without triggering a full write auditing cycle."""
-        self.write({"last_seen": fields.Datetime.now()})
+        """Stamp last_seen via the write-behind buffer (see _flush_last_seen)."""
+        now = fields.Datetime.now()
+        for identity in self:
+            BridgeCache.note_seen(self.env.cr.dbname, identity.id, now)
+        self._schedule_flush_last_seen()
+
+    @api.model
+    def _schedule_flush_last_seen(self) -> None:
+        """Arm a one-shot timer that flushes this DB's buffered stamps after
+        _LAST_SEEN_INTERVAL, so an idle worker does not sit on them.  At most
+        one timer per DB and process is pending at a time."""
+        if self.env.registry.in_test_mode():
+            return
+        dbname = self.env.cr.dbname
+        if BridgeCache.claim_seen_timer(dbname):
+            timer = threading.Timer(_LAST_SEEN_INTERVAL, _flush_last_seen_timer, [dbname])
+            timer.daemon = True
+            timer.start()
+
+    @api.model
+    def _flush_last_seen(self) -> int:
+        """
+        Write this process's buffered last_seen stamps for the current DB in
+        one UPDATE.  A stamp never moves last_seen backwards.  Returns the
+        number of identities updated.
+        """
+        seen = BridgeCache.take_seen(self.env.cr.dbname)
+        if not seen:
+            return 0
+        values = ", ".join(["(%s, %s::timestamp)"] * len(seen))
+        params = [v for item in seen.items() for v in item]
+        self.env.cr.execute(
+            f"""
+            UPDATE x_bridge_identity i
+               SET last_seen = v.seen
+              FROM (VALUES {values}) AS v(id, seen)
+             WHERE i.id = v.id
+               AND (i.last_seen IS NULL OR i.last_seen < v.seen)
+            """,
+            params,
+        )
+        self.browse(seen).invalidate_recordset(["last_seen"], flush=False)
+        return self.env.cr.rowcount
 
     def to_api_dict(self) -> dict:
         """Serialise for the /auth/resolve response payload."""
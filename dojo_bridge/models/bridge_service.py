@@ -11,13 +11,34 @@ Method naming convention:
   get_*   → read-only, returns dicts safe for JSON serialisation
   do_*    → mutations, must call cr.commit() after returning
 """
+import base64
+import json
 import logging
+from datetime import datetime, timedelta, timezone
 
 from odoo import api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+# Session feed (get_sessions) page size, and the keys a client may project.
+_SESSION_FEED_DEFAULT_LIMIT = 100
+_SESSION_FEED_MAX_LIMIT = 500
+_SESSION_FEED_FIELDS = (
+    "state",
+    "start_datetime",
+    "end_datetime",
+    "updated_at",
+    "template",
+    "seats_taken",
+    "member_enrolled",
+)
+# Delta-sync watermark lag behind the oldest open transaction (see
+# _session_feed_watermark), and how long deletions are remembered: a delta
+# request older than that gets resync_required instead of a partial answer.
+_SESSION_FEED_WATERMARK_MARGIN = timedelta(seconds=60)
+_SESSION_TOMBSTONE_DAYS = 30
+
 
 class BridgeService(models.AbstractModel):
     _name = "x.bridge.service"
@@ -150,67 +171,77 @@ class BridgeService(models.AbstractModel):
         to_dt=None,
         program_id: int | None = None,
         member_id: int | None = None,
-    ) -> list:
+        cursor: str | None = None,
+        limit: int | None = None,
+        updated_since=None,
+        projection: list | None = None,
+    ) -> dict:
         """
-        Return schedule. All sessions are scoped to company_id.
-        If member_id is supplied, each session includes `member_enrolled` bool.
+        Return one page of the schedule. All sessions are scoped to company_id.
+
+        Schedule mode (default) walks sessions by (start_datetime, id) inside
+        the optional [from_dt, to_dt] window.  Delta mode (updated_since set)
+        walks by (updated_at, id) and returns every session that was written,
+        or whose enrollments were written, after updated_since — enough for a
+        client to refresh seat counts and states it already holds.
+
+        Pages are keyset-paginated: pass back `next_cursor` to get the next
+        page; it is None on the last one.  `projection` restricts each
+        session dict to the listed keys (see _SESSION_FEED_FIELDS; "id" is
+        always included) and skips the reads the other keys would need.
+
+        Delta pages also list, in `deleted`, the ids of sessions of the
+        company deleted since updated_since (regardless of the window
+        filters); sessions that lost an enrollment come back as changed.
+
+        Returns {"sessions": [...], "deleted": [...], "next_cursor": str | None,
+                 "has_more": bool, "server_time": iso, "mode": str,
+                 "resync_required": bool}.
+        Clients doing delta sync pass the first page's server_time as the
+        next updated_since.  server_time is a watermark that lags behind
+        every transaction still open, so rows may repeat across syncs but
+        none is skipped.  resync_required means updated_since is older than
+        the deletion history kept (_SESSION_TOMBSTONE_DAYS): the client must
+        drop its copy and do a full schedule sync.  If member_id is supplied,
+        each session includes `member_enrolled`.
         """
-        domain = [("company_id", "=", company_id)]
-        if from_dt:
-            domain.append(("start_datetime", ">=", from_dt))
-        if to_dt:
-            domain.append(("start_datetime", "<=", to_dt))
-        if program_id:
-            domain.append(("template_id.program_id", "=", program_id))
-
-        sessions = self.env["dojo.class.session"].search(
-            domain, order="start_datetime asc", limit=200
+        wanted = self._session_feed_fields(projection)
+        limit = max(1, min(limit or _SESSION_FEED_DEFAULT_LIMIT, _SESSION_FEED_MAX_LIMIT))
+        mode = "delta" if updated_since else "schedule"
+        after = self._decode_session_cursor(cursor, mode) if cursor else None
+        server_time = self._session_feed_watermark()
+        page = {
+            "sessions": [],
+            "deleted": [],
+            "next_cursor": None,
+            "has_more": False,
+            "server_time": server_time.isoformat(),
+            "mode": mode,
+            "resync_required": False,
+        }
+        if updated_since and updated_since.tzinfo:
+            updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+        if updated_since and updated_since < fields.Datetime.now() - timedelta(days=_SESSION_TOMBSTONE_DAYS):
+            page["resync_required"] = True
+            return page
+
+        rows = self._session_feed_rows(
+            company_id, from_dt, to_dt, program_id, updated_since, after, limit + 1
         )
-
-        enrolled_session_ids: set[int] = set()
-        if member_id:
-            enrollments = self.env["dojo.class.enrollment"].search(
-                [
-                    ("member_id", "=", member_id),
-                    ("session_id", "in", sessions.ids),
-                    ("status", "not in", ["cancelled"]),
-                ]
-            )
-            enrolled_session_ids = {e.session_id.id for e in enrollments}
-
-        result = []
-        for s in sessions:
-            template = s.template_id
-            result.append(
-                {
-                    "id": s.id,
-                    "state": s.state,
-                    "start_datetime": s.start_datetime.isoformat()
-                    if s.start_datetime
-                    else None,
-                    "end_datetime": s.end_datetime.isoformat()
-                    if hasattr(s, "end_datetime") and s.end_datetime
-                    else None,
-                    "template": {
-                        "id": template.id,
-                        "name": template.name,
-                        "program_id": template.program_id.id
-                        if template.program_id
-                        else None,
-                        "program_name": template.program_id.name
-                        if template.program_id
-                        else None,
-                        "max_capacity": template.max_capacity
-                        if hasattr(template, "max_capacity")
-                        else None,
-                    },
-                    "seats_taken": s.seats_taken
-                    if hasattr(s, "seats_taken")
-                    else None,
-                    "member_enrolled": s.id in enrolled_session_ids,
-                }
-            )
-        return result
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        sessions = self.env["dojo.class.session"].browse(
+            [row[0] for row in rows if not row[2]]
+        )
+        page.update({
+            "sessions": self._serialize_session_page(sessions, wanted, member_id),
+            "deleted": [row[0] for row in rows if row[2]],
+            "next_cursor": (
+                self._encode_session_cursor(mode, rows[-1][1], rows[-1][0]) if has_more else None
+            ),
+            "has_more": has_more,
+        })
+        return page
 
     @api.model
     def get_session_detail(
@@ -262,6 +293,76 @@ class BridgeService(models.AbstractModel):
             "enrollment": enrollment,
         }
 
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Response versions — cheap validators the controllers turn into ETags, so
+    # an unchanged resource is answered with a 304 before any of the get_*
+    # payload above is built.  Each is a tuple of (count, latest write_date)
+    # pairs over every record the matching payload reads.
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @api.model
+    def get_sessions_version(
+        self,
+        company_id: int,
+        from_dt=None,
+        to_dt=None,
+        program_id: int | None = None,
+    ) -> tuple:
+        """Version of the session feed window (both schedule and delta mode)."""
+        domain = [("company_id", "=", company_id)]
+        if from_dt:
+            domain.append(("start_datetime", ">=", from_dt))
+        if to_dt:
+            domain.append(("start_datetime", "<=", to_dt))
+        if program_id:
+            domain.append(("template_id.program_id", "=", program_id))
+        shared = [("company_id", "in", [company_id, False])]
+        return (
+            self._version("dojo.class.session", domain),
+            self._version("dojo.class.enrollment", [("session_id", "any", domain)]),
+            self._version("dojo.class.template", shared),
+            self._version("dojo.program", shared),
+        )
+
+    @api.model
+    def get_session_detail_version(self, session_id: int, company_id: int) -> tuple:
+        session = self._get_session(session_id, company_id)
+        return (
+            session.write_date,
+            session.template_id.write_date,
+            session.template_id.program_id.write_date,
+            self._version("dojo.class.enrollment", [("session_id", "=", session.id)]),
+        )
+
+    @api.model
+    def get_member_profile_version(self, member_id: int, company_id: int) -> tuple:
+        member = self._get_member(member_id, company_id)
+        return (
+            member.write_date,
+            member.partner_id.write_date,
+            member.company_id.write_date,
+            self._version("dojo.member.rank", [("member_id", "=", member.id)]),
+            self._version("dojo.belt.rank", [("company_id", "in", [company_id, False])]),
+        )
+
+    @api.model
+    def get_member_subscriptions_version(self, member_id: int, company_id: int) -> tuple:
+        self._get_member(member_id, company_id)
+        domain = [("member_id", "=", member_id), ("company_id", "=", company_id)]
+        plans = self.env["dojo.member.subscription"].search_fetch(domain, ["plan_id"]).plan_id
+        return (
+            self._version("dojo.member.subscription", domain),
+            self._version("dojo.subscription.plan", [("id", "in", plans.ids)]),
+        )
+
+    @api.model
+    def get_member_rank_history_version(self, member_id: int, company_id: int) -> tuple:
+        self._get_member(member_id, company_id)
+        return (
+            self._version("dojo.member.rank", [("member_id", "=", member_id)]),
+            self._version("dojo.belt.rank", [("company_id", "in", [company_id, False])]),
+        )
+
     # ═══════════════════════════════════════════════════════════════════════════
     # MUTATIONS — callers must commit the cursor after these return successfully
     # ═══════════════════════════════════════════════════════════════════════════
@@ -409,3 +510,210 @@ class BridgeService(models.AbstractModel):
                 f"Session {session_id} not found in company {company_id}."
             )
         return session
+
+    def _version(self, model: str, domain: list) -> tuple:
+        """(record count, latest write_date) over *domain*, in one query."""
+        [(count, latest)] = self.env[model].with_context(active_test=False)._read_group(
+            domain, aggregates=["__count", "write_date:max"]
+        )
+        return (count, latest)
+
+    # ── session feed ──────────────────────────────────────────────────────────
+
+    def _session_feed_fields(self, projection) -> set:
+        if not projection:
+            return set(_SESSION_FEED_FIELDS)
+        wanted = {name for name in projection if name and name != "id"}
+        unknown = wanted.difference(_SESSION_FEED_FIELDS)
+        if unknown:
+            raise UserError(
+                f"Unknown session field(s): {', '.join(sorted(unknown))}. "
+                f"Allowed: id, {', '.join(_SESSION_FEED_FIELDS)}."
+            )
+        return wanted
+
+    def _encode_session_cursor(self, mode: str, key, session_id: int) -> str:
+        raw = json.dumps([mode[0], key.isoformat(), session_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_session_cursor(self, cursor: str, mode: str) -> tuple:
+        """Return (key datetime, session id) from a cursor of the same mode."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            tag, key, session_id = json.loads(raw)
+            if tag != mode[0]:
+                raise ValueError(tag)
+            return datetime.fromisoformat(key), int(session_id)
+        except (ValueError, TypeError):
+            raise UserError("Invalid or expired cursor.") from None
+
+    def _session_feed_watermark(self):
+        """
+        Return the updated_since to hand out with a feed page: the start of
+        the oldest transaction still open on this database, less a margin.
+
+        write_date is the writing transaction's start time, so a write that
+        commits after this read can carry a write_date earlier than now;
+        it cannot be earlier than the oldest open transaction.
+        """
+        self.env.cr.execute(
+            """
+            SELECT LEAST(now(), MIN(xact_start)) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database()
+               AND xact_start IS NOT NULL
+            """
+        )
+        return self.env.cr.fetchone()[0].replace(microsecond=0) - _SESSION_FEED_WATERMARK_MARGIN
+
+    def _session_feed_rows(self, company_id, from_dt, to_dt, program_id,
+                           updated_since, after, limit) -> list:
+        """
+        Return [(session_id, sort key, deleted)] for one page, ordered by
+        (key, id).  The key is start_datetime in schedule mode and, in delta
+        mode, the latest write to the session or any of its enrollments (or
+        the removal of one, see x.bridge.session.tombstone).  Delta mode also
+        walks the sessions deleted since updated_since, with deleted = True.
+        """
+        self.env["dojo.class.session"].flush_model()
+        self.env["dojo.class.enrollment"].flush_model()
+        params = {
+            "company_id": company_id,
+            "from_dt": from_dt,
+            "to_dt": to_dt,
+            "program_id": program_id,
+            "since": updated_since,
+            "limit": limit,
+        }
+        filters = ["s.company_id = %(company_id)s"]
+        if from_dt:
+            filters.append("s.start_datetime >= %(from_dt)s")
+        if to_dt:
+            filters.append("s.start_datetime <= %(to_dt)s")
+        if program_id:
+            filters.append(
+                "s.template_id IN (SELECT id FROM dojo_class_template"
+                " WHERE program_id = %(program_id)s)"
+            )
+        if updated_since:
+            query = f"""
+                SELECT id, key, deleted FROM (
+                    SELECT s.id, GREATEST(s.write_date, e.changed, t.changed) AS key,
+                           false AS deleted
+                      FROM dojo_class_session s
+                      LEFT JOIN (
+                          SELECT session_id, MAX(write_date) AS changed
+                            FROM dojo_class_enrollment
+                           WHERE write_date > %(since)s
+                           GROUP BY session_id
+                      ) e ON e.session_id = s.id
+                      LEFT JOIN (
+                          SELECT session_id, MAX(changed_at) AS changed
+                            FROM x_bridge_session_tombstone
+                           WHERE changed_at > %(since)s AND NOT deleted
+                           GROUP BY session_id
+                      ) t ON t.session_id = s.id
+                     WHERE {" AND ".join(filters)}
+                       AND (s.write_date > %(since)s OR e.changed IS NOT NULL
+                            OR t.changed IS NOT NULL)
+                    UNION ALL
+                    SELECT session_id, MAX(changed_at), true
+                      FROM x_bridge_session_tombstone
+                     WHERE deleted
+                       AND company_id = %(company_id)s
+                       AND changed_at > %(since)s
+                     GROUP BY session_id
+                ) feed
+                {"WHERE (key, id) > (%(after_key)s, %(after_id)s)" if after else ""}
+                ORDER BY key, id
+                LIMIT %(limit)s
+            """
+        else:
+            if after:
+                filters.append("(s.start_datetime, s.id) > (%(after_key)s, %(after_id)s)")
+            query = f"""
+                SELECT s.id, s.start_datetime, false
+                  FROM dojo_class_session s
+                 WHERE {" AND ".join(filters)}
+                 ORDER BY s.start_datetime, s.id
+                 LIMIT %(limit)s
+            """
+        if after:
+            params["after_key"], params["after_id"] = after
+        self.env.cr.execute(query, params)
+        return self.env.cr.fetchall()
+
+    def _serialize_session_page(self, sessions, wanted: set, member_id) -> list:
+        """
+        Build the feed dicts for *sessions*, prefetching templates, programs,
+        seat counts and the member's enrollments once for the whole page.
+        """
+        if not sessions:
+            return []
+        stored = [
+            name for key, name in (
+                ("state", "state"),
+                ("start_datetime", "start_datetime"),
+                ("end_datetime", "end_datetime"),
+                ("updated_at", "write_date"),
+                ("template", "template_id"),
+            )
+            if key in wanted
+        ]
+        if stored:
+            sessions.fetch(stored)
+
+        templates = {}
+        if "template" in wanted:
+            template_recs = sessions.template_id
+            template_recs.fetch(["name", "program_id", "max_capacity"])
+            template_recs.program_id.fetch(["name"])
+            templates = {
+                t.id: {
+                    "id": t.id,
+                    "name": t.name,
+                    "program_id": t.program_id.id or None,
+                    "program_name": t.program_id.name or None,
+                    "max_capacity": t.max_capacity,
+                }
+                for t in template_recs
+            }
+
+        seats = {}
+        if "seats_taken" in wanted:
+            seats = dict(zip(sessions.ids, sessions.mapped("seats_taken")))
+
+        enrolled = set()
+        if member_id and "member_enrolled" in wanted:
+            enrollments = self.env["dojo.class.enrollment"].search_fetch(
+                [
+                    ("member_id", "=", member_id),
+                    ("session_id", "in", sessions.ids),
+                    ("status", "not in", ["cancelled"]),
+                ],
+                ["session_id"],
+            )
+            enrolled = set(enrollments.session_id.ids)
+
+        def iso(value):
+            return value.isoformat() if value else None
+
+        result = []
+        for s in sessions:
+            item = {"id": s.id}
+            if "state" in wanted:
+                item["state"] = s.state
+            if "start_datetime" in wanted:
+                item["start_datetime"] = iso(s.start_datetime)
+            if "end_datetime" in wanted:
+                item["end_datetime"] = iso(s.end_datetime)
+            if "updated_at" in wanted:
+                item["updated_at"] = iso(s.write_date)
+            if "template" in wanted:
+                item["template"] = templates.get(s.template_id.id)
+            if "seats_taken" in wanted:
+                item["seats_taken"] = seats[s.id]
+            if "member_enrolled" in wanted:
+                item["member_enrolled"] = s.id in enrolled
+            result.append(item)
+        return result
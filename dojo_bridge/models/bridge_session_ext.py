@@ -0,0 +1,85 @@
+"""
+bridge_session_ext.py
+─────────────────────
+Indexes and deletion history behind the keyset-paginated session feed
+(x.bridge.service.get_sessions):
+
+  dojo.class.session     (company_id, start_datetime, id)  – schedule pages
+  dojo.class.session     (company_id, write_date)          – delta sync
+  dojo.class.enrollment  (write_date, session_id)          – delta sync, seat
+                                                             count changes
+  x.bridge.session.tombstone                               – delta sync of
+                                                             deletions
+
+A deleted row leaves no write_date behind, so unlinking a session or an
+enrollment records a tombstone: deleted sessions are listed in the delta
+feed's `deleted`, sessions that lost an enrollment come back as changed.
+Tombstones are kept _SESSION_TOMBSTONE_DAYS days (see bridge_service.py);
+older delta requests are told to resync.
+"""
+from odoo import api, fields, models
+
+from .bridge_service import _SESSION_TOMBSTONE_DAYS
+
+
+class BridgeSessionTombstone(models.Model):
+    _name = "x.bridge.session.tombstone"
+    _description = "Bridge Session Feed Tombstone"
+    _log_access = False
+
+    session_id = fields.Integer(required=True, readonly=True)
+    company_id = fields.Many2one("res.company", readonly=True, ondelete="cascade")
+    deleted = fields.Boolean(
+        readonly=True,
+        help="Set when the session itself was deleted; unset when one of its "
+             "enrollments was.",
+    )
+    changed_at = fields.Datetime(required=True, readonly=True)
+
+    _x_bridge_session_tombstone_feed_idx = models.Index("(changed_at, session_id)")
+
+    @api.model
+    def _record(self, session_ids, deleted):
+        """Tombstone *session_ids*, stamped like write_date (transaction start)."""
+        if not session_ids:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO x_bridge_session_tombstone (session_id, company_id, deleted, changed_at)
+            SELECT id, company_id, %s, now() AT TIME ZONE 'UTC'
+              FROM dojo_class_session
+             WHERE id = ANY(%s)
+            """,
+            [deleted, list(session_ids)],
+        )
+
+    @api.model
+    def _cron_prune(self):
+        self.env.cr.execute(
+            """
+            DELETE FROM x_bridge_session_tombstone
+             WHERE changed_at < (now() AT TIME ZONE 'UTC') - make_interval(days => %s)
+            """,
+            [_SESSION_TOMBSTONE_DAYS],
+        )
+
+
+class DojoClassSessionBridgeExt(models.Model):
+    _inherit = "dojo.class.session"
+
+    _dojo_class_session_feed_idx = models.Index("(company_id, start_datetime, id)")
+    _dojo_class_session_company_write_idx = models.Index("(company_id, write_date)")
+
+    def unlink(self):
+        self.env["x.bridge.session.tombstone"]._record(self.ids, True)
+        return super().unlink()
+
+
+class DojoClassEnrollmentBridgeExt(models.Model):
+    _inherit = "dojo.class.enrollment"
+
+    _dojo_class_enrollment_write_idx = models.Index("(write_date, session_id)")
+
+    def unlink(self):
+        self.env["x.bridge.session.tombstone"]._record(self.session_id.ids, False)
+        return super().unlink()
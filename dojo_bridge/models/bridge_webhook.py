@@ -3,6 +3,7 @@ bridge_webhook.py
 ─────────────────
 x.bridge.webhook.handler — AbstractModel that processes typed events
 pushed from the NestJS Control Plane to POST /bridge/v1/webhooks/event.
+Events reach it through the durable queue in bridge_webhook_event.py.
 
 Each event_type maps to a dispatch_<event_type> method.
 Unknown event types are logged and gracefully ignored (returns a 200 so
@@ -28,6 +29,11 @@ class BridgeWebhookHandler(models.AbstractModel):
 
     # ── dispatch router ───────────────────────────────────────────────────────
 
+    @api.model
+    def has_handler(self, event_type: str) -> bool:
+        """True if a dispatch_<event_type> method exists."""
+        return hasattr(self, "dispatch_" + event_type.replace(".", "_"))
+
     @api.model
     def dispatch(self, event_type: str, payload: dict, company_id: int) -> dict:
         """
@@ -0,0 +1,326 @@
+"""
+bridge_webhook_event.py
+───────────────────────
+x.bridge.webhook.event — durable inbound webhook queue.
+
+POST /bridge/v1/webhooks/event only verifies and persists the event (one
+INSERT ... ON CONFLICT on its idempotency key) and answers 202.  The
+"Bridge: Process Webhook Queue" cron drains the queue in batches, each event
+dispatched to x.bridge.webhook.handler inside its own savepoint.
+
+Event lifecycle
+───────────────
+  queued    waiting for a worker (next_attempt_at ≤ now)
+  done      handler accepted the event
+  rejected  no handler for the event type, or the handler declined it
+            (accepted=False) — never retried, can be re-queued
+  dead      handler failed _MAX_ATTEMPTS times (dead letter; can be re-queued)
+
+Unexpected handler exceptions are retried with the backoff in
+_RETRY_BACKOFF_SECONDS.  A decline is deterministic (e.g. member not found),
+so retrying it would only delay the same outcome.
+latency_ms (received → done) and handler_ms feed the per-event-type metrics
+returned by queue_metrics().
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 50
+# Delay before attempt 2, 3, … ; the event is dead-lettered after the last one.
+_RETRY_BACKOFF_SECONDS = (30, 120, 600, 3600, 6 * 3600)
+_MAX_ATTEMPTS = len(_RETRY_BACKOFF_SECONDS) + 1
+# A worker stops claiming batches after this long and re-triggers itself.
+_WORKER_BUDGET_SECONDS = 120
+# Finished events are purged after this many days (dead letters are kept).
+_RETENTION_DAYS = 30
+
+
+class BridgeWebhookEvent(models.Model):
+    _name = "x.bridge.webhook.event"
+    _description = "Bridge Webhook Event"
+    _order = "id desc"
+    _rec_name = "idempotency_key"
+    _log_access = False
+
+    idempotency_key = fields.Char(
+        string="Idempotency Key",
+        required=True,
+        readonly=True,
+        help="Sender-supplied event id, or a SHA-256 of the raw body.",
+    )
+    event_type = fields.Char(required=True, readonly=True, index=True)
+    company_id = fields.Many2one("res.company", required=True, readonly=True, ondelete="cascade")
+    payload = fields.Json(readonly=True)
+    state = fields.Selection(
+        [
+            ("queued", "Queued"),
+            ("done", "Done"),
+            ("rejected", "Rejected"),
+            ("dead", "Dead Letter"),
+        ],
+        default="queued",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    attempts = fields.Integer(readonly=True)
+    received_at = fields.Datetime(readonly=True, default=fields.Datetime.now)
+    next_attempt_at = fields.Datetime(readonly=True, default=fields.Datetime.now)
+    processed_at = fields.Datetime(readonly=True)
+    latency_ms = fields.Integer(
+        string="Latency (ms)",
+        readonly=True,
+        help="Received → processed, including queue wait and retries.",
+    )
+    handler_ms = fields.Integer(string="Handler Time (ms)", readonly=True)
+    last_error = fields.Text(readonly=True)
+    result = fields.Json(readonly=True)
+
+    _x_bridge_webhook_event_key_uniq = models.Constraint(
+        "UNIQUE(idempotency_key)",
+        "This webhook event was already received.",
+    )
+    _x_bridge_webhook_event_queue_idx = models.Index(
+        "(next_attempt_at, id) WHERE state = 'queued'"
+    )
+
+    # ── ingestion ─────────────────────────────────────────────────────────────
+
+    @api.model
+    def idempotency_key_for(self, body: dict, raw_body: bytes, header_key: str | None) -> str:
+        """Idempotency-Key header, else the body's event_id, else a body hash."""
+        key = header_key or body.get("event_id") or body.get("idempotency_key")
+        if key:
+            return str(key)[:255]
+        return "sha256:" + hashlib.sha256(raw_body).hexdigest()
+
+    @api.model
+    def enqueue(self, idempotency_key: str, event_type: str, company_id: int,
+                payload: dict) -> tuple:
+        """
+        Persist an event unless its key is already known.
+        Returns (event record, duplicate: bool).
+        """
+        self.env.cr.execute(
+            """
+            INSERT INTO x_bridge_webhook_event
+                (idempotency_key, event_type, company_id, payload, state,
+                 attempts, received_at, next_attempt_at)
+            VALUES (%s, %s, %s, %s::jsonb, 'queued', 0, %s, %s)
+            ON CONFLICT (idempotency_key) DO NOTHING
+            RETURNING id
+            """,
+            [
+                idempotency_key, event_type, company_id,
+                json.dumps(payload or {}, default=str),
+                fields.Datetime.now(), fields.Datetime.now(),
+            ],
+        )
+        row = self.env.cr.fetchone()
+        if row:
+            return self.browse(row[0]), False
+        return self.search([("idempotency_key", "=", idempotency_key)], limit=1), True
+
+    @api.model
+    def trigger_worker(self) -> None:
+        cron = self.env.ref(
+            "dojo_bridge.ir_cron_bridge_process_webhooks", raise_if_not_found=False
+        )
+        if cron:
+            cron._trigger()
+
+    # ── worker ────────────────────────────────────────────────────────────────
+
+    @api.model
+    def _cron_process_queue(self) -> None:
+        """Drain due events in batches, committing after each batch."""
+        commit = not self.env.registry.in_test_mode()
+        deadline = time.monotonic() + _WORKER_BUDGET_SECONDS
+        while True:
+            if time.monotonic() > deadline:
+                self.trigger_worker()
+                break
+            events = self._claim_batch(_BATCH_SIZE)
+            if not events:
+                break
+            for event in events:
+                event._process()
+            if commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        self._purge_finished()
+        self._schedule_next_retry()
+
+    @api.model
+    def _claim_batch(self, limit: int):
+        """Lock up to *limit* due events that no other worker holds."""
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT id FROM x_bridge_webhook_event
+             WHERE state = 'queued' AND next_attempt_at <= %s
+             ORDER BY next_attempt_at, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            [fields.Datetime.now(), limit],
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _process(self) -> None:
+        """Dispatch one claimed event and record the outcome."""
+        self.ensure_one()
+        handler = self.env["x.bridge.webhook.handler"].sudo()
+        attempts = self.attempts + 1
+        if not handler.has_handler(self.event_type):
+            self._reject(attempts, f"Unknown event type: {self.event_type}")
+            return
+
+        started = time.monotonic()
+        try:
+            with self.env.cr.savepoint():
+                result = handler.dispatch(self.event_type, self.payload or {}, self.company_id.id)
+                if not result.get("accepted"):
+                    # Raised inside the savepoint so partial handler work is undone.
+                    raise _NotAccepted(result.get("reason") or "Event not accepted.")
+        except _NotAccepted as exc:
+            self._reject(attempts, str(exc), result)
+            return
+        except Exception as exc:
+            self._register_failure(attempts, exc)
+            return
+        finished = fields.Datetime.now()
+        self.write({
+            "state": "done",
+            "attempts": attempts,
+            "processed_at": finished,
+            "handler_ms": int((time.monotonic() - started) * 1000),
+            "latency_ms": int((finished - self.received_at).total_seconds() * 1000),
+            "last_error": False,
+            "result": result,
+        })
+
+    def _reject(self, attempts: int, reason: str, result=None) -> None:
+        """Finish the event as rejected; it is not retried."""
+        self.ensure_one()
+        self.write({
+            "state": "rejected",
+            "attempts": attempts,
+            "processed_at": fields.Datetime.now(),
+            "last_error": reason,
+            "result": result or False,
+        })
+        _logger.warning(
+            "Bridge webhook: rejected event %s (%s): %s", self.id, self.event_type, reason,
+        )
+
+    def _register_failure(self, attempts: int, exc: Exception) -> None:
+        self.ensure_one()
+        now = fields.Datetime.now()
+        vals = {"attempts": attempts, "last_error": str(exc)}
+        if attempts >= _MAX_ATTEMPTS:
+            vals.update(state="dead", processed_at=now)
+            _logger.error(
+                "Bridge webhook: event %s (%s) dead-lettered after %d attempts: %s",
+                self.id, self.event_type, attempts, exc,
+            )
+        else:
+            delay = _RETRY_BACKOFF_SECONDS[attempts - 1]
+            vals["next_attempt_at"] = now + timedelta(seconds=delay)
+            _logger.warning(
+                "Bridge webhook: event %s (%s) attempt %d failed, retry in %ss: %s",
+                self.id, self.event_type, attempts, delay, exc,
+            )
+        self.write(vals)
+
+    @api.model
+    def _schedule_next_retry(self) -> None:
+        """Wake the worker when the earliest pending retry becomes due."""
+        event = self.search([("state", "=", "queued")], order="next_attempt_at", limit=1)
+        cron = self.env.ref(
+            "dojo_bridge.ir_cron_bridge_process_webhooks", raise_if_not_found=False
+        )
+        if event and cron:
+            cron._trigger(max(event.next_attempt_at, fields.Datetime.now()))
+
+    @api.model
+    def _purge_finished(self) -> None:
+        self.env.cr.execute(
+            "DELETE FROM x_bridge_webhook_event "
+            "WHERE state IN ('done', 'rejected') AND processed_at < %s",
+            [fields.Datetime.now() - timedelta(days=_RETENTION_DAYS)],
+        )
+
+    # ── admin actions ─────────────────────────────────────────────────────────
+
+    def action_requeue(self):
+        """Send dead-lettered / rejected events back to the queue."""
+        self.filtered(lambda e: e.state in ("dead", "rejected")).write({
+            "state": "queued",
+            "attempts": 0,
+            "next_attempt_at": fields.Datetime.now(),
+            "processed_at": False,
+        })
+        self.trigger_worker()
+
+    # ── metrics ───────────────────────────────────────────────────────────────
+
+    @api.model
+    def queue_metrics(self) -> dict:
+        """
+        Queue depth by state plus per-event-type latency over the last 24 h:
+          { "depth": int, "oldest_queued_seconds": int, "states": {...},
+            "event_types": { type: { count, avg_latency_ms, max_latency_ms,
+                                     avg_handler_ms } } }
+        """
+        self.flush_model()
+        cr = self.env.cr
+        cr.execute(
+            """
+            SELECT state, COUNT(*),
+                   EXTRACT(EPOCH FROM (now() AT TIME ZONE 'UTC' - MIN(received_at)))
+              FROM x_bridge_webhook_event
+             GROUP BY state
+            """
+        )
+        states = {}
+        oldest = 0
+        for state, count, age in cr.fetchall():
+            states[state] = count
+            if state == "queued":
+                oldest = int(age or 0)
+        cr.execute(
+            """
+            SELECT event_type, COUNT(*), AVG(latency_ms), MAX(latency_ms), AVG(handler_ms)
+              FROM x_bridge_webhook_event
+             WHERE state = 'done' AND processed_at >= %s
+             GROUP BY event_type
+            """,
+            [fields.Datetime.now() - timedelta(hours=24)],
+        )
+        event_types = {
+            event_type: {
+                "count": count,
+                "avg_latency_ms": round(float(avg_latency or 0), 1),
+                "max_latency_ms": max_latency or 0,
+                "avg_handler_ms": round(float(avg_handler or 0), 1),
+            }
+            for event_type, count, avg_latency, max_latency, avg_handler in cr.fetchall()
+        }
+        return {
+            "depth": states.get("queued", 0),
+            "oldest_queued_seconds": oldest,
+            "states": states,
+            "event_types": event_types,
+        }
+
+
+class _NotAccepted(Exception):
+    """The handler returned accepted=False (business-level failure)."""
@@ -1,8 +1,18 @@
 from datetime import datetime, timedelta
+import logging
+import time
 
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Fields that change which days a template generates sessions for.
+_RECURRENCE_SCHEDULE_FIELDS = {
+    "recurrence_active", "recurrence_start_date", "recurrence_end_date",
+    "rec_mon", "rec_tue", "rec_wed", "rec_thu", "rec_fri", "rec_sat", "rec_sun",
+}
+
 
 class DojoClassTemplate(models.Model):
     _name = "dojo.class.template"
@@ -63,6 +73,18 @@ class DojoClassTemplate(models.Model):
     recurrence_instructor_id = fields.Many2one(
         "dojo.instructor.profile", string="Recurring Instructor"
     )
+    # Generator bookkeeping
+    recurrence_generated_through = fields.Date(
+        string="Generated Through",
+        readonly=True,
+        copy=False,
+        help="Last day already materialized by the recurrence generator. "
+             "Reset when the schedule changes.",
+    )
+    recurrence_last_run = fields.Datetime(string="Last Generation", readonly=True, copy=False)
+    recurrence_last_session_count = fields.Integer(string="Sessions Created (Last Run)", readonly=True, copy=False)
+    recurrence_last_enrollment_count = fields.Integer(string="Enrollments Created (Last Run)", readonly=True, copy=False)
+    recurrence_last_duration_ms = fields.Integer(string="Generation Time (ms)", readonly=True, copy=False)
 
     # ------------------------------------------------------------------ #
     #  Helpers                                                             #
@@ -85,145 +107,210 @@ class DojoClassTemplate(models.Model):
         Skips dates that already have a generated session for this template.
         """
         self.ensure_one()
-        if not self.recurrence_active:
-            return
-        today = fields.Date.today()
-        start = max(self.recurrence_start_date or today, today)
-        end_limit = today + timedelta(days=horizon_days)
-        end = min(self.recurrence_end_date or end_limit, end_limit)
-        if start > end:
-            return
+        self._generate_recurring_sessions(horizon_days=horizon_days)
 
-        active_weekdays = {
-            iso_day
-            for iso_day, fname in self._weekday_flags()
-            if getattr(self, fname)
-        }
-        if not active_weekdays:
-            return
+    def _generate_recurring_sessions(self, horizon_days=60, full_scan=False):
+        """Materialize recurring sessions (and course enrollments) for these templates.
 
-        # Pre-fetch already-generated datetimes to avoid duplicates
-        existing = self.env["dojo.class.session"].search(
-            [
-                ("template_id", "=", self.id),
-                ("generated_from_recurrence", "=", True),
-                ("start_datetime", ">=", datetime.combine(start, datetime.min.time())),
-                ("start_datetime", "<=", datetime.combine(end, datetime.max.time())),
-            ]
-        )
-        existing_dates = {s.start_datetime.date() for s in existing}
+        Each template only plans the days after its recurrence_generated_through
+        watermark unless *full_scan* is set, so the daily run scales with the
+        new days entering the horizon rather than with the horizon itself.
+        Sessions and enrollments of all templates are created with one
+        create(vals_list) each.  Per-template counts and timing are stored in
+        the recurrence_last_* fields.
+        """
+        today = fields.Date.today()
+        end_limit = today + timedelta(days=horizon_days)
+        run_start = time.perf_counter()
 
-        hour, frac = divmod(self.recurrence_time, 1)
-        hour = int(hour)
-        minute = min(59, int(round(frac * 60)))
-        duration = timedelta(minutes=self.duration_minutes or 60)
+        # ── 1. Plan the new days of every template ───────────────────────
+        plans = []  # (template, start, end, [dates])
+        plan_ms = {}
+        for tmpl in self.filtered("recurrence_active"):
+            t0 = time.perf_counter()
+            start = max(tmpl.recurrence_start_date or today, today)
+            if not full_scan and tmpl.recurrence_generated_through:
+                start = max(start, tmpl.recurrence_generated_through + timedelta(days=1))
+            end = min(tmpl.recurrence_end_date or end_limit, end_limit)
+            active_weekdays = {
+                iso_day
+                for iso_day, fname in tmpl._weekday_flags()
+                if getattr(tmpl, fname)
+            }
+            dates = []
+            if start <= end and active_weekdays:
+                dates = [
+                    start + timedelta(days=offset)
+                    for offset in range((end - start).days + 1)
+                    if (start + timedelta(days=offset)).weekday() in active_weekdays
+                ]
+            plans.append((tmpl, start, end, dates))
+            plan_ms[tmpl.id] = (time.perf_counter() - t0) * 1000
+        to_plan = [p for p in plans if p[3]]
 
-        current = start
         Session = self.env["dojo.class.session"]
         Enrollment = self.env["dojo.class.enrollment"]
-
-        # Bulk-fetch all auto-enroll preferences for this template keyed by member_id.
-        # We fetch with active_test=False so opted-out (active=False) records are included.
-        pref_by_member = {
-            pref.member_id.id: pref
-            for pref in self.env["dojo.course.auto.enroll"].with_context(
-                active_test=False
-            ).search([("template_id", "=", self.id)])
-        }
-
-        # Pre-compute billing-period end date per member.
-        # Auto-enrollment is capped to each member's current billing period so
-        # we never consume credits that belong to a future period. When the
-        # period renews (new grant issued) the daily cron will pick up the
-        # remaining sessions automatically.
-        # None = no cap (unlimited plan, drop-in, or no active subscription).
-        _Sub = self.env["dojo.member.subscription"]
-        _tmpl_program = self.program_id
-        period_end_by_member = {}
-        for _m in self.course_member_ids:
-            _active_subs = _Sub.search([
-                ("member_id", "=", _m.id),
-                ("state", "=", "active"),
+        session_vals = []
+        session_keys = []  # (template, date) per entry of session_vals
+        if to_plan:
+            # Pre-fetch already-generated dates of all templates to avoid duplicates
+            existing = Session.search([
+                ("template_id", "in", [p[0].id for p in to_plan]),
+                ("generated_from_recurrence", "=", True),
+                ("start_datetime", ">=", datetime.combine(min(p[1] for p in to_plan), datetime.min.time())),
+                ("start_datetime", "<=", datetime.combine(max(p[2] for p in to_plan), datetime.max.time())),
             ])
-            _matched = None
-            for _s in _active_subs:
-                _plan = _s.plan_id
-                _ptype = getattr(_plan, "plan_type", False)
-                if _tmpl_program and _ptype == "program" and getattr(_plan, "program_id", False) == _tmpl_program:
-                    _matched = _s
-                    break
-                if _ptype == "course" and self in getattr(_plan, "allowed_template_ids", _Sub.browse()):
-                    _matched = _s
-                    break
-            if not _matched:
-                period_end_by_member[_m.id] = None  # no sub found — no cap
-                continue
-            _cpp = getattr(_matched.plan_id, "credits_per_period", 0)
-            if not _cpp:
-                period_end_by_member[_m.id] = None  # unlimited plan — no cap
-                continue
-            _nbd = _matched.next_billing_date
-            # next_billing_date is the first day of the *next* period, so the
-            # last valid day of the current period is next_billing_date - 1.
-            period_end_by_member[_m.id] = (_nbd - timedelta(days=1)) if _nbd else None
+            existing_keys = {(s.template_id.id, s.start_datetime.date()) for s in existing}
 
-        while current <= end:
-            if current.weekday() in active_weekdays and current not in existing_dates:
-                start_dt = datetime(current.year, current.month, current.day, hour, minute)
-                end_dt = start_dt + duration
+            for tmpl, _start, _end, dates in to_plan:
+                hour, frac = divmod(tmpl.recurrence_time, 1)
+                hour = int(hour)
+                minute = min(59, int(round(frac * 60)))
+                duration = timedelta(minutes=tmpl.duration_minutes or 60)
                 # Resolve instructor: prefer the dedicated recurrence_instructor_id,
                 # then fall back to the first entry in instructor_profile_ids.
                 # Use active_test=False so an archived instructor is still readable.
                 instructor_id = (
-                    self.with_context(active_test=False).recurrence_instructor_id.id
-                    or (self.instructor_profile_ids[0].id if self.instructor_profile_ids else False)
+                    tmpl.with_context(active_test=False).recurrence_instructor_id.id
+                    or (tmpl.instructor_profile_ids[0].id if tmpl.instructor_profile_ids else False)
                 )
-                session = Session.create(
-                    {
-                        "template_id": self.id,
-                        "company_id": self.company_id.id,
+                for current in dates:
+                    if (tmpl.id, current) in existing_keys:
+                        continue
+                    start_dt = datetime(current.year, current.month, current.day, hour, minute)
+                    session_vals.append({
+                        "template_id": tmpl.id,
+                        "company_id": tmpl.company_id.id,
                         "instructor_profile_id": instructor_id,
                         "start_datetime": start_dt,
-                        "end_datetime": end_dt,
-                        "capacity": self.max_capacity,
+                        "end_datetime": start_dt + duration,
+                        "capacity": tmpl.max_capacity,
                         "state": "open",
                         "generated_from_recurrence": True,
-                        "recurrence_template_id": self.id,
-                    }
-                )
+                        "recurrence_template_id": tmpl.id,
+                    })
+                    session_keys.append((tmpl, current))
+
+        # ── 2. Create all sessions, then all course enrollments ──────────
+        t0 = time.perf_counter()
+        sessions = Session.create(session_vals) if session_vals else Session
+        enroll_vals = []
+        enroll_count = {}
+        if sessions:
+            planned = {tmpl for tmpl, _date in session_keys}
+            templates = self.browse([t.id for t in planned])
+            pref_by_key, period_end_by_key = templates._recurrence_enrollment_context()
+            for session, (tmpl, current) in zip(sessions, session_keys):
                 # Auto-enroll course members, respecting each member's preference.
                 # No preference record  → enroll on all days (backward-compatible default).
                 # active=False          → skip (explicit opt-out).
                 # active=True           → defer to should_enroll_on_date().
-                for member in self.course_member_ids:
-                    pref = pref_by_member.get(member.id)
-                    if pref is None:
-                        # No preference: enroll (default)
-                        enroll = True
-                    else:
-                        enroll = pref.should_enroll_on_date(current)
-                    if enroll:
-                        # Defer sessions that fall outside the member's current
-                        # billing period — credits for those days aren't issued yet.
-                        _p_end = period_end_by_member.get(member.id)
-                        if _p_end is not None and current > _p_end:
-                            continue
-                        Enrollment.with_context(
-                            skip_subscription_check=True,
-                            skip_course_membership_check=True,
-                        ).create(
-                            {
-                                "session_id": session.id,
-                                "member_id": member.id,
-                                "status": "registered",
-                            }
-                        )
-            current += timedelta(days=1)
+                for member in tmpl.course_member_ids:
+                    pref = pref_by_key.get((tmpl.id, member.id))
+                    enroll = True if pref is None else pref.should_enroll_on_date(current)
+                    if not enroll:
+                        continue
+                    # Defer sessions that fall outside the member's current
+                    # billing period — credits for those days aren't issued yet.
+                    p_end = period_end_by_key.get((tmpl.id, member.id))
+                    if p_end is not None and current > p_end:
+                        continue
+                    enroll_vals.append({
+                        "session_id": session.id,
+                        "member_id": member.id,
+                        "status": "registered",
+                    })
+                    enroll_count[tmpl.id] = enroll_count.get(tmpl.id, 0) + 1
+            if enroll_vals:
+                Enrollment.with_context(
+                    skip_subscription_check=True,
+                    skip_course_membership_check=True,
+                ).create(enroll_vals)
+        create_ms = (time.perf_counter() - t0) * 1000
 
-    def action_generate_sessions(self):
-        """Manual trigger from the form view button."""
+        # ── 3. Advance watermarks and record per-template stats ──────────
+        session_count = {}
+        for tmpl, _date in session_keys:
+            session_count[tmpl.id] = session_count.get(tmpl.id, 0) + 1
+        now = fields.Datetime.now()
+        for tmpl, start, end, _dates in plans:
+            created = session_count.get(tmpl.id, 0)
+            # Bulk creation time is apportioned by the template's share of sessions
+            share = create_ms * created / len(session_vals) if session_vals else 0.0
+            vals = {
+                "recurrence_last_run": now,
+                "recurrence_last_session_count": created,
+                "recurrence_last_enrollment_count": enroll_count.get(tmpl.id, 0),
+                "recurrence_last_duration_ms": int(round(plan_ms[tmpl.id] + share)),
+            }
+            if start <= end:
+                vals["recurrence_generated_through"] = end
+            tmpl.write(vals)
+        _logger.info(
+            "Recurring sessions: %d template(s), %d session(s), %d enrollment(s) in %.0f ms",
+            len(plans), len(session_vals), len(enroll_vals),
+            (time.perf_counter() - run_start) * 1000,
+        )
+        return sessions
+
+    def _recurrence_enrollment_context(self):
+        """Prefetch auto-enroll preferences and billing-period caps for these templates.
+
+        Returns two dicts keyed by (template_id, member_id): the preference
+        record, and the last day of the member's current billing period
+        (None = no cap).
+        """
+        member_ids = self.course_member_ids.ids
+
+        # Bulk-fetch all auto-enroll preferences keyed by (template, member).
+        # We fetch with active_test=False so opted-out (active=False) records are included.
+        pref_by_key = {
+            (pref.template_id.id, pref.member_id.id): pref
+            for pref in self.env["dojo.course.auto.enroll"].with_context(
+                active_test=False
+            ).search([("template_id", "in", self.ids), ("member_id", "in", member_ids)])
+        }
+
+        # Pre-compute billing-period end date per (template, member).
+        # Auto-enrollment is capped to each member's current billing period so
+        # we never consume credits that belong to a future period. When the
+        # period renews (new grant issued) the daily cron will pick up the
+        # remaining sessions automatically.
+        # None = no cap (unlimited plan, drop-in, or no active subscription).
+        _Sub = self.env["dojo.member.subscription"]
+        subs_by_member = {}
+        for _s in _Sub.search([("member_id", "in", member_ids), ("state", "=", "active")]):
+            subs_by_member.setdefault(_s.member_id.id, []).append(_s)
+        period_end_by_key = {}
         for tmpl in self:
-            tmpl._generate_sessions_for_template(horizon_days=60)
+            _tmpl_program = tmpl.program_id
+            for _m in tmpl.course_member_ids:
+                _matched = None
+                for _s in subs_by_member.get(_m.id, []):
+                    _plan = _s.plan_id
+                    _ptype = getattr(_plan, "plan_type", False)
+                    if _tmpl_program and _ptype == "program" and getattr(_plan, "program_id", False) == _tmpl_program:
+                        _matched = _s
+                        break
+                    if _ptype == "course" and tmpl in getattr(_plan, "allowed_template_ids", _Sub.browse()):
+                        _matched = _s
+                        break
+                if not _matched:
+                    period_end_by_key[(tmpl.id, _m.id)] = None  # no sub found — no cap
+                    continue
+                _cpp = getattr(_matched.plan_id, "credits_per_period", 0)
+                if not _cpp:
+                    period_end_by_key[(tmpl.id, _m.id)] = None  # unlimited plan — no cap
+                    continue
+                _nbd = _matched.next_billing_date
+                # next_billing_date is the first day of the *next* period, so the
+                # last valid day of the current period is next_billing_date - 1.
+                period_end_by_key[(tmpl.id, _m.id)] = (_nbd - timedelta(days=1)) if _nbd else None
+        return pref_by_key, period_end_by_key
+
+    def action_generate_sessions(self):
+        """Manual trigger from the form view button (re-scans the whole horizon)."""
+        self._generate_recurring_sessions(horizon_days=60, full_scan=True)
         return {
             "type": "ir.actions.client",
             "tag": "display_notification",
@@ -240,6 +327,10 @@ class DojoClassTemplate(models.Model):
         When recurrence_instructor_id changes, update the instructor on all future
         generated sessions so the change takes immediate effect.
         """
+        # A changed schedule must be re-planned over the whole horizon
+        if _RECURRENCE_SCHEDULE_FIELDS & set(vals) and 'recurrence_generated_through' not in vals:
+            vals = dict(vals, recurrence_generated_through=False)
+
         removed_per_template = {}
         if 'course_member_ids' in vals:
             for tmpl in self:
@@ -342,7 +433,6 @@ class DojoClassTemplate(models.Model):
 
     @api.model
     def _cron_generate_recurring_sessions(self):
-        """Daily cron — process all active recurring templates."""
+        """Daily cron — process all active recurring templates in one batch."""
         templates = self.search([("recurrence_active", "=", True)])
-        for tmpl in templates:
-            tmpl._generate_sessions_for_template(horizon_days=60)
+        templates._generate_recurring_sessions(horizon_days=60)
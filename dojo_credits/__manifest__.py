@@ -12,6 +12,7 @@
     "data": [
         "security/ir.model.access.csv",
         "data/sequences.xml",
+        "data/ir_cron.xml",
         "views/dojo_credit_transaction_views.xml",
         "views/dojo_subscription_plan_views.xml",
         "views/dojo_program_credit_views.xml",
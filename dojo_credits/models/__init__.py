@@ -1,7 +1,11 @@
 from . import dojo_credit_transaction
+# Before the subscription extension: its init() rebuilds balances from a
+# query that reads the archive table, so that table must exist first.
+from . import dojo_credit_ledger_archive
 from . import dojo_plan_credit_extend
 from . import dojo_program_credit_extend
 from . import dojo_subscription_credit_extend
 from . import dojo_enrollment_credit_extend
 from . import dojo_attendance_credit_extend
 from . import dojo_session_credit_extend
+from . import dojo_credit_balance_snapshot
@@ -0,0 +1,107 @@
+"""
+dojo.credit.balance.snapshot — daily, verified copy of every subscription's
+credit balance.
+
+The balance itself lives in stored columns on dojo.member.subscription that
+are moved by ledger deltas.  The daily job here re-derives those totals from
+dojo.credit.transaction in one grouped statement, repairs any subscription
+whose stored value drifted, and records the verified figures (and the drift
+it found) as one snapshot row per subscription and day.
+"""
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .dojo_subscription_credit_extend import LEDGER_TOTALS_CTE
+
+_logger = logging.getLogger(__name__)
+
+_SNAPSHOT_RETENTION_DAYS = 90
+
+
+class DojoCreditBalanceSnapshot(models.Model):
+    _name = "dojo.credit.balance.snapshot"
+    _description = "Dojo Credit Balance Snapshot"
+    _order = "snapshot_date desc, id desc"
+    _log_access = False
+
+    subscription_id = fields.Many2one(
+        "dojo.member.subscription",
+        required=True,
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    snapshot_date = fields.Date(required=True, readonly=True, index=True)
+    credit_confirmed = fields.Integer(readonly=True)
+    credit_pending = fields.Integer(readonly=True)
+    credit_balance = fields.Integer(readonly=True)
+    drift = fields.Integer(
+        readonly=True,
+        help="Stored balance minus ledger balance found before the repair (0 = in sync).",
+    )
+
+    _dojo_credit_balance_snapshot_uniq = models.Constraint(
+        "unique(subscription_id, snapshot_date)",
+        "Only one balance snapshot per subscription and day is allowed.",
+    )
+
+    @api.model
+    def _cron_verify_balances(self):
+        """Verify stored balances against the ledger, repair drift, snapshot."""
+        today = fields.Date.context_today(self)
+        self.env["dojo.credit.transaction"].flush_model(["subscription_id", "amount", "status"])
+        self.env["dojo.member.subscription"].flush_model(
+            ["credit_confirmed", "credit_pending", "credit_balance"]
+        )
+        # All CTEs see the same snapshot, so `ledger.stored_balance` is the
+        # pre-repair value even though `repaired` updates the same rows.
+        self.env.cr.execute(
+            f"""
+            WITH {LEDGER_TOTALS_CTE},
+            repaired AS (
+                UPDATE dojo_member_subscription s
+                   SET credit_confirmed = l.confirmed,
+                       credit_pending = l.pending,
+                       credit_balance = l.confirmed + l.pending
+                  FROM ledger l
+                 WHERE s.id = l.subscription_id
+                   AND (s.credit_confirmed IS DISTINCT FROM l.confirmed
+                        OR s.credit_pending IS DISTINCT FROM l.pending
+                        OR s.credit_balance IS DISTINCT FROM l.confirmed + l.pending)
+                RETURNING s.id
+            )
+            INSERT INTO dojo_credit_balance_snapshot
+                (subscription_id, snapshot_date, credit_confirmed, credit_pending,
+                 credit_balance, drift)
+            SELECT l.subscription_id, %(today)s, l.confirmed, l.pending,
+                   l.confirmed + l.pending,
+                   COALESCE(l.stored_balance, 0) - (l.confirmed + l.pending)
+              FROM ledger l
+             WHERE l.transaction_count > 0
+                OR l.subscription_id IN (SELECT id FROM repaired)
+            ON CONFLICT (subscription_id, snapshot_date) DO UPDATE SET
+                credit_confirmed = EXCLUDED.credit_confirmed,
+                credit_pending = EXCLUDED.credit_pending,
+                credit_balance = EXCLUDED.credit_balance,
+                drift = EXCLUDED.drift
+            RETURNING subscription_id, drift
+            """,
+            {"today": today},
+        )
+        rows = self.env.cr.fetchall()
+        drifted = [(sub_id, drift) for sub_id, drift in rows if drift]
+        self.env["dojo.member.subscription"].invalidate_model(
+            ["credit_confirmed", "credit_pending", "credit_balance"]
+        )
+        if drifted:
+            _logger.warning(
+                "Credit balances: repaired drift on %d subscription(s): %s",
+                len(drifted), drifted[:20],
+            )
+        self.env.cr.execute(
+            "DELETE FROM dojo_credit_balance_snapshot WHERE snapshot_date < %s",
+            [today - timedelta(days=_SNAPSHOT_RETENTION_DAYS)],
+        )
+        _logger.info("Credit balances: %d subscription(s) verified and snapshotted.", len(rows))
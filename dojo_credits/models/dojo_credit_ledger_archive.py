@@ -0,0 +1,146 @@
+"""
+dojo.credit.ledger.archive — monthly roll-up of settled credit transactions.
+
+dojo.credit.transaction only ever grows (a grant, a hold and its settlement
+for every class booked), so settled history is moved out of the hot ledger:
+confirmed and cancelled rows older than _HOT_MONTHS are summed into one
+archive row per subscription, month, type and status, and deleted from the
+ledger in the same statement.  Pending holds are never archived.
+
+Balances are unaffected: the stored subscription balance is not touched by
+the move, and the ledger totals used by the rebuild / verification job
+(LEDGER_TOTALS_CTE) add the archived confirmed amounts back in.  Archive
+rows stay reportable (list / pivot by member, month and type).
+"""
+import logging
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Settled transactions younger than this many months stay in the hot ledger.
+_HOT_MONTHS = 6
+# Ledger rows moved per statement (and per commit) by the archival job.
+_ARCHIVE_BATCH_SIZE = 5000
+
+
+class DojoCreditLedgerArchive(models.Model):
+    _name = "dojo.credit.ledger.archive"
+    _description = "Dojo Credit Ledger Archive"
+    _order = "period desc, subscription_id, transaction_type, status"
+    _log_access = False
+
+    subscription_id = fields.Many2one(
+        "dojo.member.subscription",
+        string="Subscription",
+        required=True,
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    member_id = fields.Many2one("dojo.member", readonly=True, index=True)
+    period = fields.Date(
+        string="Month",
+        required=True,
+        readonly=True,
+        help="First day of the month the archived transactions were dated in.",
+    )
+    transaction_type = fields.Selection(
+        [
+            ("grant", "Credit Grant"),
+            ("hold", "Class Hold"),
+            ("expiry", "Expiry"),
+            ("adjustment", "Manual Adjustment"),
+        ],
+        string="Type",
+        required=True,
+        readonly=True,
+    )
+    status = fields.Selection(
+        [("confirmed", "Confirmed"), ("cancelled", "Cancelled")],
+        required=True,
+        readonly=True,
+    )
+    amount = fields.Integer(readonly=True)
+    transaction_count = fields.Integer(string="Transactions", readonly=True)
+    first_date = fields.Datetime(readonly=True)
+    last_date = fields.Datetime(readonly=True)
+
+    _dojo_credit_ledger_archive_uniq = models.Constraint(
+        "unique(subscription_id, period, transaction_type, status)",
+        "Only one archive row per subscription, month, type and status is allowed.",
+    )
+
+    @api.model
+    def _cron_archive_ledger(self):
+        """Move settled transactions older than _HOT_MONTHS into the archive."""
+        cutoff = fields.Date.context_today(self).replace(day=1) - relativedelta(months=_HOT_MONTHS)
+        commit = not self.env.registry.in_test_mode()
+        total = 0
+        while True:
+            moved = self._archive_batch(cutoff, _ARCHIVE_BATCH_SIZE)
+            total += moved
+            if commit:
+                self.env.cr.commit()
+            if moved < _ARCHIVE_BATCH_SIZE:
+                break
+        if total:
+            _logger.info(
+                "Credit ledger: archived %d settled transaction(s) dated before %s.",
+                total, cutoff,
+            )
+        return total
+
+    @api.model
+    def _archive_batch(self, cutoff, limit):
+        """Roll up and delete at most *limit* settled ledger rows dated before
+        *cutoff*, in one statement.  Returns the number of rows moved."""
+        Transaction = self.env["dojo.credit.transaction"]
+        Transaction.flush_model()
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            WITH batch AS (
+                SELECT id
+                  FROM dojo_credit_transaction
+                 WHERE status IN ('confirmed', 'cancelled')
+                   AND date < %(cutoff)s
+                 ORDER BY id
+                 LIMIT %(limit)s
+                   FOR UPDATE SKIP LOCKED
+            ), moved AS (
+                DELETE FROM dojo_credit_transaction t
+                 USING batch b
+                 WHERE t.id = b.id
+                RETURNING t.subscription_id, t.member_id, t.transaction_type,
+                          t.status, t.amount, t.date
+            ), rolled AS (
+                INSERT INTO dojo_credit_ledger_archive AS a
+                    (subscription_id, member_id, period, transaction_type, status,
+                     amount, transaction_count, first_date, last_date)
+                SELECT subscription_id, MAX(member_id),
+                       date_trunc('month', date)::date, transaction_type, status,
+                       SUM(amount), COUNT(*), MIN(date), MAX(date)
+                  FROM moved
+                 GROUP BY subscription_id, date_trunc('month', date)::date,
+                          transaction_type, status
+                ON CONFLICT (subscription_id, period, transaction_type, status) DO UPDATE SET
+                    amount = a.amount + EXCLUDED.amount,
+                    transaction_count = a.transaction_count + EXCLUDED.transaction_count,
+                    first_date = LEAST(a.first_date, EXCLUDED.first_date),
+                    last_date = GREATEST(a.last_date, EXCLUDED.last_date)
+            )
+            SELECT COUNT(*) FROM moved
+            """,
+            {"cutoff": cutoff, "limit": limit},
+        )
+        moved = self.env.cr.fetchone()[0]
+        if moved:
+            Transaction.invalidate_model()
+            self.invalidate_model()
+            self.env["dojo.member.subscription"].invalidate_model(
+                ["transaction_ids", "credit_archive_ids"]
+            )
+        return moved
@@ -2,8 +2,11 @@
 dojo.credit.transaction — immutable(ish) double-entry credit ledger.
 
 Every credit movement is recorded as a row here.  The subscription's
-available balance is always derived from the live sum of this table — no
-denormalised balance field to drift out of sync.
+stored balance fields are kept in step with this table: create / write /
+unlink push signed deltas to dojo.member.subscription._apply_credit_deltas()
+in the same transaction, and a daily verification job
+(dojo.credit.balance.snapshot) re-derives them from the ledger.  Settled
+rows older than a few months are rolled up into dojo.credit.ledger.archive.
 
 Transaction lifecycle
 ─────────────────────
@@ -17,10 +20,12 @@ Transaction lifecycle
 Balance formula
 ───────────────
   effective_balance = SUM(amount) WHERE status != 'cancelled'
+                    = credit_confirmed + credit_pending   (stored on the subscription)
 
 This includes pending holds (negative), so a member cannot over-book.
 """
 import logging
+from collections import defaultdict
 
 from odoo import api, fields, models
 
@@ -28,6 +33,9 @@ _logger = logging.getLogger(__name__)
 
 CANCEL_REFUND_HOURS = 24  # hours before session start to qualify for a refund
 
+# Fields whose change moves the stored subscription balance.
+_BALANCE_FIELDS = {"amount", "status", "subscription_id"}
+
 
 class DojoCreditTransaction(models.Model):
     _name = "dojo.credit.transaction"
@@ -129,4 +137,43 @@ class DojoCreditTransaction(models.Model):
         for vals in vals_list:
             if vals.get("reference", "New") == "New" and seq:
                 vals["reference"] = seq.next_by_id()
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        records._push_balance_deltas(records._balance_contributions())
+        return records
+
+    def write(self, vals):
+        if not _BALANCE_FIELDS.intersection(vals):
+            return super().write(vals)
+        before = self._balance_contributions()
+        result = super().write(vals)
+        self._push_balance_deltas(self._balance_contributions(), before)
+        return result
+
+    def unlink(self):
+        before = self._balance_contributions()
+        result = super().unlink()
+        self._push_balance_deltas({}, before)
+        return result
+
+    # ── Stored balance maintenance ────────────────────────────────────────
+
+    def _balance_contributions(self):
+        """Return {subscription_id: [confirmed, pending]} summed over self."""
+        totals = defaultdict(lambda: [0, 0])
+        for txn in self:
+            if txn.status == "confirmed":
+                totals[txn.subscription_id.id][0] += txn.amount
+            elif txn.status == "pending":
+                totals[txn.subscription_id.id][1] += txn.amount
+        return totals
+
+    @api.model
+    def _push_balance_deltas(self, after, before=None):
+        """Apply the difference between two _balance_contributions() maps."""
+        before = before or {}
+        deltas = {}
+        for sub_id in set(after) | set(before):
+            new = after.get(sub_id, (0, 0))
+            old = before.get(sub_id, (0, 0))
+            deltas[sub_id] = (new[0] - old[0], new[1] - old[1])
+        self.env["dojo.member.subscription"]._apply_credit_deltas(deltas)
@@ -2,9 +2,10 @@
 Credit hooks on dojo.class.enrollment:
 
 create():
-  When status='registered', find the member's active subscription that covers
-  the session's program, lock the subscription row, verify balance, and place
-  a 'hold' transaction.
+  For the registered enrollments of the batch, find each member's active
+  subscription that covers the session's program, lock those subscription
+  rows once, verify balances, and place all 'hold' transactions in one
+  create() (see _place_credit_holds()).
 
 write({'status': 'cancelled'}):
   Find the pending hold for each cancelled enrollment.
@@ -30,98 +31,138 @@ class DojoClassEnrollmentCreditExtend(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         records = super().create(vals_list)
-        auto_enroll = self.env.context.get("skip_subscription_check", False)
-        for enrollment in records:
-            if enrollment.status != "registered":
-                continue
-            try:
-                self._place_credit_hold(enrollment)
-            except UserError as e:
-                if auto_enroll:
-                    # Auto-enroll (cron) context: log and cancel rather than
-                    # crashing the entire session-generation transaction.
-                    _logger.warning(
-                        "Auto-enroll: insufficient credits for %s in session %s — "
-                        "enrollment cancelled. (%s)",
-                        enrollment.member_id.display_name,
-                        enrollment.session_id.id,
-                        e,
-                    )
-                    enrollment.write({"status": "cancelled"})
-                else:
-                    raise
+        self._place_holds_or_cancel(records.filtered(lambda e: e.status == "registered"))
         return records
 
-    def _place_credit_hold(self, enrollment):
-        """Place a pending hold against the member's subscription balance."""
-        member = enrollment.member_id
-        session = enrollment.session_id
-        if not member or not session:
-            return
+    def _place_holds_or_cancel(self, enrollments):
+        """
+        Place holds for *enrollments* in one batch.
 
-        Sub = self.env["dojo.member.subscription"]
-        sub = Sub._find_subscription_for_session(member, session)
-        if not sub:
-            # No matching subscription found — possibly a drop-in or admin booking
+        Insufficient balances raise UserError, except in an auto-enroll
+        (cron) context where the affected enrollments are cancelled instead
+        of crashing the entire session-generation transaction.
+        """
+        if not enrollments:
             return
-
-        plan = sub.plan_id
-        credits_per_period = getattr(plan, "credits_per_period", 0)
-        if not credits_per_period:
-            # 0 = unlimited plan — no credit gate
+        outcomes = self._place_credit_holds(enrollments)
+        short = enrollments.filtered(lambda e: outcomes[e.id]["outcome"] == "insufficient")
+        if not short:
             return
+        if not self.env.context.get("skip_subscription_check", False):
+            raise UserError(outcomes[short[0].id]["message"])
+        for enrollment in short:
+            _logger.warning(
+                "Auto-enroll: insufficient credits for %s in session %s — "
+                "enrollment cancelled. (%s)",
+                enrollment.member_id.display_name,
+                enrollment.session_id.id,
+                outcomes[enrollment.id]["message"],
+            )
+        short.write({"status": "cancelled"})
 
-        program = session.template_id.program_id if session.template_id else False
-        cost = program.credits_per_class if program else 1
-        if cost <= 0:
-            return
+    def _place_credit_hold(self, enrollment):
+        """Place a pending hold against the member's subscription balance."""
+        outcome = self._place_credit_holds(enrollment)[enrollment.id]
+        if outcome["outcome"] == "insufficient":
+            raise UserError(outcome["message"])
+
+    def _place_credit_holds(self, enrollments):
+        """
+        Place pending holds for a batch of enrollments.
+
+        Each covering subscription is locked once for the whole batch and its
+        balance read once; holds are then allocated against a running balance
+        in enrollment order and inserted with a single create(vals_list).
+
+        Returns {enrollment_id: {"outcome": str, "message": str}} where
+        outcome is one of:
+          held          new pending hold created
+          reactivated   cancelled hold switched back to pending
+          exists        a pending hold was already in place
+          skipped       no credit gate (no subscription, unlimited plan, free class)
+          insufficient  balance too low — nothing was placed
+        """
+        outcomes = {e.id: {"outcome": "skipped", "message": ""} for e in enrollments}
+        enrollments = enrollments.filtered(lambda e: e.member_id and e.session_id)
+        if not enrollments:
+            return outcomes
 
-        # Thread-safe row lock
-        sub._lock_for_credit_write()
+        Sub = self.env["dojo.member.subscription"]
+        sub_by_enrollment = Sub._find_subscriptions_for_enrollments(enrollments)
+
+        # (enrollment, subscription, cost) for every credit-gated enrollment
+        gated = []
+        for enrollment in enrollments:
+            sub = sub_by_enrollment.get(enrollment.id)
+            if not sub:
+                # No matching subscription found — possibly a drop-in or admin booking
+                continue
+            if not getattr(sub.plan_id, "credits_per_period", 0):
+                # 0 = unlimited plan — no credit gate
+                continue
+            template = enrollment.session_id.template_id
+            program = template.program_id if template else False
+            cost = program.credits_per_class if program else 1
+            if cost <= 0:
+                continue
+            gated.append((enrollment, sub, cost))
+        if not gated:
+            return outcomes
 
-        # Check for an existing hold transaction for this enrollment
-        # (unique constraint on enrollment_id + transaction_type prevents duplicates)
-        existing_hold = self.env["dojo.credit.transaction"].search([
-            ("enrollment_id", "=", enrollment.id),
-            ("transaction_type", "=", "hold"),
-        ], limit=1)
+        subs = Sub.browse({sub.id for _e, sub, _c in gated})
+        # Thread-safe row locks, one statement for the whole batch
+        subs._lock_many_for_credit_write()
+        # Balances re-read inside the lock
+        balances = {sub.id: sub.credit_balance for sub in subs}
 
-        if existing_hold:
-            if existing_hold.status == "pending":
+        # (unique constraint on enrollment_id + transaction_type prevents duplicates)
+        existing = {
+            hold.enrollment_id.id: hold
+            for hold in self.env["dojo.credit.transaction"].search([
+                ("enrollment_id", "in", [e.id for e, _s, _c in gated]),
+                ("transaction_type", "=", "hold"),
+            ])
+        }
+
+        new_holds = []
+        reactivate = []
+        for enrollment, sub, cost in gated:
+            hold = existing.get(enrollment.id)
+            if hold and hold.status == "pending":
                 # Already a live hold — nothing to do
-                return
-            # Cancelled hold exists — reactivate it
-            # Re-read balance inside the lock
-            balance = sub.credit_balance
+                outcomes[enrollment.id]["outcome"] = "exists"
+                continue
+            balance = balances[sub.id]
             if balance < cost:
-                raise UserError(
-                    f"Insufficient credits. You have {balance} credit(s) but this "
-                    f"class costs {cost}. Please contact the front desk."
-                )
-            existing_hold.write({
-                "status": "pending",
+                outcomes[enrollment.id] = {
+                    "outcome": "insufficient",
+                    "message": (
+                        f"Insufficient credits. You have {balance} credit(s) but this "
+                        f"class costs {cost}. Please contact the front desk."
+                    ),
+                }
+                continue
+            balances[sub.id] = balance - cost
+            session = enrollment.session_id
+            vals = {
                 "amount": -cost,
+                "status": "pending",
                 "subscription_id": sub.id,
                 "note": f"Hold — {session.display_name or session.id}",
-            })
-            return
-
-        # Re-read balance inside the lock
-        balance = sub.credit_balance
-        if balance < cost:
-            raise UserError(
-                f"Insufficient credits. You have {balance} credit(s) but this "
-                f"class costs {cost}. Please contact the front desk."
-            )
-
-        self.env["dojo.credit.transaction"].create({
-            "subscription_id": sub.id,
-            "transaction_type": "hold",
-            "amount": -cost,
-            "status": "pending",
-            "enrollment_id": enrollment.id,
-            "note": f"Hold — {session.display_name or session.id}",
-        })
+            }
+            if hold:
+                # Cancelled hold exists — reactivate it
+                reactivate.append((hold, vals))
+                outcomes[enrollment.id]["outcome"] = "reactivated"
+            else:
+                new_holds.append(dict(vals, transaction_type="hold", enrollment_id=enrollment.id))
+                outcomes[enrollment.id]["outcome"] = "held"
+
+        for hold, vals in reactivate:
+            hold.write(vals)
+        if new_holds:
+            self.env["dojo.credit.transaction"].create(new_holds)
+        return outcomes
 
     # ── Write: handle cancellation ───────────────────────────────────────
 
@@ -142,20 +183,7 @@ class DojoClassEnrollmentCreditExtend(models.Model):
             self._handle_cancel_credit(enrollment)
 
         # Place a fresh hold for any reactivated enrollment
-        auto_enroll = self.env.context.get("skip_subscription_check", False)
-        for enrollment in reactivating:
-            try:
-                self._place_credit_hold(enrollment)
-            except UserError as e:
-                if auto_enroll:
-                    _logger.warning(
-                        "Auto-enroll reactivation: insufficient credits for %s — "
-                        "re-cancelling. (%s)",
-                        enrollment.member_id.display_name, e,
-                    )
-                    enrollment.write({"status": "cancelled"})
-                else:
-                    raise
+        self._place_holds_or_cancel(reactivating)
 
         return result
 
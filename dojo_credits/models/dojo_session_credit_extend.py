@@ -2,11 +2,14 @@
 Credit hook on dojo.class.session:
 
 write({'state': 'done'}):
-  When a session closes, find all enrolled members that never checked in
-  (attendance_state == 'pending' on the enrollment).  For each, confirm
-  the pending hold — they no-showed, so the credit is consumed.
+  When sessions close, find all enrolled members that never checked in
+  (attendance_state == 'pending' on the enrollment).  Their pending holds are
+  confirmed — they no-showed, so the credit is consumed.  All sessions closed
+  by one write are handled together: one search for the holds, one write to
+  confirm them and one write to mark the enrollments absent.
 """
 import logging
+from collections import Counter
 
 from odoo import models
 
@@ -23,45 +26,59 @@ class DojoClassSessionCreditExtend(models.Model):
 
         result = super().write(vals)
 
-        for session in closing:
-            self._process_no_shows(session)
+        if closing:
+            closing._process_no_shows_batch()
 
         return result
 
     def _process_no_shows(self, session):
+        """Single-session form of _process_no_shows_batch()."""
+        return session._process_no_shows_batch().get(session.id, {})
+
+    def _process_no_shows_batch(self):
         """
-        Sweep enrollments that are still registered but have no attendance log
-        (or have an 'absent' attendance log).  Confirm their pending holds.
+        Sweep enrollments of the sessions in self that are still registered
+        but have no attendance (attendance_state 'pending') and confirm their
+        pending holds.
+
+        Returns {session_id: {"no_shows": int, "holds_confirmed": int}}.
         """
-        # Find registered enrollments with no attendance or attendance=absent
-        pending_enrollments = session.enrollment_ids.filtered(
+        Enrollment = self.env["dojo.class.enrollment"]
+        track_attendance = "attendance_state" in Enrollment._fields
+        pending_enrollments = self.enrollment_ids.filtered(
             lambda e: e.status == "registered"
-            and getattr(e, "attendance_state", "pending") == "pending"
+            and (not track_attendance or e.attendance_state == "pending")
         )
+        report = {
+            session.id: {"no_shows": 0, "holds_confirmed": 0} for session in self
+        }
+        if not pending_enrollments:
+            return report
+
+        holds = self.env["dojo.credit.transaction"].sudo().search([
+            ("enrollment_id", "in", pending_enrollments.ids),
+            ("transaction_type", "=", "hold"),
+            ("status", "=", "pending"),
+        ])
+        if holds:
+            holds.write({
+                "status": "confirmed",
+                "note": "Hold confirmed — no-show when session closed",
+            })
 
-        for enrollment in pending_enrollments:
-            hold = self.env["dojo.credit.transaction"].search(
-                [
-                    ("enrollment_id", "=", enrollment.id),
-                    ("transaction_type", "=", "hold"),
-                    ("status", "=", "pending"),
-                ],
-                limit=1,
-            )
-            if hold:
-                hold.sudo().write({
-                    "status": "confirmed",
-                    "note": "Hold confirmed — no-show when session closed",
-                })
+        # Mark attendance on the enrollments themselves
+        if track_attendance:
+            pending_enrollments.sudo().write({"attendance_state": "absent"})
+
+        no_shows = Counter(pending_enrollments.mapped("session_id.id"))
+        confirmed = Counter(holds.mapped("enrollment_id.session_id.id"))
+        for session_id, counts in report.items():
+            counts["no_shows"] = no_shows.get(session_id, 0)
+            counts["holds_confirmed"] = confirmed.get(session_id, 0)
+            if counts["no_shows"]:
                 _logger.info(
-                    "No-show: credit hold %s confirmed for enrollment %s "
-                    "(member: %s, session: %s)",
-                    hold.reference,
-                    enrollment.id,
-                    enrollment.member_id.display_name,
-                    session.id,
+                    "No-show: session %s closed with %d no-show(s), "
+                    "%d credit hold(s) confirmed.",
+                    session_id, counts["no_shows"], counts["holds_confirmed"],
                 )
-
-            # Mark attendance on the enrollment itself
-            if hasattr(enrollment, "attendance_state"):
-                enrollment.sudo().write({"attendance_state": "absent"})
+        return report
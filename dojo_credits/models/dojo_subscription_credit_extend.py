@@ -1,11 +1,12 @@
 """
 Extensions to dojo.member.subscription:
   - O2m to credit transactions
-  - Computed balance fields (no stored denorm)
+  - Stored balance fields, maintained in SQL from ledger deltas
   - _issue_period_credits() — expire old balance, grant new
   - Hooks into action_generate_invoice() and _generate_household_invoice()
-  - Thread-safety helper _lock_for_credit_write()
-  - Classmethod _find_subscription_for_session(member, session)
+  - Thread-safety helpers _lock_for_credit_write() / _lock_many_for_credit_write()
+  - Classmethod _find_subscription_for_session(member, session) and its
+    batch form _find_subscriptions_for_enrollments(enrollments)
 """
 import logging
 
@@ -14,6 +15,35 @@ from odoo.exceptions import ValidationError, UserError
 
 _logger = logging.getLogger(__name__)
 
+# Per-subscription ledger totals, shared by the rebuild and the verification
+# job: hot transactions plus the confirmed amounts rolled up into
+# dojo.credit.ledger.archive.  Subscriptions without any get zeroes.
+LEDGER_TOTALS_CTE = """
+    ledger AS (
+        SELECT s.id AS subscription_id,
+               s.credit_balance AS stored_balance,
+               COALESCE(t.confirmed, 0) + COALESCE(a.confirmed, 0) AS confirmed,
+               COALESCE(t.pending, 0) AS pending,
+               COALESCE(t.row_count, 0) + COALESCE(a.row_count, 0) AS transaction_count
+          FROM dojo_member_subscription s
+          LEFT JOIN (
+                SELECT subscription_id,
+                       SUM(amount) FILTER (WHERE status = 'confirmed') AS confirmed,
+                       SUM(amount) FILTER (WHERE status = 'pending') AS pending,
+                       COUNT(*) AS row_count
+                  FROM dojo_credit_transaction
+                 GROUP BY subscription_id
+          ) t ON t.subscription_id = s.id
+          LEFT JOIN (
+                SELECT subscription_id,
+                       SUM(amount) FILTER (WHERE status = 'confirmed') AS confirmed,
+                       COUNT(*) AS row_count
+                  FROM dojo_credit_ledger_archive
+                 GROUP BY subscription_id
+          ) a ON a.subscription_id = s.id
+    )
+"""
+
 
 class DojoMemberSubscriptionCreditExtend(models.Model):
     _inherit = "dojo.member.subscription"
@@ -25,33 +55,107 @@ class DojoMemberSubscriptionCreditExtend(models.Model):
         string="Credit Transactions",
         readonly=True,
     )
+    credit_archive_ids = fields.One2many(
+        "dojo.credit.ledger.archive",
+        "subscription_id",
+        string="Archived Credit History",
+        readonly=True,
+    )
 
-    # ── Computed balance fields (always derived from ledger) ─────────────
+    # ── Stored balance fields (maintained from ledger deltas) ────────────
+    # Written only through _apply_credit_deltas() (dojo.credit.transaction
+    # create/write/unlink) and _rebuild_credit_balances(); reads are O(1).
     credit_balance = fields.Integer(
         string="Available Balance",
-        compute="_compute_credit_balance",
+        readonly=True,
+        copy=False,
         help="Effective balance: confirmed grants minus all non-cancelled holds and expiries.",
     )
     credit_pending = fields.Integer(
         string="Pending Holds",
-        compute="_compute_credit_balance",
+        readonly=True,
+        copy=False,
         help="Sum of pending (unconfirmed) hold amounts — always ≤ 0.",
     )
     credit_confirmed = fields.Integer(
         string="Confirmed Balance",
-        compute="_compute_credit_balance",
+        readonly=True,
+        copy=False,
         help="Sum of confirmed transactions only (does not count pending holds).",
     )
 
-    @api.depends("transaction_ids.amount", "transaction_ids.status")
-    def _compute_credit_balance(self):
-        for rec in self:
-            txns = rec.transaction_ids
-            confirmed = sum(t.amount for t in txns if t.status == "confirmed")
-            pending = sum(t.amount for t in txns if t.status == "pending")
-            rec.credit_confirmed = confirmed
-            rec.credit_pending = pending
-            rec.credit_balance = confirmed + pending  # pending is already negative
+    def init(self):
+        super().init()
+        # Backfill / repair the stored balances on install and upgrade.
+        self._rebuild_credit_balances()
+
+    # ── Balance maintenance ──────────────────────────────────────────────
+
+    @api.model
+    def _apply_credit_deltas(self, deltas):
+        """
+        Atomically add ledger deltas to the stored balances.
+
+        *deltas* maps subscription id → (confirmed_delta, pending_delta).
+        A single UPDATE ... FROM (VALUES ...) increments the columns in
+        place, so concurrent ledger writes on one subscription serialise on
+        its row lock instead of overwriting each other.
+        """
+        deltas = {
+            sub_id: (confirmed, pending)
+            for sub_id, (confirmed, pending) in deltas.items()
+            if sub_id and (confirmed or pending)
+        }
+        if not deltas:
+            return
+        values = ", ".join(["(%s, %s, %s)"] * len(deltas))
+        params = [v for sub_id, (c, p) in deltas.items() for v in (sub_id, c, p)]
+        self.env.cr.execute(
+            f"""
+            UPDATE dojo_member_subscription s
+               SET credit_confirmed = COALESCE(s.credit_confirmed, 0) + d.confirmed,
+                   credit_pending = COALESCE(s.credit_pending, 0) + d.pending,
+                   credit_balance = COALESCE(s.credit_balance, 0) + d.confirmed + d.pending
+              FROM (VALUES {values}) AS d(id, confirmed, pending)
+             WHERE s.id = d.id
+            """,
+            params,
+        )
+        self.browse(deltas).invalidate_recordset(
+            ["credit_confirmed", "credit_pending", "credit_balance"], flush=False
+        )
+
+    @api.model
+    def _rebuild_credit_balances(self, subscription_ids=None):
+        """
+        Recompute stored balances from the ledger in one grouped statement.
+
+        Only rows that actually differ are written.  Returns the ids of the
+        subscriptions that were corrected.
+        """
+        self.env["dojo.credit.transaction"].flush_model(["subscription_id", "amount", "status"])
+        self.flush_model(["credit_confirmed", "credit_pending", "credit_balance"])
+        self.env.cr.execute(
+            f"""
+            WITH {LEDGER_TOTALS_CTE}
+            UPDATE dojo_member_subscription s
+               SET credit_confirmed = l.confirmed,
+                   credit_pending = l.pending,
+                   credit_balance = l.confirmed + l.pending
+              FROM ledger l
+             WHERE s.id = l.subscription_id
+               AND (%(ids)s::int[] IS NULL OR s.id = ANY(%(ids)s::int[]))
+               AND (s.credit_confirmed IS DISTINCT FROM l.confirmed
+                    OR s.credit_pending IS DISTINCT FROM l.pending
+                    OR s.credit_balance IS DISTINCT FROM l.confirmed + l.pending)
+            RETURNING s.id
+            """,
+            {"ids": list(subscription_ids) if subscription_ids is not None else None},
+        )
+        fixed = [row[0] for row in self.env.cr.fetchall()]
+        if fixed:
+            self.invalidate_model(["credit_confirmed", "credit_pending", "credit_balance"])
+        return fixed
 
     # ── Helpers ──────────────────────────────────────────────────────────
 
@@ -74,15 +178,49 @@ class DojoMemberSubscriptionCreditExtend(models.Model):
                 "Please try again in a moment."
             )
 
+    def _lock_many_for_credit_write(self):
+        """
+        Batch form of _lock_for_credit_write(): lock every subscription in
+        self with one statement.
+
+        Rows are locked in id order and the statement waits for competing
+        transactions instead of failing with NOWAIT, so two bulk writers on
+        overlapping subscriptions queue up rather than abort (or deadlock).
+        """
+        if not self:
+            return
+        self.env.cr.execute(
+            "SELECT id FROM dojo_member_subscription "
+            "WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+            [sorted(self.ids)],
+        )
+        # Balances read after the lock must come from the database.
+        self.invalidate_recordset(["credit_confirmed", "credit_pending", "credit_balance"])
+
+    def _covers_session(self, session):
+        """True if this subscription's plan covers *session*.
+
+        Matching rules (in order):
+          1. The plan's program matches the session's program.
+          2. The plan's allowed templates include the session's template
+             (course-style subscriptions).
+        """
+        self.ensure_one()
+        plan = self.plan_id
+        template = session.template_id
+        program = template.program_id if template else False
+        if program and plan.plan_type == "program" and plan.program_id == program:
+            return True
+        if template and plan.plan_type == "course" and template in plan.allowed_template_ids:
+            return True
+        return False
+
     @api.model
     def _find_subscription_for_session(self, member, session):
         """
         Return the active subscription for *member* that covers *session*.
 
-        Matching rules (in order):
-          1. Subscription whose plan's program matches the session's program.
-          2. Subscription whose plan's allowed templates include the session's
-             template (course-style subscriptions).
+        See _covers_session() for the matching rules.
 
         Returns a single `dojo.member.subscription` record or empty recordset.
         """
@@ -90,19 +228,34 @@ class DojoMemberSubscriptionCreditExtend(models.Model):
             ("member_id", "=", member.id),
             ("state", "=", "active"),
         ])
-        program = session.template_id.program_id if session.template_id else False
-        template = session.template_id
-
         for sub in active_subs:
-            plan = sub.plan_id
-            # Program-based match
-            if program and plan.plan_type == "program" and plan.program_id == program:
-                return sub
-            # Template-based match
-            if template and plan.plan_type == "course" and template in plan.allowed_template_ids:
+            if sub._covers_session(session):
                 return sub
         return self.browse()
 
+    @api.model
+    def _find_subscriptions_for_enrollments(self, enrollments):
+        """
+        Batch form of _find_subscription_for_session().
+
+        Returns {enrollment_id: subscription} for every enrollment with a
+        covering active subscription, using a single search for all members.
+        """
+        active_subs = self.search([
+            ("member_id", "in", enrollments.member_id.ids),
+            ("state", "=", "active"),
+        ])
+        subs_by_member = {}
+        for sub in active_subs:
+            subs_by_member.setdefault(sub.member_id.id, []).append(sub)
+        result = {}
+        for enrollment in enrollments:
+            for sub in subs_by_member.get(enrollment.member_id.id, ()):
+                if sub._covers_session(enrollment.session_id):
+                    result[enrollment.id] = sub
+                    break
+        return result
+
     # ── Credit issuance ───────────────────────────────────────────────────
 
     def _issue_period_credits(self):
@@ -186,8 +339,10 @@ class DojoMemberSubscriptionCreditExtend(models.Model):
             credits_per_period = getattr(plan, "credits_per_period", 0)
             if not credits_per_period:
                 continue
-            # Only issue if no transactions exist yet (avoid double-granting)
-            if rec.transaction_ids:
+            # Only issue if no transactions exist yet (avoid double-granting).
+            # Archived history counts too; read it as superuser so the check
+            # never depends on the writer's access to the archive.
+            if rec.transaction_ids or rec.sudo().credit_archive_ids:
                 continue
             try:
                 rec._issue_period_credits()
@@ -9,6 +9,9 @@
         - My Todos (filtered view of project.task)
         - Class calendar scoped to the logged-in instructor
         - KPI computed fields on instructor profiles
+        - Pre-aggregated session / hourly / revenue facts for the admin dashboard
+        - Instructor KPI report (pivot / graph) by instructor, class and date range
+        - Short-lived per-user memo of the dashboard payloads, invalidated on change
     """,
     'author': 'Dojo',
     'category': 'Dojo',
@@ -17,6 +20,7 @@
     'installable': True,
     'auto_install': True,
     'depends': [
+        'dojo_base',
         'dojo_classes',
         'dojo_attendance',
         'project',
@@ -29,6 +33,7 @@
         'views/dojo_instructor_dashboard_views.xml',
         'views/dojo_attendance_quick_views.xml',
         'views/dojo_member_profile_button.xml',
+        'views/dojo_instructor_kpi_report_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
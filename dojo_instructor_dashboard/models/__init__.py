@@ -2,3 +2,7 @@ from . import dojo_instructor_kpi
 from . import dojo_attendance_quick_wizard
 from . import dojo_member_profile
 from . import dojo_instructor_todos
+from . import dojo_analytics
+from . import dojo_analytics_hooks
+from . import dojo_dashboard_cache
+from . import dojo_instructor_kpi_report
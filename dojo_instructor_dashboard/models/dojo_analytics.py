@@ -0,0 +1,478 @@
+"""Pre-aggregated analytics facts behind the admin dashboard.
+
+  dojo.analytics.session.fact     one row per class session: capacity, seats
+                                  taken, drops, present / logged attendance
+  dojo.analytics.hourly.fact      session facts summed per start hour (UTC),
+                                  company, instructor and program
+  dojo.analytics.instructor.fact  distinct registered students per instructor
+  dojo.analytics.revenue.fact     posted customer invoices per invoice date and
+                                  company: untaxed revenue and open balance
+
+Writes to sessions, enrollments, attendance logs, templates and invoices (see
+dojo_analytics_hooks.py) only queue the keys they touch in dojo.analytics.dirty,
+once per transaction, and trigger the "refresh dashboard analytics" cron.  The
+cron recomputes just the queued keys with a few set-based statements, so the
+dashboard reads small aggregate tables whose size does not depend on how much
+history the dojo has.
+
+Both also bump the dashboard generation sequence once committed, which
+invalidates the memoized dashboard payloads (dojo_dashboard_cache.py).
+"""
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Dirty keys claimed per refresh statement batch.
+_REFRESH_BATCH_SIZE = 2000
+_DIRTY_PRECOMMIT_KEY = 'dojo.analytics.dirty'
+_GENERATION_POSTCOMMIT_KEY = 'dojo.analytics.generation'
+_GENERATION_SEQUENCE = 'dojo_analytics_generation_seq'
+
+# Session states whose capacity / seats / attendance count towards the rates.
+_ACTIVE_SESSION_STATES = ('open', 'done')
+
+
+class DojoAnalyticsDirty(models.Model):
+    """Queue of fact keys to recompute.  Duplicates are harmless: the refresh
+    de-duplicates what it claims."""
+
+    _name = 'dojo.analytics.dirty'
+    _description = 'Dojo Analytics Refresh Queue'
+    _log_access = False
+
+    kind = fields.Selection(
+        [('session', 'Session'), ('revenue', 'Revenue Day')],
+        required=True,
+    )
+    ref_id = fields.Integer(
+        required=True,
+        help='Session id for session keys, company id for revenue keys.',
+    )
+    day = fields.Date(help='Invoice date for revenue keys.')
+
+    def init(self):
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {_GENERATION_SEQUENCE}")
+
+    # ── marking ───────────────────────────────────────────────────────────
+
+    @api.model
+    def _mark_sessions(self, session_ids):
+        self._mark([('session', sid, None) for sid in session_ids if sid])
+
+    @api.model
+    def _mark_revenue(self, company_days):
+        self._mark([
+            ('revenue', company_id, day)
+            for company_id, day in company_days
+            if company_id and day
+        ])
+
+    @api.model
+    def _mark(self, keys):
+        """Collect *keys* for this transaction; they are written in one INSERT
+        right before commit."""
+        if not keys:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(_DIRTY_PRECOMMIT_KEY)
+        if pending is None:
+            pending = data[_DIRTY_PRECOMMIT_KEY] = set()
+            self.env.cr.precommit.add(self._flush_marks)
+        pending.update(keys)
+
+    @api.model
+    def _flush_marks(self):
+        pending = self.env.cr.precommit.data.pop(_DIRTY_PRECOMMIT_KEY, None)
+        if not pending:
+            return
+        kinds, ref_ids, days = zip(*pending)
+        self.env.cr.execute(
+            """
+            INSERT INTO dojo_analytics_dirty (kind, ref_id, day)
+            SELECT * FROM unnest(%s::varchar[], %s::int[], %s::date[])
+            """,
+            [list(kinds), list(ref_ids), list(days)],
+        )
+        cron = self.env.ref(
+            'dojo_instructor_dashboard.ir_cron_refresh_dashboard_analytics',
+            raise_if_not_found=False,
+        )
+        if cron:
+            cron._trigger()
+            # Precommit runs after the ORM flush: write the trigger ourselves.
+            self.env['ir.cron.trigger'].flush_model()
+        self._bump_generation()
+
+    # ── refresh ───────────────────────────────────────────────────────────
+
+    @api.model
+    def _cron_refresh(self):
+        """Recompute every queued key, committing after each batch."""
+        commit = not self.env.registry.in_test_mode()
+        while True:
+            claimed = self._claim(_REFRESH_BATCH_SIZE)
+            if not claimed:
+                break
+            session_ids = {ref_id for kind, ref_id, _day in claimed if kind == 'session'}
+            revenue_keys = {
+                (ref_id, day) for kind, ref_id, day in claimed if kind == 'revenue'
+            }
+            if session_ids:
+                self.env['dojo.analytics.session.fact']._refresh_sessions(sorted(session_ids))
+            if revenue_keys:
+                self.env['dojo.analytics.revenue.fact']._refresh_days(sorted(revenue_keys))
+            self._bump_generation()
+            if commit:
+                self.env.cr.commit()
+
+    # ── dashboard generation ──────────────────────────────────────────────
+
+    @api.model
+    def _generation(self):
+        """Current dashboard generation; moves whenever dashboard inputs do."""
+        self.env.cr.execute(f"SELECT last_value FROM {_GENERATION_SEQUENCE}")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _bump_generation(self):
+        """Advance the generation once this transaction has committed, so no
+        worker can cache a payload computed before the change under the new
+        generation.  nextval() is not transactional: the bump sticks even
+        though it runs after the commit."""
+        postcommit = self.env.cr.postcommit
+        if postcommit.data.get(_GENERATION_POSTCOMMIT_KEY):
+            return
+        postcommit.data[_GENERATION_POSTCOMMIT_KEY] = True
+        cr = self.env.cr
+
+        @postcommit.add
+        def bump():
+            postcommit.data.pop(_GENERATION_POSTCOMMIT_KEY, None)
+            cr.execute(f"SELECT nextval('{_GENERATION_SEQUENCE}')")
+
+    @api.model
+    def _claim(self, limit):
+        self.env.cr.execute(
+            """
+            DELETE FROM dojo_analytics_dirty
+             WHERE id IN (
+                SELECT id FROM dojo_analytics_dirty
+                 ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+             )
+            RETURNING kind, ref_id, day
+            """,
+            [limit],
+        )
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _rebuild_all(self):
+        """Queue every session and invoice day for the refresh cron; called on
+        install / update, so the facts are built right after, not inline."""
+        self.env.cr.execute(
+            """
+            INSERT INTO dojo_analytics_dirty (kind, ref_id, day)
+            SELECT 'session', id, NULL FROM dojo_class_session
+            UNION ALL
+            SELECT DISTINCT 'revenue', company_id, invoice_date
+              FROM account_move
+             WHERE move_type = 'out_invoice'
+               AND state = 'posted'
+               AND invoice_date IS NOT NULL
+            """
+        )
+        self.env.ref('dojo_instructor_dashboard.ir_cron_refresh_dashboard_analytics')._trigger()
+
+
+class DojoAnalyticsSessionFact(models.Model):
+    _name = 'dojo.analytics.session.fact'
+    _description = 'Dojo Analytics — Session Fact'
+    _order = 'start_datetime desc, session_id desc'
+    _log_access = False
+
+    # set null, not cascade: the refresh needs the orphaned row to know which
+    # hour / instructor rollups a deleted session used to count in.
+    session_id = fields.Many2one('dojo.class.session', readonly=True, ondelete='set null')
+    company_id = fields.Many2one('res.company', readonly=True, index=True)
+    instructor_profile_id = fields.Many2one(
+        'dojo.instructor.profile', string='Instructor', readonly=True, index=True
+    )
+    template_id = fields.Many2one('dojo.class.template', string='Class', readonly=True)
+    program_id = fields.Many2one('dojo.program', string='Program', readonly=True)
+    start_datetime = fields.Datetime(readonly=True, index=True)
+    slot = fields.Datetime(string='Hour', readonly=True, help='Start, truncated to the hour.')
+    state = fields.Selection(
+        [
+            ('draft', 'Draft'),
+            ('open', 'Open'),
+            ('done', 'Done'),
+            ('cancelled', 'Cancelled'),
+        ],
+        readonly=True,
+    )
+    capacity = fields.Integer(readonly=True)
+    registered = fields.Integer(string='Seats Taken', readonly=True)
+    drops = fields.Integer(string='Dropped', readonly=True)
+    present = fields.Integer(readonly=True)
+    attendance_logs = fields.Integer(string='Attendance Logged', readonly=True)
+
+    _dojo_analytics_session_fact_uniq = models.Constraint(
+        'unique(session_id)',
+        'Only one analytics fact per session is allowed.',
+    )
+
+    @api.model
+    def _refresh_sessions(self, session_ids):
+        """Recompute the facts of *session_ids*, drop those of deleted
+        sessions, then refresh the hourly and instructor rollups they feed."""
+        cr = self.env.cr
+        cr.execute(
+            """
+            DELETE FROM dojo_analytics_session_fact
+             WHERE session_id = ANY(%s) OR session_id IS NULL
+            RETURNING slot, instructor_profile_id
+            """,
+            [session_ids],
+        )
+        before = cr.fetchall()
+        cr.execute(
+            """
+            INSERT INTO dojo_analytics_session_fact
+                (session_id, company_id, instructor_profile_id, template_id,
+                 program_id, start_datetime, slot, state, capacity, registered,
+                 drops, present, attendance_logs)
+            SELECT s.id, s.company_id, s.instructor_profile_id, s.template_id,
+                   t.program_id, s.start_datetime,
+                   date_trunc('hour', s.start_datetime), s.state,
+                   COALESCE(s.capacity, 0),
+                   COALESCE(e.registered, 0), COALESCE(e.drops, 0),
+                   COALESCE(l.present, 0), COALESCE(l.logs, 0)
+              FROM dojo_class_session s
+              LEFT JOIN dojo_class_template t ON t.id = s.template_id
+              LEFT JOIN (
+                    SELECT session_id,
+                           COUNT(*) FILTER (WHERE status = 'registered') AS registered,
+                           COUNT(*) FILTER (WHERE status = 'cancelled') AS drops
+                      FROM dojo_class_enrollment
+                     WHERE session_id = ANY(%(ids)s)
+                     GROUP BY session_id
+              ) e ON e.session_id = s.id
+              LEFT JOIN (
+                    SELECT session_id,
+                           COUNT(*) FILTER (WHERE status = 'present') AS present,
+                           COUNT(*) AS logs
+                      FROM dojo_attendance_log
+                     WHERE session_id = ANY(%(ids)s)
+                     GROUP BY session_id
+              ) l ON l.session_id = s.id
+             WHERE s.id = ANY(%(ids)s)
+            RETURNING slot, instructor_profile_id
+            """,
+            {'ids': session_ids},
+        )
+        after = cr.fetchall()
+        touched = before + after
+        slots = sorted({slot for slot, _pid in touched if slot})
+        instructor_ids = sorted({pid for _slot, pid in touched if pid})
+        if slots:
+            self.env['dojo.analytics.hourly.fact']._refresh_slots(slots)
+        if instructor_ids:
+            self.env['dojo.analytics.instructor.fact']._refresh_instructors(instructor_ids)
+        self.invalidate_model()
+
+
+class DojoAnalyticsHourlyFact(models.Model):
+    _name = 'dojo.analytics.hourly.fact'
+    _description = 'Dojo Analytics — Hourly Class Rollup'
+    _order = 'slot desc'
+    _log_access = False
+
+    slot = fields.Datetime(string='Hour', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    instructor_profile_id = fields.Many2one(
+        'dojo.instructor.profile', string='Instructor', readonly=True
+    )
+    program_id = fields.Many2one('dojo.program', string='Program', readonly=True)
+    sessions = fields.Integer(readonly=True, help='All sessions, whatever their state.')
+    active_sessions = fields.Integer(readonly=True, help='Open and done sessions.')
+    capacity = fields.Integer(readonly=True, help='Capacity of open and done sessions.')
+    registered = fields.Integer(
+        string='Seats Taken', readonly=True, help='Seats taken in open and done sessions.'
+    )
+    present = fields.Integer(readonly=True)
+    attendance_logs = fields.Integer(string='Attendance Logged', readonly=True)
+    drops = fields.Integer(
+        string='Dropped', readonly=True, help='Cancelled enrollments, whatever the session state.'
+    )
+
+    @api.model
+    def _refresh_slots(self, slots):
+        cr = self.env.cr
+        cr.execute('DELETE FROM dojo_analytics_hourly_fact WHERE slot = ANY(%s)', [slots])
+        cr.execute(
+            """
+            INSERT INTO dojo_analytics_hourly_fact
+                (slot, company_id, instructor_profile_id, program_id, sessions,
+                 active_sessions, capacity, registered, present,
+                 attendance_logs, drops)
+            SELECT slot, company_id, instructor_profile_id, program_id,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE state IN %(active)s),
+                   COALESCE(SUM(capacity) FILTER (WHERE state IN %(active)s), 0),
+                   COALESCE(SUM(registered) FILTER (WHERE state IN %(active)s), 0),
+                   COALESCE(SUM(present) FILTER (WHERE state IN %(active)s), 0),
+                   COALESCE(SUM(attendance_logs) FILTER (WHERE state IN %(active)s), 0),
+                   SUM(drops)
+              FROM dojo_analytics_session_fact
+             WHERE slot = ANY(%(slots)s)
+             GROUP BY slot, company_id, instructor_profile_id, program_id
+            """,
+            {'slots': slots, 'active': _ACTIVE_SESSION_STATES},
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _totals(self, date_from, group_by_instructor=False):
+        """Sum the rollup over slots starting at *date_from* for the user's
+        companies.  Returns {instructor_id or None: {measure: int}}."""
+        self.env.cr.execute(
+            f"""
+            SELECT {'instructor_profile_id' if group_by_instructor else 'NULL'},
+                   COALESCE(SUM(sessions), 0), COALESCE(SUM(capacity), 0),
+                   COALESCE(SUM(registered), 0), COALESCE(SUM(present), 0),
+                   COALESCE(SUM(attendance_logs), 0), COALESCE(SUM(drops), 0)
+              FROM dojo_analytics_hourly_fact
+             WHERE slot >= %s
+               AND (company_id IS NULL OR company_id = ANY(%s))
+             GROUP BY 1
+            """,
+            [date_from, self.env.companies.ids],
+        )
+        measures = ('sessions', 'capacity', 'registered', 'present', 'attendance_logs', 'drops')
+        return {row[0]: dict(zip(measures, row[1:])) for row in self.env.cr.fetchall()}
+
+
+class DojoAnalyticsInstructorFact(models.Model):
+    _name = 'dojo.analytics.instructor.fact'
+    _description = 'Dojo Analytics — Instructor Students'
+    _log_access = False
+
+    instructor_profile_id = fields.Many2one(
+        'dojo.instructor.profile', string='Instructor', required=True,
+        readonly=True, ondelete='cascade',
+    )
+    students_count = fields.Integer(
+        string='Students', readonly=True,
+        help='Distinct members registered in any open or done session of the instructor.',
+    )
+
+    _dojo_analytics_instructor_fact_uniq = models.Constraint(
+        'unique(instructor_profile_id)',
+        'Only one analytics fact per instructor is allowed.',
+    )
+
+    @api.model
+    def _refresh_instructors(self, instructor_ids):
+        cr = self.env.cr
+        cr.execute(
+            'DELETE FROM dojo_analytics_instructor_fact WHERE instructor_profile_id = ANY(%s)',
+            [instructor_ids],
+        )
+        cr.execute(
+            """
+            INSERT INTO dojo_analytics_instructor_fact (instructor_profile_id, students_count)
+            SELECT s.instructor_profile_id, COUNT(DISTINCT e.member_id)
+              FROM dojo_class_enrollment e
+              JOIN dojo_class_session s ON s.id = e.session_id
+             WHERE s.instructor_profile_id = ANY(%s)
+               AND s.state IN %s
+               AND e.status = 'registered'
+             GROUP BY s.instructor_profile_id
+            """,
+            [instructor_ids, _ACTIVE_SESSION_STATES],
+        )
+        self.invalidate_model()
+
+
+class DojoAnalyticsRevenueFact(models.Model):
+    _name = 'dojo.analytics.revenue.fact'
+    _description = 'Dojo Analytics — Daily Revenue'
+    _order = 'day desc'
+    _log_access = False
+
+    day = fields.Date(required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', required=True, readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one(related='company_id.currency_id', readonly=True)
+    invoice_count = fields.Integer(string='Invoices', readonly=True)
+    revenue = fields.Monetary(
+        string='Revenue (untaxed)', currency_field='currency_id', readonly=True
+    )
+    outstanding = fields.Monetary(
+        string='Outstanding', currency_field='currency_id', readonly=True,
+        help='Open residual of the unpaid / partially paid invoices dated that day.',
+    )
+
+    _dojo_analytics_revenue_fact_uniq = models.Constraint(
+        'unique(company_id, day)',
+        'Only one revenue fact per company and day is allowed.',
+    )
+
+    @api.model
+    def _refresh_days(self, company_days):
+        company_ids = [company_id for company_id, _day in company_days]
+        days = [day for _company_id, day in company_days]
+        cr = self.env.cr
+        cr.execute(
+            """
+            DELETE FROM dojo_analytics_revenue_fact f
+             USING unnest(%s::int[], %s::date[]) AS k(company_id, day)
+             WHERE f.company_id = k.company_id AND f.day = k.day
+            """,
+            [company_ids, days],
+        )
+        cr.execute(
+            """
+            INSERT INTO dojo_analytics_revenue_fact
+                (day, company_id, invoice_count, revenue, outstanding)
+            SELECT m.invoice_date, m.company_id, COUNT(*),
+                   COALESCE(SUM(m.amount_untaxed), 0),
+                   COALESCE(SUM(m.amount_residual)
+                            FILTER (WHERE m.payment_state IN ('not_paid', 'partial')), 0)
+              FROM account_move m
+              JOIN unnest(%s::int[], %s::date[]) AS k(company_id, day)
+                ON k.company_id = m.company_id AND k.day = m.invoice_date
+             WHERE m.move_type = 'out_invoice'
+               AND m.state = 'posted'
+             GROUP BY m.invoice_date, m.company_id
+            """,
+            [company_ids, days],
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _totals(self, company_id, month_start, year_start, today):
+        self.env.cr.execute(
+            """
+            SELECT COALESCE(SUM(revenue) FILTER (WHERE day >= %(month)s AND day <= %(today)s), 0),
+                   COALESCE(SUM(revenue) FILTER (WHERE day >= %(year)s AND day <= %(today)s), 0),
+                   COALESCE(SUM(outstanding), 0)
+              FROM dojo_analytics_revenue_fact
+             WHERE company_id = %(company)s
+            """,
+            {'company': company_id, 'month': month_start, 'year': year_start, 'today': today},
+        )
+        month, ytd, outstanding = self.env.cr.fetchone()
+        return {
+            'revenue_this_month': float(month),
+            'revenue_ytd': float(ytd),
+            'outstanding_balance': float(outstanding),
+        }
+
+
+def _rate(part, whole):
+    """Percentage of *part* in *whole*, 0.0 when *whole* is empty."""
+    return (part or 0) / whole * 100 if whole else 0.0
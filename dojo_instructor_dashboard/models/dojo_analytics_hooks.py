@@ -0,0 +1,139 @@
+"""Queue analytics fact refreshes (see dojo_analytics.py) from the writes that
+change them.  Each hook only records keys; nothing is recomputed inline."""
+from odoo import api, models
+
+# Fields whose change moves a session's numbers or rollup keys.
+_SESSION_FIELDS = {
+    'start_datetime', 'state', 'capacity', 'instructor_profile_id',
+    'template_id', 'company_id',
+}
+_ENROLLMENT_FIELDS = {'status', 'session_id'}
+_ATTENDANCE_FIELDS = {'status', 'session_id'}
+_INVOICE_FIELDS = {
+    'state', 'invoice_date', 'company_id', 'move_type', 'payment_state',
+    'amount_untaxed', 'amount_residual', 'invoice_line_ids', 'line_ids',
+}
+
+
+class DojoClassSessionAnalytics(models.Model):
+    _inherit = 'dojo.class.session'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        sessions = super().create(vals_list)
+        self.env['dojo.analytics.dirty']._mark_sessions(sessions.ids)
+        return sessions
+
+    def write(self, vals):
+        result = super().write(vals)
+        if _SESSION_FIELDS.intersection(vals):
+            self.env['dojo.analytics.dirty']._mark_sessions(self.ids)
+        return result
+
+    def unlink(self):
+        self.env['dojo.analytics.dirty']._mark_sessions(self.ids)
+        return super().unlink()
+
+
+class DojoClassTemplateAnalytics(models.Model):
+    _inherit = 'dojo.class.template'
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'program_id' in vals:
+            sessions = self.env['dojo.class.session'].search([('template_id', 'in', self.ids)])
+            self.env['dojo.analytics.dirty']._mark_sessions(sessions.ids)
+        return result
+
+
+class DojoClassEnrollmentAnalytics(models.Model):
+    _inherit = 'dojo.class.enrollment'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        enrollments = super().create(vals_list)
+        self.env['dojo.analytics.dirty']._mark_sessions(enrollments.session_id.ids)
+        return enrollments
+
+    def write(self, vals):
+        tracked = _ENROLLMENT_FIELDS.intersection(vals)
+        before = self.session_id.ids if tracked else []
+        result = super().write(vals)
+        if tracked:
+            self.env['dojo.analytics.dirty']._mark_sessions(before + self.session_id.ids)
+        return result
+
+    def unlink(self):
+        self.env['dojo.analytics.dirty']._mark_sessions(self.session_id.ids)
+        return super().unlink()
+
+
+class DojoAttendanceLogAnalytics(models.Model):
+    _inherit = 'dojo.attendance.log'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        logs = super().create(vals_list)
+        self.env['dojo.analytics.dirty']._mark_sessions(logs.session_id.ids)
+        return logs
+
+    def write(self, vals):
+        tracked = _ATTENDANCE_FIELDS.intersection(vals)
+        before = self.session_id.ids if tracked else []
+        result = super().write(vals)
+        if tracked:
+            self.env['dojo.analytics.dirty']._mark_sessions(before + self.session_id.ids)
+        return result
+
+    def unlink(self):
+        self.env['dojo.analytics.dirty']._mark_sessions(self.session_id.ids)
+        return super().unlink()
+
+
+class AccountMoveAnalytics(models.Model):
+    _inherit = 'account.move'
+
+    def _analytics_revenue_keys(self):
+        return [
+            (move.company_id.id, move.invoice_date)
+            for move in self
+            if move.move_type == 'out_invoice'
+        ]
+
+    def write(self, vals):
+        tracked = _INVOICE_FIELDS.intersection(vals)
+        before = self._analytics_revenue_keys() if tracked else []
+        result = super().write(vals)
+        if tracked:
+            self.env['dojo.analytics.dirty']._mark_revenue(
+                before + self._analytics_revenue_keys()
+            )
+        return result
+
+    def unlink(self):
+        self.env['dojo.analytics.dirty']._mark_revenue(self._analytics_revenue_keys())
+        return super().unlink()
+
+
+class AccountPartialReconcileAnalytics(models.Model):
+    """Payments change an invoice's residual through reconciliation, which
+    recomputes the move's stored amounts without calling move.write()."""
+
+    _inherit = 'account.partial.reconcile'
+
+    def _analytics_moves(self):
+        return (self.debit_move_id | self.credit_move_id).move_id
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        self.env['dojo.analytics.dirty']._mark_revenue(
+            partials._analytics_moves()._analytics_revenue_keys()
+        )
+        return partials
+
+    def unlink(self):
+        self.env['dojo.analytics.dirty']._mark_revenue(
+            self._analytics_moves()._analytics_revenue_keys()
+        )
+        return super().unlink()
@@ -0,0 +1,73 @@
+"""Per-process memo of the dashboard RPC payloads.
+
+Instructors and admins keep the dashboards open and re-fetch them on every
+auto-refresh, while the numbers only move when attendance, enrollments,
+sessions or invoices do.  ``DashboardCache.fetch()`` serves a repeat call from
+memory when all of these hold:
+
+  * same method, arguments, user, allowed companies, language and local day
+  * the entry is younger than ``dojo_instructor_dashboard.cache_ttl`` seconds
+  * the database's dashboard generation has not moved since it was computed
+
+The generation is a PostgreSQL sequence bumped after the commit of any
+transaction that queued analytics keys (dojo_analytics_hooks.py) and after
+each batch of the refresh cron, so it is shared by every worker and costs one
+``SELECT`` per call.  The LRU is bounded by ``dojo_instructor_dashboard.
+cache_size`` entries.  A TTL of 0 disables the cache.
+"""
+import copy
+
+from odoo import fields
+from odoo.addons.dojo_base.tools.ttl_cache import TTLCache
+
+_DEFAULT_TTL = 60        # seconds
+_DEFAULT_SIZE = 256      # entries per worker
+_TTL_PARAM = 'dojo_instructor_dashboard.cache_ttl'
+_SIZE_PARAM = 'dojo_instructor_dashboard.cache_size'
+
+
+_PAYLOADS = TTLCache()
+
+
+def _int_param(params, key, default):
+    try:
+        return int(params.get_param(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class DashboardCache:
+    """
+    Static helper — no Odoo model, just a namespace for the process cache.
+    """
+
+    @staticmethod
+    def fetch(records, method: str, args: tuple, compute):
+        """Return ``compute()``, or a copy of its memoized result for the
+        current user / companies / day when still valid."""
+        env = records.env
+        params = env['ir.config_parameter'].sudo()
+        ttl = _int_param(params, _TTL_PARAM, _DEFAULT_TTL)
+        if ttl <= 0:
+            return compute()
+        key = (
+            env.cr.dbname,
+            method,
+            args,
+            env.uid,
+            tuple(env.companies.ids),
+            env.lang,
+            fields.Date.context_today(records),
+        )
+        generation = env['dojo.analytics.dirty']._generation()
+        cached = _PAYLOADS.get(key)
+        if cached is not None and cached[0] == generation:
+            return copy.deepcopy(cached[1])
+        payload = compute()
+        _PAYLOADS.set(
+            key,
+            (generation, copy.deepcopy(payload)),
+            ttl,
+            max(_int_param(params, _SIZE_PARAM, _DEFAULT_SIZE), 1),
+        )
+        return payload
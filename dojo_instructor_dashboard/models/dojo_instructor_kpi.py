@@ -2,6 +2,9 @@ import pytz
 from datetime import date, datetime, timedelta
 from odoo import api, fields, models
 
+from .dojo_analytics import _rate
+from .dojo_dashboard_cache import DashboardCache
+
 
 class DojoMemberDashboard(models.Model):
     """Extends dojo.member with a belt rank stub and enrollment One2many for the
@@ -155,13 +158,26 @@ class DojoInstructorProfile(models.Model):
     )
 
     @api.model
-    def get_my_profile_data(self):
+    def get_my_profile_data(self, date_from=None, date_to=None):
         """Returns KPI data for the currently logged-in instructor.
         Uses self.env.uid (always correct server-side) so no client-side
-        UID lookup is needed."""
+        UID lookup is needed.  *date_from* / *date_to* replace the default
+        last-30-days window of the fill and attendance rates.  Repeat calls
+        are served from ``DashboardCache``."""
+        return DashboardCache.fetch(
+            self, 'get_my_profile_data', (str(date_from or ''), str(date_to or '')),
+            lambda: self._my_profile_data(date_from, date_to),
+        )
+
+    @api.model
+    def _my_profile_data(self, date_from, date_to):
         profile = self.search([('user_id', '=', self.env.uid)], limit=1)
         if not profile:
             return False
+        kpi_date_from, kpi_date_to = self.env['dojo.instructor.kpi.report']._range_bounds(
+            date_from, date_to,
+        )
+        profile = profile.with_context(kpi_date_from=kpi_date_from, kpi_date_to=kpi_date_to)
         return {
             'id': profile.id,
             'name': profile.name,
@@ -172,97 +188,66 @@ class DojoInstructorProfile(models.Model):
             'attendance_rate': profile.attendance_rate,
         }
 
+    def _kpi_window(self):
+        """(date_from, date_to) of the rate KPIs: the ``kpi_date_from`` /
+        ``kpi_date_to`` context keys, by default the last 30 days."""
+        _, today_start, _ = self._today_utc_range()
+        date_from = self.env.context.get('kpi_date_from') or today_start - timedelta(days=30)
+        return date_from, self.env.context.get('kpi_date_to')
+
     @api.depends('user_id')
+    @api.depends_context('kpi_date_from', 'kpi_date_to')
     def _compute_instructor_kpis(self):
-        """Computes KPI values for each instructor profile using batched queries
-        (5 queries total regardless of how many profiles are in ``self``)."""
+        """Computes KPI values for each instructor profile from the KPI report
+        view and the instructor analytics facts (3 aggregate queries
+        regardless of how many profiles are in ``self``)."""
         if not self:
             return
-        Session = self.env['dojo.class.session']
-        Enrollment = self.env['dojo.class.enrollment']
-        AttendanceLog = self.env['dojo.attendance.log']
-
-        profile_ids = self.ids
+        # Instructors read their own profile; the report rows are restricted
+        # to ``self`` so reading them as superuser leaks nothing.
+        Report = self.env['dojo.instructor.kpi.report'].sudo()
+        in_self = [('instructor_profile_id', 'in', self.ids)]
         _, today_start, today_end = self._today_utc_range()
-        thirty_days_ago = today_start - timedelta(days=30)
-
-        # ── Today’s session count per instructor (1 query) ─────────────────
-        today_sessions = Session.search([
-            ('instructor_profile_id', 'in', profile_ids),
-            ('start_datetime', '>=', today_start),
-            ('start_datetime', '<=', today_end),
-        ])
-        today_count_map = {}
-        for s in today_sessions:
-            pid = s.instructor_profile_id.id
-            today_count_map[pid] = today_count_map.get(pid, 0) + 1
-
-        # ── Total enrolled students (distinct) per instructor (2 queries) ──
-        all_active_sessions = Session.search([
-            ('instructor_profile_id', 'in', profile_ids),
-            ('state', 'in', ['open', 'done']),
-        ])
-        # Pre-build session_id → instructor_profile_id map to avoid M2o chain in loop
-        sess_to_instructor = {s.id: s.instructor_profile_id.id for s in all_active_sessions}
-        students_map = {}  # pid → set of member ids
-        if all_active_sessions:
-            all_enrollments = Enrollment.search([
-                ('session_id', 'in', all_active_sessions.ids),
-                ('status', '=', 'registered'),
-            ])
-            for enr in all_enrollments:
-                pid = sess_to_instructor.get(enr.session_id.id)
-                if pid:
-                    students_map.setdefault(pid, set()).add(enr.member_id.id)
-
-        # ── Recent sessions per instructor for fill/attendance rate (1 query)
-        recent_sessions = Session.search([
-            ('instructor_profile_id', 'in', profile_ids),
-            ('start_datetime', '>=', thirty_days_ago),
-            ('state', 'in', ['open', 'done']),
-        ])
-        recent_sess_to_instructor = {s.id: s.instructor_profile_id.id for s in recent_sessions}
-        capacity_map = {}  # pid → (total_capacity, total_taken)
-        for s in recent_sessions:
-            pid = s.instructor_profile_id.id
-            cap, taken = capacity_map.get(pid, (0, 0))
-            if s.capacity > 0:
-                cap += s.capacity
-            capacity_map[pid] = (cap, taken + s.seats_taken)
-
-        # ── Attendance logs for all recent sessions (1 query) ─────────────
-        log_map = {}  # pid → (total, present)
-        if recent_sessions:
-            logs = AttendanceLog.search([('session_id', 'in', recent_sessions.ids)])
-            for log in logs:
-                pid = recent_sess_to_instructor.get(log.session_id.id)
-                if pid:
-                    total, present = log_map.get(pid, (0, 0))
-                    log_map[pid] = (total + 1, present + (1 if log.status == 'present' else 0))
-
-        # ── Assign computed values ─────────────────────────────────────────
+        today = Report._kpis(today_start, today_end, domain=in_self)
+        recent = Report._kpis(*self._kpi_window(), domain=in_self)
+        students = {
+            fact.instructor_profile_id.id: fact.students_count
+            for fact in self.env['dojo.analytics.instructor.fact'].sudo().search_fetch(
+                in_self, ['instructor_profile_id', 'students_count'],
+            )
+        }
         for profile in self:
-            pid = profile.id
-            profile.sessions_today_count = today_count_map.get(pid, 0)
-            profile.students_total_count = len(students_map.get(pid, set()))
-            tot_cap, tot_taken = capacity_map.get(pid, (0, 0))
-            profile.avg_fill_rate = (tot_taken / tot_cap * 100) if tot_cap else 0.0
-            tot_logs, tot_present = log_map.get(pid, (0, 0))
-            profile.attendance_rate = (tot_present / tot_logs * 100) if tot_logs else 0.0
+            kpis = recent.get(profile.id, {})
+            profile.sessions_today_count = today.get(profile.id, {}).get('session_count', 0)
+            profile.students_total_count = students.get(profile.id, 0)
+            profile.avg_fill_rate = kpis.get('fill_rate', 0.0)
+            profile.attendance_rate = kpis.get('attendance_rate', 0.0)
 
     # ── Admin dashboard data ──────────────────────────────────────────────
 
     @api.model
     def get_admin_dashboard_data(self):
+        """Admin dashboard payload (see ``_admin_dashboard_data``); repeat
+        calls are served from ``DashboardCache``."""
+        return DashboardCache.fetch(
+            self, 'get_admin_dashboard_data', (), self._admin_dashboard_data,
+        )
+
+    @api.model
+    def _admin_dashboard_data(self):
         """Returns comprehensive dashboard data for admins:
         - Global KPI summary
         - Per-instructor KPIs
         - Dropped/cancelled students (last 60 days)
         - Recent sessions with fill/attendance breakdown
+
+        Rates, drops, student counts and revenue come from the pre-aggregated
+        tables in ``dojo_analytics.py``; only the bounded lists (today's
+        sessions, the latest drops) still read the live models.
         """
         Session = self.env['dojo.class.session']
         Enrollment = self.env['dojo.class.enrollment']
-        AttendanceLog = self.env['dojo.attendance.log']
+        Hourly = self.env['dojo.analytics.hourly.fact']
 
         _, today_start, today_end = self._today_utc_range()
         thirty_days_ago = today_start - timedelta(days=30)
@@ -279,78 +264,24 @@ class DojoInstructorProfile(models.Model):
             ('start_datetime', '<=', today_end),
         ])
 
-        # Overall fill rate (last 30 days)
-        recent_sessions = Session.search([
-            ('start_datetime', '>=', thirty_days_ago),
-            ('state', 'in', ['open', 'done']),
-        ])
-        total_capacity = sum(s.capacity for s in recent_sessions if s.capacity > 0)
-        total_taken = sum(s.seats_taken for s in recent_sessions)
-        overall_fill_rate = (total_taken / total_capacity * 100) if total_capacity else 0.0
-
-        # Overall attendance rate (last 30 days)
-        recent_logs = AttendanceLog.search([
-            ('session_id', 'in', recent_sessions.ids),
-        ]) if recent_sessions else self.env['dojo.attendance.log']
-        present_count = len(recent_logs.filtered(lambda l: l.status == 'present'))
-        overall_attendance_rate = (
-            present_count / len(recent_logs) * 100
-        ) if recent_logs else 0.0
-
-        # Dropped students count (last 60 days)
-        total_dropped_60d = Enrollment.search_count([
-            ('status', '=', 'cancelled'),
-            ('session_id.start_datetime', '>=', sixty_days_ago),
-        ])
+        # Overall fill / attendance rate (last 30 days) and drops (last 60 days)
+        recent = Hourly._totals(thirty_days_ago).get(None, {})
+        overall_fill_rate = _rate(recent.get('registered'), recent.get('capacity'))
+        overall_attendance_rate = _rate(recent.get('present'), recent.get('attendance_logs'))
+        total_dropped_60d = Hourly._totals(sixty_days_ago).get(None, {}).get('drops', 0)
 
         # ── Revenue KPIs ──────────────────────────────────────────────────
-        revenue_this_month = 0.0
-        revenue_ytd = 0.0
-        outstanding_balance = 0.0
-        new_members_this_month = 0
-        if 'account.move' in self.env:
-            Invoice = self.env['account.move']
-            today_date = today_start.date() if hasattr(today_start, 'date') else date.today()
-            month_start = today_date.replace(day=1)
-            year_start = today_date.replace(month=1, day=1)
-
-            # Revenue this month: posted customer invoices
-            month_invoices = Invoice.search([
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-                ('invoice_date', '>=', fields.Date.to_string(month_start)),
-                ('invoice_date', '<=', fields.Date.to_string(today_date)),
-                ('company_id', '=', self.env.company.id),
-            ])
-            revenue_this_month = sum(month_invoices.mapped('amount_untaxed'))
-
-            # Revenue YTD: posted customer invoices since Jan 1
-            ytd_invoices = Invoice.search([
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-                ('invoice_date', '>=', fields.Date.to_string(year_start)),
-                ('invoice_date', '<=', fields.Date.to_string(today_date)),
-                ('company_id', '=', self.env.company.id),
-            ])
-            revenue_ytd = sum(ytd_invoices.mapped('amount_untaxed'))
-
-            # Outstanding balance: unpaid posted invoices
-            unpaid_invoices = Invoice.search([
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-                ('company_id', '=', self.env.company.id),
-            ])
-            outstanding_balance = sum(unpaid_invoices.mapped('amount_residual'))
+        today_date = today_start.date() if hasattr(today_start, 'date') else date.today()
+        month_start = today_date.replace(day=1)
+        revenue = self.env['dojo.analytics.revenue.fact']._totals(
+            self.env.company.id, month_start, today_date.replace(month=1, day=1), today_date,
+        )
 
         # New members this month
-        if 'dojo.member' in self.env:
-            today_date = today_start.date() if hasattr(today_start, 'date') else date.today()
-            month_start_str = fields.Date.to_string(today_date.replace(day=1))
-            new_members_this_month = self.env['dojo.member'].search_count([
-                ('create_date', '>=', month_start_str),
-                ('role', 'in', ['student', 'both']),
-            ])
+        new_members_this_month = self.env['dojo.member'].search_count([
+            ('create_date', '>=', fields.Date.to_string(month_start)),
+            ('role', 'in', ['student', 'both']),
+        ])
 
         summary = {
             'total_instructors': len(all_profiles),
@@ -359,30 +290,21 @@ class DojoInstructorProfile(models.Model):
             'overall_fill_rate': round(overall_fill_rate, 1),
             'overall_attendance_rate': round(overall_attendance_rate, 1),
             'total_dropped_60d': total_dropped_60d,
-            'revenue_this_month': round(revenue_this_month, 2),
-            'revenue_ytd': round(revenue_ytd, 2),
-            'outstanding_balance': round(outstanding_balance, 2),
+            'revenue_this_month': round(revenue['revenue_this_month'], 2),
+            'revenue_ytd': round(revenue['revenue_ytd'], 2),
+            'outstanding_balance': round(revenue['outstanding_balance'], 2),
             'new_members_this_month': new_members_this_month,
         }
 
-        # ── Per-instructor KPIs ───────────────────────────────────────────        # Build students_count per instructor directly to avoid stale
-        # cached values from the @api.depends('user_id') computed field.
-        active_sessions_all = Session.search([
-            ('state', 'in', ['open', 'done']),
-        ])
-        if active_sessions_all:
-            enrollments_all = Enrollment.search([
-                ('session_id', 'in', active_sessions_all.ids),
-                ('status', '=', 'registered'),
-            ])
-        else:
-            enrollments_all = self.env['dojo.class.enrollment']
-        # Map profile_id -> set of distinct member ids
-        students_map = {}
-        for e in enrollments_all:
-            pid = e.session_id.instructor_profile_id.id
-            if pid:
-                students_map.setdefault(pid, set()).add(e.member_id.id)
+        # ── Per-instructor KPIs ───────────────────────────────────────────
+        students_map = {
+            fact.instructor_profile_id.id: fact.students_count
+            for fact in self.env['dojo.analytics.instructor.fact'].search_fetch(
+                [('instructor_profile_id', 'in', all_profiles.ids)],
+                ['instructor_profile_id', 'students_count'],
+            )
+        }
+        recent_by_instructor = Hourly._totals(thirty_days_ago, group_by_instructor=True)
         # Compute sessions_today per instructor directly to avoid stale
         # cached values from the @api.depends('user_id') computed field.
         today_session_map = {}
@@ -402,13 +324,16 @@ class DojoInstructorProfile(models.Model):
 
         instructors = []
         for p in all_profiles:
+            totals = recent_by_instructor.get(p.id, {})
             instructors.append({
                 'id': p.id,
                 'name': p.name,
                 'sessions_today': today_session_map.get(p.id, 0),
-                'students_count': len(students_map.get(p.id, set())),
-                'fill_rate': round(p.avg_fill_rate, 1),
-                'attendance_rate': round(p.attendance_rate, 1),
+                'students_count': students_map.get(p.id, 0),
+                'fill_rate': round(_rate(totals.get('registered'), totals.get('capacity')), 1),
+                'attendance_rate': round(
+                    _rate(totals.get('present'), totals.get('attendance_logs')), 1
+                ),
             })
         instructors.sort(key=lambda x: x['students_count'], reverse=True)
 
@@ -438,35 +363,35 @@ class DojoInstructorProfile(models.Model):
             })
 
         # ── Recent sessions (last 30 days, done/open, up to 40) ──────────
-        recent_session_recs = Session.search([
+        recent_facts = self.env['dojo.analytics.session.fact'].search([
             ('start_datetime', '>=', thirty_days_ago),
             ('state', 'in', ['open', 'done']),
+            ('session_id', '!=', False),
+            ('company_id', 'in', self.env.companies.ids + [False]),
         ], order='start_datetime desc', limit=40)
 
         recent_sessions_data = []
-        for s in recent_session_recs:
-            sess_logs = AttendanceLog.search([('session_id', '=', s.id)])
-            present = len(sess_logs.filtered(lambda l: l.status == 'present'))
-            total_log = len(sess_logs)
-            fill = round((s.seats_taken / s.capacity * 100), 1) if s.capacity else 0.0
-            att = round((present / total_log * 100), 1) if total_log else None
+        for f in recent_facts:
             recent_sessions_data.append({
-                'id': s.id,
-                'class_name': s.template_id.name if s.template_id else '—',
+                'id': f.session_id.id,
+                'class_name': f.template_id.name if f.template_id else '—',
                 'instructor_name': (
-                    s.instructor_profile_id.name if s.instructor_profile_id else '—'
+                    f.instructor_profile_id.name if f.instructor_profile_id else '—'
                 ),
                 'date': (
-                    fields.Datetime.to_string(s.start_datetime)[:10]
-                    if s.start_datetime else '—'
+                    fields.Datetime.to_string(f.start_datetime)[:10]
+                    if f.start_datetime else '—'
+                ),
+                'capacity': f.capacity,
+                'enrolled': f.registered,
+                'present': f.present,
+                'absent': f.attendance_logs - f.present,
+                'fill_rate': round(_rate(f.registered, f.capacity), 1),
+                'attendance_rate': (
+                    round(_rate(f.present, f.attendance_logs), 1)
+                    if f.attendance_logs else None
                 ),
-                'capacity': s.capacity,
-                'enrolled': s.seats_taken,
-                'present': present,
-                'absent': total_log - present,
-                'fill_rate': fill,
-                'attendance_rate': att,
-                'state': s.state,
+                'state': f.state,
             })
 
         return {
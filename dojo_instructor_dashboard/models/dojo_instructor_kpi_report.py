@@ -0,0 +1,142 @@
+"""Instructor KPI reporting engine.
+
+``dojo.instructor.kpi.report`` is an ``_auto = False`` SQL view with one row
+per session over ``dojo.analytics.session.fact`` (kept current by the
+analytics refresh, see dojo_analytics.py).  Its measures are summable, so any
+slice (instructor, class template, program, day / week / month, arbitrary date
+range) is a single ``_read_group``; the pivot and graph views use the same
+path.  Rates are derived from the summed counts by ``_kpis()``; the per-row
+``fill_rate`` / ``attendance_rate`` columns are only meant for averaging in
+the pivot.
+"""
+from datetime import date, datetime, time
+
+import pytz
+
+from odoo import api, fields, models, tools
+
+from .dojo_analytics import _rate
+
+_KPI_MEASURES = (
+    'session_count', 'capacity', 'registered', 'present', 'attendance_logs', 'drops',
+)
+
+
+class DojoInstructorKpiReport(models.Model):
+    _name = 'dojo.instructor.kpi.report'
+    _description = 'Dojo Instructor KPI Report'
+    _auto = False
+    _order = 'start_datetime desc'
+    _rec_name = 'session_id'
+
+    session_id = fields.Many2one('dojo.class.session', string='Session', readonly=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    instructor_profile_id = fields.Many2one(
+        'dojo.instructor.profile', string='Instructor', readonly=True
+    )
+    template_id = fields.Many2one('dojo.class.template', string='Class', readonly=True)
+    program_id = fields.Many2one('dojo.program', string='Program', readonly=True)
+    start_datetime = fields.Datetime(string='Date', readonly=True)
+    state = fields.Selection(
+        [
+            ('draft', 'Draft'),
+            ('open', 'Open'),
+            ('done', 'Done'),
+            ('cancelled', 'Cancelled'),
+        ],
+        readonly=True,
+    )
+    session_count = fields.Integer(string='Sessions', readonly=True)
+    capacity = fields.Integer(readonly=True, help='Capacity of open and done sessions.')
+    registered = fields.Integer(
+        string='Seats Taken', readonly=True, help='Seats taken in open and done sessions.'
+    )
+    present = fields.Integer(readonly=True)
+    attendance_logs = fields.Integer(string='Attendance Logged', readonly=True)
+    drops = fields.Integer(string='Dropped', readonly=True)
+    fill_rate = fields.Float(string='Fill Rate (%)', readonly=True, aggregator='avg')
+    attendance_rate = fields.Float(string='Attendance Rate (%)', readonly=True, aggregator='avg')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT f.id,
+                       f.session_id,
+                       f.company_id,
+                       f.instructor_profile_id,
+                       f.template_id,
+                       f.program_id,
+                       f.start_datetime,
+                       f.state,
+                       1 AS session_count,
+                       CASE WHEN f.state IN ('open', 'done') THEN f.capacity ELSE 0 END AS capacity,
+                       CASE WHEN f.state IN ('open', 'done') THEN f.registered ELSE 0 END AS registered,
+                       CASE WHEN f.state IN ('open', 'done') THEN f.present ELSE 0 END AS present,
+                       CASE WHEN f.state IN ('open', 'done') THEN f.attendance_logs ELSE 0 END
+                           AS attendance_logs,
+                       f.drops,
+                       CASE WHEN f.state IN ('open', 'done') AND f.capacity > 0
+                            THEN f.registered * 100.0 / f.capacity END AS fill_rate,
+                       CASE WHEN f.state IN ('open', 'done') AND f.attendance_logs > 0
+                            THEN f.present * 100.0 / f.attendance_logs END AS attendance_rate
+                  FROM dojo_analytics_session_fact f
+                 WHERE f.session_id IS NOT NULL
+            )
+        """)
+
+    @api.model
+    def _kpis(self, date_from=None, date_to=None, groupby='instructor_profile_id', domain=None):
+        """Summed KPIs of the sessions starting in [date_from, date_to] (either
+        bound optional), grouped by *groupby* — any field of this model, with
+        an optional date granularity such as ``'start_datetime:month'``.
+
+        Returns {group key: {measure: int, 'fill_rate': float,
+        'attendance_rate': float}}; many2one keys are ids (False if unset).
+        """
+        report_domain = [('company_id', 'in', self.env.companies.ids + [False])]
+        if date_from:
+            report_domain.append(('start_datetime', '>=', date_from))
+        if date_to:
+            report_domain.append(('start_datetime', '<=', date_to))
+        report_domain += domain or []
+        result = {}
+        for key, *sums in self._read_group(
+            report_domain, [groupby], [f'{measure}:sum' for measure in _KPI_MEASURES],
+        ):
+            kpis = dict(zip(_KPI_MEASURES, (value or 0 for value in sums)))
+            kpis['fill_rate'] = _rate(kpis['registered'], kpis['capacity'])
+            kpis['attendance_rate'] = _rate(kpis['present'], kpis['attendance_logs'])
+            result[key.id if isinstance(key, models.BaseModel) else key] = kpis
+        return result
+
+    @api.model
+    def _range_bounds(self, date_from=None, date_to=None):
+        """Turn RPC *date_from* / *date_to* into the naive UTC datetimes
+        ``_kpis()`` expects.  A date-only value is a day in the user's
+        timezone: *date_from* starts at its midnight and *date_to* ends at its
+        23:59:59, so the last day of the range is included."""
+        user_tz = pytz.timezone(self.env.context.get('tz') or self.env.user.tz or 'UTC')
+
+        def bound(value, day_time):
+            if not value:
+                return None
+            if isinstance(value, str) and len(value) <= 10:
+                value = fields.Date.to_date(value)
+            if isinstance(value, date) and not isinstance(value, datetime):
+                return user_tz.localize(
+                    datetime.combine(value, day_time)
+                ).astimezone(pytz.utc).replace(tzinfo=None)
+            return fields.Datetime.to_datetime(value)
+
+        return bound(date_from, time.min), bound(date_to, time(23, 59, 59))
+
+    @api.model
+    def get_kpis(self, date_from=None, date_to=None, groupby='instructor_profile_id'):
+        """RPC entry point for dashboards: ``_kpis()`` with JSON-safe keys."""
+        return [
+            {'key': fields.Datetime.to_string(key) if hasattr(key, 'isoformat') else key, **kpis}
+            for key, kpis in self._kpis(
+                *self._range_bounds(date_from, date_to), groupby,
+            ).items()
+        ]
@@ -6,6 +6,7 @@
     "license": "LGPL-3",
     "author": "Dojo",
     "depends": [
+        "bus",
         "dojo_attendance",
         "dojo_members",
         "dojo_belt_progression",
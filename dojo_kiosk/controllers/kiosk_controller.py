@@ -116,15 +116,29 @@ class KioskController(http.Controller):
     # ------------------------------------------------------------------
 
     @http.route("/kiosk/api/bootstrap", type="jsonrpc", auth="public", methods=["POST"], csrf=False)
-    def kiosk_bootstrap(self, token=None, **kw):
+    def kiosk_bootstrap(self, token=None, etag=None, **kw):
         if not token:
             return {"error": "token_required"}
         try:
             svc = request.env["dojo.kiosk.service"].sudo()
-            return svc.get_config_bootstrap(token)
+            return svc.get_config_bootstrap(token, if_none_match=etag)
         except AccessError:
             return {"error": "invalid_token"}
 
+    @http.route("/kiosk/api/bootstrap/<string:token>", type="http", auth="public", methods=["GET"], csrf=False)
+    def kiosk_bootstrap_get(self, token, **kw):
+        """Conditional GET variant of the bootstrap: honours If-None-Match."""
+        try:
+            svc = request.env["dojo.kiosk.service"].sudo()
+            etag, payload = svc._get_bootstrap_snapshot(token)
+        except AccessError:
+            return request.make_json_response({"error": "invalid_token"}, status=403)
+        headers = [("ETag", etag), ("Cache-Control", "no-cache")]
+        if_none_match = request.httprequest.headers.get("If-None-Match", "")
+        if etag in [t.strip() for t in if_none_match.split(",")]:
+            return request.make_response("", headers=headers, status=304)
+        return request.make_json_response(dict(payload, etag=etag), headers=headers)
+
     # ------------------------------------------------------------------
     # Announcements
     # ------------------------------------------------------------------
@@ -218,6 +232,16 @@ class KioskController(http.Controller):
         svc = request.env["dojo.kiosk.service"].sudo()
         return svc.checkin_member(member_id, session_id)
 
+    @http.route("/kiosk/checkin/sync", type="jsonrpc", auth="public", methods=["POST"], csrf=False)
+    def kiosk_checkin_sync(self, events=None, token=None, **kw):
+        if not isinstance(events, list):
+            return {"success": False, "error": "events must be a list."}
+        try:
+            svc = request.env["dojo.kiosk.service"].sudo()
+            return {"success": True, "results": svc.sync_checkin_events(token, events)}
+        except AccessError:
+            return {"success": False, "error": "Invalid kiosk token."}
+
     @http.route("/kiosk/checkout", type="jsonrpc", auth="public", methods=["POST"], csrf=False)
     def kiosk_checkout(self, member_id=None, session_id=None, token=None, **kw):
         if not member_id or not session_id:
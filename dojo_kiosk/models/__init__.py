@@ -2,3 +2,7 @@ from . import dojo_kiosk_config
 from . import dojo_kiosk_announcement
 from . import dojo_kiosk_attendance_ext
 from . import dojo_kiosk_service
+from . import dojo_kiosk_pin_attempt
+from . import dojo_kiosk_session_ext
+from . import dojo_kiosk_member_ext
+from . import dojo_kiosk_checkin_event
@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class DojoKioskAnnouncement(models.Model):
@@ -16,3 +16,19 @@ class DojoKioskAnnouncement(models.Model):
     body = fields.Text(help="Shown under the title on the idle screen.")
     sequence = fields.Integer(default=10)
     active = fields.Boolean(default=True)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.config_id._invalidate_bootstrap()
+        return records
+
+    def write(self, vals):
+        configs = self.config_id
+        result = super().write(vals)
+        (configs | self.config_id)._invalidate_bootstrap()
+        return result
+
+    def unlink(self):
+        self.config_id._invalidate_bootstrap()
+        return super().unlink()
@@ -5,9 +5,40 @@ can record when a member physically leaves.
 NOTE: checkout_datetime is now defined on the base dojo.attendance.log model
 in dojo_attendance. This file is kept for backwards compatibility but adds
 no new fields.
+
+It also adds the (member_id, checkin_datetime) index used by the kiosk
+search to rank members by their most recent attendance, and publishes
+roster deltas (checked in / checked out / cleared) to the kiosk bus channels.
 """
-from odoo import models
+from odoo import api, models
 
 
 class DojoAttendanceLogKioskExt(models.Model):
     _inherit = "dojo.attendance.log"
+
+    _dojo_attendance_member_checkin_idx = models.Index("(member_id, checkin_datetime DESC)")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        logs = super().create(vals_list)
+        self.env["dojo.kiosk.service"]._notify_roster_changes([
+            (log.session_id, log.member_id, "checked_in", log.status) for log in logs
+        ])
+        return logs
+
+    def write(self, vals):
+        result = super().write(vals)
+        changes = []
+        if "status" in vals:
+            changes += [(log.session_id, log.member_id, "checked_in", log.status) for log in self]
+        if vals.get("checkout_datetime"):
+            changes += [(log.session_id, log.member_id, "checked_out", "checked_out") for log in self]
+        if changes:
+            self.env["dojo.kiosk.service"]._notify_roster_changes(changes)
+        return result
+
+    def unlink(self):
+        self.env["dojo.kiosk.service"]._notify_roster_changes([
+            (log.session_id, log.member_id, "attendance_cleared", "pending") for log in self
+        ])
+        return super().unlink()
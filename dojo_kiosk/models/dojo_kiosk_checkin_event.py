@@ -0,0 +1,80 @@
+"""
+Client-generated kiosk check-in events, recorded for idempotent batch sync.
+
+Tablets that lose connectivity queue check-ins locally (UUID, member,
+session, timestamp) and flush them through
+dojo.kiosk.service.sync_checkin_events().  Each UUID is claimed exactly once
+with INSERT ... ON CONFLICT DO NOTHING, so a replayed or concurrently
+re-sent batch never checks a member in twice; replays get the stored
+outcome back.
+"""
+from odoo import api, fields, models
+
+
+class DojoKioskCheckinEvent(models.Model):
+    _name = "dojo.kiosk.checkin.event"
+    _description = "Kiosk Check-in Event"
+    _order = "received_at desc, id desc"
+    _rec_name = "uuid"
+    _log_access = False
+
+    uuid = fields.Char(string="Client UUID", required=True, readonly=True)
+    config_id = fields.Many2one("dojo.kiosk.config", readonly=True, ondelete="set null", index=True)
+    member_id = fields.Many2one("dojo.member", readonly=True, ondelete="cascade", index=True)
+    session_id = fields.Many2one("dojo.class.session", readonly=True, ondelete="cascade", index=True)
+    client_datetime = fields.Datetime(string="Tapped At", readonly=True)
+    received_at = fields.Datetime(readonly=True, default=fields.Datetime.now)
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("applied", "Applied"),
+            ("rejected", "Rejected"),
+        ],
+        default="pending",
+        required=True,
+        readonly=True,
+    )
+    status = fields.Char(readonly=True, help="Attendance status set by the check-in (present / late).")
+    error = fields.Char(readonly=True)
+    log_id = fields.Many2one("dojo.attendance.log", readonly=True, ondelete="set null")
+
+    _dojo_kiosk_checkin_event_uuid_uniq = models.Constraint(
+        "unique(uuid)",
+        "This check-in event was already received.",
+    )
+
+    @api.model
+    def _claim(self, rows):
+        """Insert pending events for *rows*, skipping UUIDs already known.
+
+        *rows* are dicts with uuid, config_id, member_id, session_id and
+        client_datetime.  Returns the set of UUIDs claimed by this call.
+        """
+        if not rows:
+            return set()
+        now = fields.Datetime.now()
+        values = []
+        params = []
+        for row in rows:
+            values.append("(%s, %s, %s, %s, %s, %s, 'pending')")
+            params += [
+                row["uuid"], row["config_id"], row["member_id"],
+                row["session_id"], row["client_datetime"], now,
+            ]
+        self.env.cr.execute(
+            "INSERT INTO dojo_kiosk_checkin_event "
+            "(uuid, config_id, member_id, session_id, client_datetime, received_at, state) "
+            "VALUES %s ON CONFLICT (uuid) DO NOTHING RETURNING uuid" % ", ".join(values),
+            params,
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _outcome(self):
+        self.ensure_one()
+        return {
+            "uuid": self.uuid,
+            "success": self.state == "applied",
+            "status": self.status or "",
+            "error": self.error or "",
+            "log_id": self.log_id.id or False,
+        }
@@ -1,9 +1,31 @@
+import hashlib
+import json
 import re
 import secrets
+import threading
+import time
 
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
 
+# Worker-local copy of the bootstrap snapshots: {(dbname, token): (etag, payload, expires)}.
+# Entries are dropped immediately on local invalidation and expire after
+# _BOOTSTRAP_LOCAL_TTL seconds so invalidations from other workers are
+# picked up without every poll hitting the database.
+_BOOTSTRAP_CACHE: dict = {}
+_BOOTSTRAP_CACHE_LOCK = threading.Lock()
+_BOOTSTRAP_LOCAL_TTL = 10
+# Stored snapshots older than this are rebuilt even without an invalidation,
+# bounding staleness if a rebuild raced a concurrent write.
+_BOOTSTRAP_MAX_AGE = 300
+# Session / enrollment changes bump this sequence instead of touching the
+# config rows; a snapshot built under an older value is stale.
+_BOOTSTRAP_VERSION_SEQUENCE = "dojo_kiosk_bootstrap_version_seq"
+_BOOTSTRAP_VERSION_POSTCOMMIT_KEY = "dojo.kiosk.bootstrap.version"
+
+# Config fields that are part of the bootstrap payload.
+_BOOTSTRAP_FIELDS = {"name", "theme_mode", "view_mode", "show_title", "active", "kiosk_token", "company_id"}
+
 
 class DojoKioskConfig(models.Model):
     _name = "dojo.kiosk.config"
@@ -61,6 +83,13 @@ class DojoKioskConfig(models.Model):
         string="Idle Screen Announcements",
     )
 
+    # ── Bootstrap snapshot (see dojo.kiosk.service.get_config_bootstrap) ──
+    bootstrap_snapshot = fields.Json(readonly=True, copy=False)
+    bootstrap_etag = fields.Char(readonly=True, copy=False)
+
+    def init(self):
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {_BOOTSTRAP_VERSION_SEQUENCE}")
+
     # ── Lifecycle ─────────────────────────────────────────────────────
     @api.model_create_multi
     def create(self, vals_list):
@@ -98,3 +127,99 @@ class DojoKioskConfig(models.Model):
                 raise ValidationError(
                     "Instructor PIN must be exactly 6 digits (numbers only)."
                 )
+
+    def write(self, vals):
+        result = super().write(vals)
+        if _BOOTSTRAP_FIELDS & set(vals):
+            self._invalidate_bootstrap()
+        return result
+
+    def unlink(self):
+        self._invalidate_bootstrap()
+        return super().unlink()
+
+    # ── Bootstrap snapshot ────────────────────────────────────────────
+    def _invalidate_bootstrap(self):
+        """Drop the stored bootstrap snapshot of these configs."""
+        if self.ids:
+            self.env.cr.execute(
+                "UPDATE dojo_kiosk_config "
+                "SET bootstrap_snapshot = NULL, bootstrap_etag = NULL "
+                "WHERE id IN %s AND bootstrap_etag IS NOT NULL",
+                [tuple(self.ids)],
+            )
+            self.invalidate_recordset(["bootstrap_snapshot", "bootstrap_etag"])
+        _clear_local_bootstrap_cache(self.env.cr.dbname)
+
+    @api.model
+    def _bump_bootstrap_version(self):
+        """Mark every stored snapshot stale once this transaction commits.
+
+        nextval() takes no row lock, so session and enrollment writers never
+        queue behind the config rows that bootstrap rebuilds write to.  It
+        runs after the commit (once per transaction) so a rebuild can never
+        pair the new version with data read before the change.
+        """
+        postcommit = self.env.cr.postcommit
+        if postcommit.data.get(_BOOTSTRAP_VERSION_POSTCOMMIT_KEY):
+            return
+        postcommit.data[_BOOTSTRAP_VERSION_POSTCOMMIT_KEY] = True
+        cr = self.env.cr
+
+        @postcommit.add
+        def bump():
+            postcommit.data.pop(_BOOTSTRAP_VERSION_POSTCOMMIT_KEY, None)
+            cr.execute(f"SELECT nextval('{_BOOTSTRAP_VERSION_SEQUENCE}')")
+            _clear_local_bootstrap_cache(cr.dbname)
+
+    @api.model
+    def _get_local_bootstrap(self, token):
+        """Return the worker-local (etag, payload) for *token*, or None."""
+        key = (self.env.cr.dbname, token)
+        with _BOOTSTRAP_CACHE_LOCK:
+            entry = _BOOTSTRAP_CACHE.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del _BOOTSTRAP_CACHE[key]
+                return None
+            return entry[0], entry[1]
+
+    @api.model
+    def _set_local_bootstrap(self, token, etag, payload):
+        with _BOOTSTRAP_CACHE_LOCK:
+            _BOOTSTRAP_CACHE[(self.env.cr.dbname, token)] = (
+                etag, payload, time.monotonic() + _BOOTSTRAP_LOCAL_TTL,
+            )
+
+    def _store_bootstrap(self, payload, date, version):
+        """Persist *payload* (built for local *date* under bootstrap *version*)
+        as this config's snapshot.
+
+        Returns the strong ETag of the payload.
+        """
+        self.ensure_one()
+        body = json.dumps(payload, sort_keys=True, default=str)
+        etag = '"%d-%s"' % (
+            self.id, hashlib.sha1(("%s|%s" % (date, body)).encode()).hexdigest()[:20],
+        )
+        snapshot = json.dumps({
+            "date": date,
+            "version": version,
+            "built_at": time.time(),
+            "payload": json.loads(body),
+        })
+        self.env.cr.execute(
+            "UPDATE dojo_kiosk_config "
+            "SET bootstrap_snapshot = %s::jsonb, bootstrap_etag = %s "
+            "WHERE id = %s",
+            [snapshot, etag, self.id],
+        )
+        self.invalidate_recordset(["bootstrap_snapshot", "bootstrap_etag"])
+        return etag
+
+
+def _clear_local_bootstrap_cache(dbname):
+    with _BOOTSTRAP_CACHE_LOCK:
+        for key in [k for k in _BOOTSTRAP_CACHE if k[0] == dbname]:
+            del _BOOTSTRAP_CACHE[key]
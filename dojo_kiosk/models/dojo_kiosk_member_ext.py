@@ -0,0 +1,104 @@
+"""
+Kiosk type-ahead search surface on dojo.member.
+
+Two normalized, stored columns are maintained from the partner data:
+  - kiosk_search_text: lower-cased name, email and member number
+  - kiosk_search_phone: digits-only partner phone
+Both carry pg_trgm GIN indexes (when the extension is available) so the
+kiosk's substring matching avoids sequential scans over dojo_member and the
+res.partner join.
+"""
+import re
+
+from odoo import api, fields, models
+
+_NON_DIGITS = re.compile(r"\D+")
+_MIN_PHONE_DIGITS = 3
+
+
+def _normalize_search_text(*parts):
+    return " ".join(" ".join(p.split()) for p in parts if p).lower()
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class DojoMemberKioskSearch(models.Model):
+    _inherit = "dojo.member"
+
+    kiosk_search_text = fields.Char(
+        compute="_compute_kiosk_search",
+        store=True,
+        index="trigram",
+        readonly=True,
+        copy=False,
+    )
+    kiosk_search_phone = fields.Char(
+        compute="_compute_kiosk_search",
+        store=True,
+        index="trigram",
+        readonly=True,
+        copy=False,
+    )
+
+    @api.depends("partner_id.name", "partner_id.email", "partner_id.phone", "member_number")
+    def _compute_kiosk_search(self):
+        for member in self:
+            member.kiosk_search_text = _normalize_search_text(
+                member.name, member.email, member.member_number
+            )
+            member.kiosk_search_phone = _NON_DIGITS.sub("", member.phone or "") or False
+
+    @api.model
+    def _kiosk_search(self, query, limit=20):
+        """Return active members matching *query*, best matches first.
+
+        Matches are substring hits on the normalized text, or on the phone
+        digits when the query holds at least _MIN_PHONE_DIGITS digits.  They
+        are ranked by prefix match, trigram similarity (when pg_trgm is
+        installed) and most recent attendance.
+        """
+        text = _normalize_search_text(query)
+        digits = _NON_DIGITS.sub("", query or "")
+        if not text:
+            return self.browse()
+
+        self.flush_model(["active", "kiosk_search_text", "kiosk_search_phone"])
+        self.env["dojo.attendance.log"].flush_model(["member_id", "checkin_datetime"])
+
+        params = {
+            "text": text,
+            "pattern": "%%%s%%" % _like_escape(text),
+            "prefix": "%s%%" % _like_escape(text),
+            "limit": limit,
+        }
+        match = "m.kiosk_search_text LIKE %(pattern)s"
+        if len(digits) >= _MIN_PHONE_DIGITS:
+            params["phone"] = "%%%s%%" % digits
+            match = "(%s OR m.kiosk_search_phone LIKE %%(phone)s)" % match
+        similarity = (
+            "similarity(m.kiosk_search_text, %(text)s) DESC,"
+            if self.env.registry.has_trigram else ""
+        )
+        self.env.cr.execute(
+            """
+            SELECT m.id
+              FROM dojo_member m
+         LEFT JOIN LATERAL (
+                    SELECT l.checkin_datetime
+                      FROM dojo_attendance_log l
+                     WHERE l.member_id = m.id
+                  ORDER BY l.checkin_datetime DESC
+                     LIMIT 1
+                   ) last_log ON TRUE
+             WHERE m.active AND {match}
+          ORDER BY (m.kiosk_search_text LIKE %(prefix)s) DESC,
+                   {similarity}
+                   last_log.checkin_datetime DESC NULLS LAST,
+                   m.id
+             LIMIT %(limit)s
+            """.format(match=match, similarity=similarity),
+            params,
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
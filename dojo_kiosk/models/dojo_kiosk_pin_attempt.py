@@ -0,0 +1,117 @@
+"""
+Shared PIN rate-limit store for the kiosk.
+
+One compact row per rate-limit key (kiosk config id or "global:<company>"),
+updated with a single INSERT ... ON CONFLICT statement so that lockouts are
+consistent across every worker and node.  The kiosk service keeps a small
+in-process read-through cache of active lockouts in front of this table so a
+locked tablet hammering the PIN pad costs no database work at all.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+import threading
+
+from odoo import api, fields, models
+
+_MAX_PIN_ATTEMPTS = 5
+_LOCKOUT_MINUTES = 15
+
+# Read-through cache of active lockouts: {(dbname, key): locked_until}.
+# Only lockouts are cached -- attempt counters always live in the database.
+_LOCK_CACHE: "OrderedDict[tuple, object]" = OrderedDict()
+_LOCK_CACHE_LOCK = threading.Lock()
+_LOCK_CACHE_SIZE = 500  # LRU bound, evicts the oldest entry in O(1)
+
+
+class DojoKioskPinAttempt(models.Model):
+    _name = "dojo.kiosk.pin.attempt"
+    _description = "Kiosk PIN Rate Limit"
+    _log_access = False
+
+    key = fields.Char(required=True, readonly=True)
+    attempts = fields.Integer(default=0, readonly=True)
+    locked_until = fields.Datetime(readonly=True)
+
+    _dojo_kiosk_pin_attempt_key_uniq = models.Constraint(
+        "unique(key)",
+        "Only one rate-limit row per key is allowed.",
+    )
+
+    # ── Cache helpers ────────────────────────────────────────────────────
+
+    def _cache_key(self, key):
+        return (self.env.cr.dbname, str(key))
+
+    @api.model
+    def _cached_lockout(self, key, now):
+        """Return the cached locked_until for *key* if still active, else None."""
+        ckey = self._cache_key(key)
+        with _LOCK_CACHE_LOCK:
+            locked_until = _LOCK_CACHE.get(ckey)
+            if locked_until is None:
+                return None
+            if locked_until <= now:
+                del _LOCK_CACHE[ckey]
+                return None
+            _LOCK_CACHE.move_to_end(ckey)
+            return locked_until
+
+    @api.model
+    def _cache_lockout(self, key, locked_until):
+        ckey = self._cache_key(key)
+        with _LOCK_CACHE_LOCK:
+            if locked_until:
+                _LOCK_CACHE[ckey] = locked_until
+                _LOCK_CACHE.move_to_end(ckey)
+                while len(_LOCK_CACHE) > _LOCK_CACHE_SIZE:
+                    _LOCK_CACHE.popitem(last=False)
+            else:
+                _LOCK_CACHE.pop(ckey, None)
+
+    # ── Rate limiting ────────────────────────────────────────────────────
+
+    @api.model
+    def _register_attempt(self, key, success, now=None):
+        """
+        Record one PIN attempt for *key* in a single upsert and return the
+        resulting state as ``{"attempts": int, "locked_until": datetime|None}``.
+
+        While a lockout is active the row is left untouched (a correct PIN
+        does not lift it).  A success resets the counter; the failure that
+        reaches _MAX_PIN_ATTEMPTS sets locked_until and resets the counter.
+        """
+        now = now or fields.Datetime.now()
+        lock_until = now + timedelta(minutes=_LOCKOUT_MINUTES)
+        self.env.cr.execute(
+            """
+            INSERT INTO dojo_kiosk_pin_attempt AS a (key, attempts, locked_until)
+            VALUES (%(key)s, %(initial)s, NULL)
+            ON CONFLICT (key) DO UPDATE SET
+                attempts = CASE
+                    WHEN a.locked_until > %(now)s THEN a.attempts
+                    WHEN %(success)s THEN 0
+                    WHEN a.attempts + 1 >= %(max)s THEN 0
+                    ELSE a.attempts + 1
+                END,
+                locked_until = CASE
+                    WHEN a.locked_until > %(now)s THEN a.locked_until
+                    WHEN %(success)s THEN NULL
+                    WHEN a.attempts + 1 >= %(max)s THEN %(lock_until)s
+                    ELSE NULL
+                END
+            RETURNING attempts, locked_until
+            """,
+            {
+                "key": str(key),
+                "initial": 0 if success else 1,
+                "now": now,
+                "success": bool(success),
+                "max": _MAX_PIN_ATTEMPTS,
+                "lock_until": lock_until,
+            },
+        )
+        attempts, locked_until = self.env.cr.fetchone()
+        if locked_until and locked_until <= now:
+            locked_until = None
+        self._cache_lockout(key, locked_until)
+        return {"attempts": attempts, "locked_until": locked_until}
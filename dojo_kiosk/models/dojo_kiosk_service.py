@@ -2,23 +2,21 @@
 Kiosk service methods -- all business logic for the kiosk SPA lives here.
 Methods are designed to be called from the kiosk HTTP controller via sudo().
 """
+from collections import defaultdict
 from datetime import datetime, timedelta
-import threading
+import time
 
 import pytz
 
 from odoo import api, fields, models
 from odoo.exceptions import AccessError
+from odoo.tools.misc import hmac as hmac_tool
 
-# Module-level rate limit state: {key: {"attempts": int, "locked_until": datetime|None}}
-# Protected by _PIN_ATTEMPTS_LOCK for thread safety within a single worker.
-# NOTE: in multi-worker deployments each worker process has its own dict;
-# a database-backed rate limiter would give full cross-worker protection.
-_PIN_ATTEMPTS: dict = {}
-_PIN_ATTEMPTS_LOCK = threading.Lock()
-_MAX_PIN_ATTEMPTS = 5
-_LOCKOUT_MINUTES = 15
-_MAX_PIN_ENTRIES = 500  # evict oldest entry when this size is reached
+from .dojo_kiosk_config import _BOOTSTRAP_MAX_AGE, _BOOTSTRAP_VERSION_SEQUENCE
+from .dojo_kiosk_pin_attempt import _MAX_PIN_ATTEMPTS
+
+# Roster deltas are only streamed for sessions starting this close to now.
+_ROSTER_STREAM_WINDOW_HOURS = 36
 
 
 class DojoKioskService(models.AbstractModel):
@@ -42,9 +40,62 @@ class DojoKioskService(models.AbstractModel):
         return config
 
     @api.model
-    def get_config_bootstrap(self, token):
-        """Return device config and today's sessions for the initial app load."""
-        config = self.validate_token(token)
+    def get_config_bootstrap(self, token, if_none_match=None):
+        """Return device config and today's sessions for the initial app load.
+
+        The payload is served from the config's precomputed snapshot.  When
+        *if_none_match* equals the current ETag only a not-modified marker is
+        returned.
+        """
+        etag, payload = self._get_bootstrap_snapshot(token)
+        if if_none_match and if_none_match == etag:
+            return {"not_modified": True, "etag": etag}
+        return dict(payload, etag=etag)
+
+    @api.model
+    def _get_bootstrap_snapshot(self, token):
+        """Return ``(etag, payload)`` for *token*, rebuilding the snapshot if stale.
+
+        Worker-local hits cost no database work; otherwise a single indexed
+        query reads the stored snapshot, and only an invalidated or expired
+        snapshot is recomputed.
+        """
+        if not token:
+            raise AccessError("Missing kiosk token.")
+        Config = self.env["dojo.kiosk.config"]
+        cached = Config._get_local_bootstrap(token)
+        if cached:
+            return cached
+
+        self.env.cr.execute(
+            "SELECT id, bootstrap_etag, bootstrap_snapshot, "
+            f"(SELECT last_value FROM {_BOOTSTRAP_VERSION_SEQUENCE}) "
+            "FROM dojo_kiosk_config "
+            "WHERE kiosk_token = %s AND active LIMIT 1",
+            [token],
+        )
+        row = self.env.cr.fetchone()
+        if not row:
+            raise AccessError("Invalid or inactive kiosk token.")
+        config_id, etag, snapshot, version = row
+
+        today = self._kiosk_local_now().strftime("%Y-%m-%d")
+        fresh = (
+            etag and snapshot
+            and snapshot.get("date") == today
+            and snapshot.get("version") == version
+            and snapshot.get("built_at", 0) > time.time() - _BOOTSTRAP_MAX_AGE
+        )
+        if fresh:
+            payload = snapshot["payload"]
+        else:
+            config = Config.browse(config_id)
+            payload = self._build_config_bootstrap(config)
+            etag = config._store_bootstrap(payload, today, version)
+        Config._set_local_bootstrap(token, etag, payload)
+        return etag, payload
+
+    def _build_config_bootstrap(self, config):
         sessions = self.get_todays_sessions()
         announcements = [
             {"id": a.id, "title": a.title or "", "body": a.body or ""}
@@ -58,8 +109,19 @@ class DojoKioskService(models.AbstractModel):
             "show_title": config.show_title,
             "announcements": announcements,
             "sessions": sessions,
+            "roster_channels": [self._roster_channel(config)],
         }
 
+    def _kiosk_local_now(self):
+        """Naive current datetime in the kiosk's local timezone."""
+        tz_name = (
+            self.env.context.get("tz")
+            or self.env.user.tz
+            or self.env.company.partner_id.tz
+            or "UTC"
+        )
+        return datetime.now(pytz.timezone(tz_name)).replace(tzinfo=None)
+
     @api.model
     def get_enrolled_sessions_today(self, member_id, date=None):
         """Return today's open sessions where the member has a registered enrollment."""
@@ -138,8 +200,6 @@ class DojoKioskService(models.AbstractModel):
         override_capacity:
           When True, ignore the per-session capacity limit.
         """
-        from datetime import date as _date
-
         session = self.env["dojo.class.session"].browse(session_id)
         if not session.exists():
             return {"success": False, "error": "Session not found."}
@@ -151,125 +211,179 @@ class DojoKioskService(models.AbstractModel):
         if override_settings:
             enroll_ctx["skip_course_membership_check"] = True
         EnrollModel = self.env["dojo.class.enrollment"].with_context(**enroll_ctx)
-        AutoEnroll = self.env["dojo.course.auto.enroll"]
 
-        added = []
-        skipped = []
-        for member_id in (member_ids or []):
-            member = self.env["dojo.member"].browse(member_id)
-            if not member.exists():
-                skipped.append(member_id)
-                continue
+        requested_ids = list(dict.fromkeys(member_ids or []))
+        members = self.env["dojo.member"].browse(requested_ids).exists()
+        found_ids = set(members.ids)
+        # outcome per member id: True when added, a reason string when skipped
+        outcome = {}
 
-            # ── 1. Pre-checks (course membership + weekly limit) ──────────────
+        # ── 1. Pre-checks (course membership + weekly limit) for the batch ───
+        roster_ids = set(template.course_member_ids.ids) if template else set()
+        eligible = self.env["dojo.member"]
+        for member in members:
             if not override_settings:
                 # Course membership
-                if template and template.course_member_ids and member not in template.course_member_ids:
+                if roster_ids and member.id not in roster_ids:
                     course_name = template.name or "this course"
-                    skipped.append({
-                        "member_id": member_id,
-                        "reason": (
-                            f"{member.name} is not enrolled in {course_name}."
-                        ),
-                    })
+                    outcome[member.id] = f"{member.name} is not enrolled in {course_name}."
                     continue
 
-                # Weekly session limit
+                # Weekly session limit (computed for the whole batch on first read)
                 allowed = member.sessions_allowed_per_week
                 used = member.sessions_used_this_week
                 if allowed > 0 and used >= allowed:
-                    skipped.append({
-                        "member_id": member_id,
-                        "reason": (
-                            f"{member.name} has reached their weekly session limit "
-                            f"({used}/{allowed} sessions used)."
-                        ),
-                    })
+                    outcome[member.id] = (
+                        f"{member.name} has reached their weekly session limit "
+                        f"({used}/{allowed} sessions used)."
+                    )
                     continue
-
-            # Add to course_member_ids when overriding so the ORM constraint and
-            # future cron enrollments both succeed.
-            if override_settings and template and template.course_member_ids:
-                if member not in template.course_member_ids:
-                    template.course_member_ids = [(4, member.id)]
-
-            # ── 2. Session enrollment ───────────────────────────────────────────
-            existing = EnrollModel.search([
+            eligible |= member
+
+        # Add to course_member_ids when overriding so the ORM constraint and
+        # future cron enrollments both succeed.
+        if override_settings and roster_ids:
+            missing = [m.id for m in eligible if m.id not in roster_ids]
+            if missing:
+                template.course_member_ids = [(4, mid) for mid in missing]
+
+        # ── 2. Session enrollments ───────────────────────────────────────────
+        existing_by_member = {}
+        if eligible:
+            for enr in EnrollModel.search([
                 ("session_id", "=", session_id),
-                ("member_id", "=", member_id),
-            ], limit=1)
+                ("member_id", "in", eligible.ids),
+            ]):
+                existing_by_member.setdefault(enr.member_id.id, enr)
+
+        to_reactivate = EnrollModel.browse()
+        create_vals = []
+        seats_taken = session.seats_taken
+        for member in eligible:
+            existing = existing_by_member.get(member.id)
             if existing:
                 if existing.status != "registered":
-                    try:
-                        existing.status = "registered"
-                    except Exception as e:
-                        skipped.append({"member_id": member_id, "reason": str(e)})
-                        continue
-                    added.append(member_id)
+                    to_reactivate |= existing
                 else:
                     # Already registered — still apply auto-enroll pref below
-                    added.append(member_id)
-            else:
-                if not override_capacity and session.capacity > 0 and session.seats_taken >= session.capacity:
-                    skipped.append({"member_id": member_id, "reason": "Session is at full capacity."})
-                    continue
+                    outcome[member.id] = True
+                continue
+            if not override_capacity and session.capacity > 0 and seats_taken >= session.capacity:
+                outcome[member.id] = "Session is at full capacity."
+                continue
+            seats_taken += 1
+            create_vals.append({
+                "session_id": session_id,
+                "member_id": member.id,
+                "status": "registered",
+                "attendance_state": "pending",
+            })
 
-                try:
-                    EnrollModel.create({
-                        "session_id": session_id,
-                        "member_id": member_id,
-                        "status": "registered",
-                        "attendance_state": "pending",
-                    })
-                except Exception as e:
-                    skipped.append({"member_id": member_id, "reason": str(e)})
-                    continue
-                added.append(member_id)
+        if to_reactivate:
+            self._roster_apply_batch(
+                list(to_reactivate),
+                lambda enrs: EnrollModel.browse([e.id for e in enrs]).write({"status": "registered"}),
+                lambda enr: enr.member_id.id,
+                outcome,
+            )
+        if create_vals:
+            self._roster_apply_batch(
+                create_vals,
+                EnrollModel.create,
+                lambda vals: vals["member_id"],
+                outcome,
+            )
 
-            # ── 3. Auto-enroll preference (multiday / permanent) ───────────────────
-            if enroll_type in ("multiday", "permanent") and template:
-                pref_mode = "multiday" if enroll_type == "multiday" else "permanent"
-                day_vals = {
+        # ── 3. Auto-enroll preference (multiday / permanent) ─────────────────
+        added_ids = [mid for mid in requested_ids if outcome.get(mid) is True]
+        if enroll_type in ("multiday", "permanent") and template and added_ids:
+            self._roster_apply_auto_enroll(
+                template, added_ids, enroll_type, date_from, date_to,
+                {
                     "pref_mon": pref_mon, "pref_tue": pref_tue, "pref_wed": pref_wed,
                     "pref_thu": pref_thu, "pref_fri": pref_fri, "pref_sat": pref_sat,
                     "pref_sun": pref_sun,
-                }
-                pref = AutoEnroll.with_context(active_test=False).search([
-                    ("member_id", "=", member_id),
-                    ("template_id", "=", template.id),
-                ], limit=1)
-                if pref:
-                    # Upgrade mode if changing from limited to permanent
-                    write_vals = {"active": True, **day_vals}
-                    if enroll_type == "permanent" and pref.mode != "permanent":
-                        write_vals["mode"] = "permanent"
-                        write_vals["date_from"] = False
-                        write_vals["date_to"] = False
-                    elif enroll_type == "multiday" and pref.mode != "multiday":
-                        write_vals["mode"] = "multiday"
-                        write_vals["date_from"] = date_from or fields.Date.today()
-                        write_vals["date_to"] = date_to or fields.Date.today()
-                    elif enroll_type == "multiday" and pref.mode == "multiday":
-                        # Update the date range even if already multiday
-                        if date_from:
-                            write_vals["date_from"] = date_from
-                        if date_to:
-                            write_vals["date_to"] = date_to
-                    pref.write(write_vals)
-                else:
-                    create_vals = {
-                        "member_id": member_id,
-                        "template_id": template.id,
-                        "active": True,
-                        "mode": pref_mode,
-                        **day_vals,
-                    }
-                    if pref_mode == "multiday":
-                        create_vals["date_from"] = date_from or fields.Date.today()
-                        create_vals["date_to"] = date_to or fields.Date.today()
-                    AutoEnroll.create(create_vals)
+                },
+            )
 
-        return {"success": True, "added": added, "skipped": skipped}
+        skipped = []
+        for member_id in requested_ids:
+            if member_id not in found_ids:
+                skipped.append(member_id)
+            elif outcome.get(member_id) is not True and member_id in outcome:
+                skipped.append({"member_id": member_id, "reason": outcome[member_id]})
+        return {"success": True, "added": added_ids, "skipped": skipped}
+
+    def _roster_apply_batch(self, items, apply, member_of, outcome):
+        """Apply *apply* to all *items* at once, falling back to one by one.
+
+        The set-based call runs inside a savepoint; if any item violates a
+        constraint, items are retried individually so only the offending
+        members are reported as skipped in *outcome*.
+        """
+        try:
+            with self.env.cr.savepoint():
+                apply(items)
+            for item in items:
+                outcome[member_of(item)] = True
+            return
+        except Exception:
+            pass
+        for item in items:
+            try:
+                with self.env.cr.savepoint():
+                    apply([item])
+                outcome[member_of(item)] = True
+            except Exception as e:
+                outcome[member_of(item)] = str(e)
+
+    def _roster_apply_auto_enroll(self, template, member_ids, enroll_type, date_from, date_to, day_vals):
+        """Create or update auto-enroll preferences of *member_ids* on *template*."""
+        AutoEnroll = self.env["dojo.course.auto.enroll"]
+        pref_mode = "multiday" if enroll_type == "multiday" else "permanent"
+        prefs = AutoEnroll.with_context(active_test=False).search([
+            ("member_id", "in", member_ids),
+            ("template_id", "=", template.id),
+        ])
+        pref_by_member = {}
+        for pref in prefs:
+            pref_by_member.setdefault(pref.member_id.id, pref)
+
+        create_vals_list = []
+        for member_id in member_ids:
+            pref = pref_by_member.get(member_id)
+            if pref:
+                # Upgrade mode if changing from limited to permanent
+                write_vals = {"active": True, **day_vals}
+                if enroll_type == "permanent" and pref.mode != "permanent":
+                    write_vals["mode"] = "permanent"
+                    write_vals["date_from"] = False
+                    write_vals["date_to"] = False
+                elif enroll_type == "multiday" and pref.mode != "multiday":
+                    write_vals["mode"] = "multiday"
+                    write_vals["date_from"] = date_from or fields.Date.today()
+                    write_vals["date_to"] = date_to or fields.Date.today()
+                elif enroll_type == "multiday" and pref.mode == "multiday":
+                    # Update the date range even if already multiday
+                    if date_from:
+                        write_vals["date_from"] = date_from
+                    if date_to:
+                        write_vals["date_to"] = date_to
+                pref.write(write_vals)
+            else:
+                create_vals = {
+                    "member_id": member_id,
+                    "template_id": template.id,
+                    "active": True,
+                    "mode": pref_mode,
+                    **day_vals,
+                }
+                if pref_mode == "multiday":
+                    create_vals["date_from"] = date_from or fields.Date.today()
+                    create_vals["date_to"] = date_to or fields.Date.today()
+                create_vals_list.append(create_vals)
+        if create_vals_list:
+            AutoEnroll.create(create_vals_list)
 
     @api.model
     def get_announcements(self, token):
@@ -364,10 +478,81 @@ class DojoKioskService(models.AbstractModel):
             result.append(self._member_roster_entry(member, enr, att_state))
         return result
 
+    # -------------------------------------------------------------------------
+    # Live roster stream
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _roster_channel(self, config):
+        """Bus channel carrying the roster deltas shown on kiosk *config*.
+
+        The name embeds an HMAC of the config and its current token: it cannot
+        be guessed, tablets receive it in the bootstrap payload after token
+        validation, and regenerating the token moves the kiosk to a new
+        channel so a revoked tablet stops receiving roster data.
+        """
+        digest = hmac_tool(
+            self.env(su=True), "dojo_kiosk.roster", (config.id, config.kiosk_token or "")
+        )
+        return "dojo_kiosk_roster_%d_%s" % (config.id, digest[:32])
+
+    @api.model
+    def _notify_roster_changes(self, changes):
+        """Publish roster deltas for ``(session, member, kind, attendance_state)`` tuples.
+
+        kind is one of member_added, member_removed, checked_in, checked_out
+        or attendance_cleared.  Only open sessions starting within
+        _ROSTER_STREAM_WINDOW_HOURS of now are published, so bulk schedule
+        generation does not flood the bus.
+        """
+        if not changes:
+            return
+        now = fields.Datetime.now()
+        window = timedelta(hours=_ROSTER_STREAM_WINDOW_HOURS)
+        events_by_company = defaultdict(list)
+        for session, member, kind, attendance_state in changes:
+            if (
+                not session or not member
+                or session.state != "open"
+                or not session.start_datetime
+                or abs(session.start_datetime - now) > window
+            ):
+                continue
+            event = {
+                "session_id": session.id,
+                "member_id": member.id,
+                "kind": kind,
+                "attendance_state": attendance_state or "",
+            }
+            if kind == "member_added":
+                event["entry"] = self._member_roster_entry(member, attendance_state=attendance_state)
+            events_by_company[session.company_id.id].append(event)
+        if not events_by_company:
+            return
+        # A kiosk shows its own company's sessions plus the shared ones.
+        configs = self.env["dojo.kiosk.config"].sudo().search_fetch(
+            [("active", "=", True)], ["company_id", "kiosk_token"],
+        )
+        Bus = self.env["bus.bus"].sudo()
+        for config in configs:
+            events = events_by_company.get(False, [])
+            if config.company_id:
+                events = events_by_company.get(config.company_id.id, []) + events
+            if events:
+                Bus._sendone(self._roster_channel(config), "dojo.kiosk/roster_delta", {"events": events})
+
     def _member_roster_entry(self, member, enrollment=None, attendance_state=None):
-        """Compact dict for a roster tile."""
+        """Compact dict for a roster tile: the member tile plus attendance and issues."""
         if attendance_state is None:
             attendance_state = enrollment.attendance_state if enrollment else "pending"
+        return dict(
+            self._member_tile_dict(member),
+            attendance_state=attendance_state,
+            issues=self._compute_issue_flags(member),
+        )
+
+    def _member_tile_dict(self, member):
+        """Identity fields shared by search-result and roster tiles (no per-member queries)."""
         return {
             "member_id": member.id,
             "name": member.name,
@@ -375,9 +560,7 @@ class DojoKioskService(models.AbstractModel):
             "image_url": "/web/image/dojo.member/%d/image_128" % member.id,
             "belt_rank": member.current_rank_id.name if member.current_rank_id else "",
             "belt_color": member.current_rank_id.color if member.current_rank_id else "",
-            "attendance_state": attendance_state,
-            "membership_state": member.membership_state if hasattr(member, "membership_state") else "",
-            "issues": self._compute_issue_flags(member),
+            "membership_state": member.membership_state or "",
         }
 
     # -------------------------------------------------------------------------
@@ -396,18 +579,12 @@ class DojoKioskService(models.AbstractModel):
 
     @api.model
     def search_members(self, query, limit=20):
-        """Search members by name, email, or phone for the kiosk search bar."""
+        """Search members by name, email, member number or phone for the kiosk search bar."""
         if not query or len(query.strip()) < 2:
             return []
-        domain = [
-            ("active", "=", True),
-            "|", "|",
-            ("name", "ilike", query.strip()),
-            ("email", "ilike", query.strip()),
-            ("phone", "ilike", query.strip()),
-        ]
-        members = self.env["dojo.member"].search(domain, limit=limit, order="name asc")
-        return [self._member_profile_dict(m) for m in members]
+        members = self.env["dojo.member"]._kiosk_search(query.strip(), limit=limit)
+        # Lightweight tiles only -- the full profile is loaded on selection.
+        return [self._member_tile_dict(m) for m in members]
 
     # -------------------------------------------------------------------------
     # Member profile + issue flags
@@ -422,48 +599,55 @@ class DojoKioskService(models.AbstractModel):
         return self._member_profile_dict(member, session_id=session_id)
 
     def _member_profile_dict(self, member, session_id=None):
-        issues = self._compute_issue_flags(member)
+        member.ensure_one()
+        Enrollment = self.env["dojo.class.enrollment"]
+        AttLog = self.env["dojo.attendance.log"]
 
         # Current enrollment in the requested session
         attendance_state = "pending"
         enrolled = False
         if session_id:
-            enr = self.env["dojo.class.enrollment"].search([
+            enr = Enrollment.search([
                 ("session_id", "=", session_id),
                 ("member_id", "=", member.id),
                 ("status", "=", "registered"),
             ], limit=1)
             enrolled = bool(enr)
             # Use attendance log status so "late" is preserved
-            log = self.env["dojo.attendance.log"].search([
+            log = AttLog.search([
                 ("session_id", "=", session_id),
                 ("member_id", "=", member.id),
             ], limit=1)
             attendance_state = log.status if log else (enr.attendance_state if enr else "pending")
 
-        # Total attendance count
-        total_attendance = self.env["dojo.attendance.log"].search_count([
-            ("member_id", "=", member.id),
-            ("status", "in", ["present", "late"]),
-        ])
-
-        allowed = member.sessions_allowed_per_week  # 0 = unlimited
-        used = member.sessions_used_this_week
+        # Present/late attendance per program in one grouped query; the total
+        # is the sum of the rows
+        AttLog.flush_model(["member_id", "session_id", "status"])
+        self.env["dojo.class.session"].flush_model(["template_id"])
+        self.env["dojo.class.template"].flush_model(["program_id"])
+        self.env.cr.execute(
+            """
+            SELECT t.program_id, COUNT(*)
+              FROM dojo_attendance_log l
+              JOIN dojo_class_session s ON s.id = l.session_id
+         LEFT JOIN dojo_class_template t ON t.id = s.template_id
+             WHERE l.member_id = %s
+               AND l.status IN ('present', 'late')
+          GROUP BY t.program_id
+            """,
+            [member.id],
+        )
+        prog_attendance = dict(self.env.cr.fetchall())
+        total_attendance = sum(prog_attendance.values())
 
         # Upcoming enrolled sessions (appointments)
-        now = fields.Datetime.now()
-        upcoming_enrs = self.env["dojo.class.enrollment"].search([
+        upcoming = Enrollment.search([
             ("member_id", "=", member.id),
             ("status", "=", "registered"),
+            ("session_id.start_datetime", ">=", fields.Datetime.now()),
         ])
-        # Filter future sessions and sort in Python (related field ops not supported in ORM order/search)
-        future_enrs = [
-            e for e in upcoming_enrs
-            if e.session_id and e.session_id.start_datetime and e.session_id.start_datetime >= now
-        ]
-        future_enrs.sort(key=lambda e: e.session_id.start_datetime)
         appointments = []
-        for enr in future_enrs[:7]:
+        for enr in upcoming.sorted(lambda e: e.session_id.start_datetime)[:7]:
             s = enr.session_id
             appointments.append({
                 "session_id": s.id,
@@ -516,17 +700,6 @@ class DojoKioskService(models.AbstractModel):
                         "rank_color": rank_rec.rank_id.color if rank_rec.rank_id else "",
                         "date": rank_rec.date_awarded,
                     }
-            # Count attendance logs per program
-            all_logs = self.env["dojo.attendance.log"].search([
-                ("member_id", "=", member.id),
-                ("status", "in", ["present", "late"]),
-            ])
-            prog_attendance = {}
-            for log in all_logs:
-                tmpl = log.session_id.template_id if log.session_id else None
-                if tmpl and tmpl.program_id:
-                    pid = tmpl.program_id.id
-                    prog_attendance[pid] = prog_attendance.get(pid, 0) + 1
             for prog_key, info in prog_ranks.items():
                 programs.append({
                     "program_name": info["program_name"],
@@ -549,9 +722,9 @@ class DojoKioskService(models.AbstractModel):
             "belt_rank": member.current_rank_id.name if member.current_rank_id else "",
             "belt_color": member.current_rank_id.color if member.current_rank_id else "",
             "total_attendance": total_attendance,
-            "sessions_used_this_week": used,
-            "sessions_allowed_per_week": allowed,
-            "issues": issues,
+            "sessions_used_this_week": member.sessions_used_this_week,
+            "sessions_allowed_per_week": member.sessions_allowed_per_week,  # 0 = unlimited
+            "issues": self._compute_issue_flags(member),
             "enrolled_in_session": enrolled,
             "attendance_state": attendance_state,
             "appointments": appointments,
@@ -603,6 +776,28 @@ class DojoKioskService(models.AbstractModel):
         if not member.exists() or not session.exists():
             return {"success": False, "error": "Member or session not found."}
 
+        result = self._apply_checkin(member, session)
+        if not result["success"]:
+            return result
+
+        return {
+            "success": True,
+            "status": result["status"],
+            "log_id": result["log_id"],
+            "member": self._member_profile_dict(member, session_id=session_id),
+            "session_name": session.name,
+        }
+
+    def _apply_checkin(self, member, session, checkin_datetime=None):
+        """Check *member* into *session* applying the kiosk eligibility rules.
+
+        checkin_datetime is when the member tapped (defaults to now); it
+        decides present vs late.  Returns ``{"success": True, "status",
+        "log_id"}`` or ``{"success": False, "error"}``.
+        """
+        session_id = session.id
+        member_id = member.id
+
         # --- Eligibility ---
         if member.membership_state in ("cancelled", "paused", "lead"):
             return {
@@ -665,7 +860,7 @@ class DojoKioskService(models.AbstractModel):
             })
 
         # --- Determine present / late ---
-        now = fields.Datetime.now()
+        now = checkin_datetime or fields.Datetime.now()
         status = "late" if now > session.start_datetime else "present"
 
         log = self.env["dojo.attendance.log"].create({
@@ -683,13 +878,88 @@ class DojoKioskService(models.AbstractModel):
         # returned profile reflects the newly created enrollment / attendance log.
         member.invalidate_recordset()
 
-        return {
-            "success": True,
-            "status": status,
-            "log_id": log.id,
-            "member": self._member_profile_dict(member, session_id=session_id),
-            "session_name": session.name,
-        }
+        return {"success": True, "status": status, "log_id": log.id}
+
+    @api.model
+    def sync_checkin_events(self, token, events):
+        """Apply a batch of check-ins queued offline by a tablet.
+
+        *events* is a list of ``{"uuid", "member_id", "session_id",
+        "timestamp"}`` dicts (timestamp in UTC, "YYYY-MM-DD HH:MM:SS").
+        All events are applied in this transaction with the same rules as
+        checkin_member(); each UUID is applied at most once, and re-sent
+        UUIDs return their recorded outcome.  Returns one outcome dict per
+        distinct UUID, in input order.
+        """
+        config = self.validate_token(token)
+        Event = self.env["dojo.kiosk.checkin.event"]
+        now = fields.Datetime.now()
+
+        rows = {}
+        for ev in events or []:
+            uuid = str((ev or {}).get("uuid") or "").strip()
+            if not uuid or uuid in rows:
+                continue
+            try:
+                tapped_at = fields.Datetime.to_datetime(ev.get("timestamp")) or now
+            except (ValueError, TypeError):
+                tapped_at = now
+            rows[uuid] = {
+                "uuid": uuid,
+                "config_id": config.id,
+                "member_id": ev.get("member_id"),
+                "session_id": ev.get("session_id"),
+                # Never trust a tablet clock that runs ahead of the server
+                "client_datetime": min(tapped_at, now),
+            }
+        if not rows:
+            return []
+
+        # Unknown ids would violate the foreign keys of the raw insert
+        member_ids = set(self.env["dojo.member"].browse(
+            {r["member_id"] for r in rows.values() if isinstance(r["member_id"], int)}
+        ).exists().ids)
+        session_ids = set(self.env["dojo.class.session"].browse(
+            {r["session_id"] for r in rows.values() if isinstance(r["session_id"], int)}
+        ).exists().ids)
+        for row in rows.values():
+            if row["member_id"] not in member_ids:
+                row["member_id"] = None
+            if row["session_id"] not in session_ids:
+                row["session_id"] = None
+
+        claimed = Event._claim(list(rows.values()))
+        records = {e.uuid: e for e in Event.search([("uuid", "in", list(rows))])}
+
+        # Apply in tap order so present/late and capacity follow real arrival
+        for uuid in sorted(claimed, key=lambda u: rows[u]["client_datetime"]):
+            record = records[uuid]
+            if not record.member_id or not record.session_id:
+                record.write({"state": "rejected", "error": "Member or session not found."})
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    result = self._apply_checkin(
+                        record.member_id, record.session_id, record.client_datetime,
+                    )
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if result["success"]:
+                record.write({"state": "applied", "status": result["status"], "log_id": result["log_id"]})
+            else:
+                record.write({"state": "rejected", "error": result["error"]})
+
+        outcomes = []
+        for uuid in rows:
+            record = records.get(uuid)
+            if record:
+                outcome = record._outcome()
+            else:
+                # Claimed by a concurrent sync committed after our snapshot
+                outcome = {"uuid": uuid, "success": False, "status": "", "error": "in_progress", "log_id": False}
+            outcome["duplicate"] = uuid not in claimed
+            outcomes.append(outcome)
+        return outcomes
 
     # -------------------------------------------------------------------------
     # Instructor — attendance
@@ -911,6 +1181,10 @@ class DojoKioskService(models.AbstractModel):
         Verify the 6-digit instructor PIN with rate limiting.
         Locks out after _MAX_PIN_ATTEMPTS failures for _LOCKOUT_MINUTES minutes.
         token takes priority over legacy config_id.
+
+        Attempt counters live in dojo.kiosk.pin.attempt so lockouts hold
+        across every worker; active lockouts are answered from the
+        in-process cache without touching the database.
         """
         if token:
             try:
@@ -923,20 +1197,17 @@ class DojoKioskService(models.AbstractModel):
         else:
             cfg_id = None
 
-        key = cfg_id or "global"
-        now = datetime.utcnow()
+        # Without a kiosk the PIN is matched against the company's configs,
+        # so the shared bucket is per company too.
+        key = cfg_id or f"global:{self.env.company.id}"
+        now = fields.Datetime.now()
+        Attempt = self.env["dojo.kiosk.pin.attempt"].sudo()
 
-        # Check lockout state under lock (fast path)
-        with _PIN_ATTEMPTS_LOCK:
-            if len(_PIN_ATTEMPTS) >= _MAX_PIN_ENTRIES:
-                # Evict the oldest entry to cap memory usage
-                del _PIN_ATTEMPTS[next(iter(_PIN_ATTEMPTS))]
-            state = _PIN_ATTEMPTS.setdefault(key, {"attempts": 0, "locked_until": None})
-            if state["locked_until"] and now < state["locked_until"]:
-                remaining = int((state["locked_until"] - now).total_seconds() / 60) + 1
-                return {"success": False, "error": "locked", "retry_in_minutes": remaining}
+        # Fast path: lockout already known to this worker
+        locked_until = Attempt._cached_lockout(key, now)
+        if locked_until:
+            return self._pin_locked_result(locked_until, now)
 
-        # Database lookup outside the lock to avoid blocking other threads
         domain = [("active", "=", True), ("pin_code", "=", pin)]
         if cfg_id:
             domain.append(("id", "=", cfg_id))
@@ -944,19 +1215,19 @@ class DojoKioskService(models.AbstractModel):
             domain.append(("company_id", "in", [self.env.company.id, False]))
         found = self.env["dojo.kiosk.config"].search(domain, limit=1)
 
-        # Update attempt counter under lock
-        with _PIN_ATTEMPTS_LOCK:
-            if found:
-                _PIN_ATTEMPTS[key] = {"attempts": 0, "locked_until": None}
-                return {"success": True}
-            state = _PIN_ATTEMPTS.setdefault(key, {"attempts": 0, "locked_until": None})
-            state["attempts"] += 1
-            if state["attempts"] >= _MAX_PIN_ATTEMPTS:
-                state["locked_until"] = now + timedelta(minutes=_LOCKOUT_MINUTES)
-                state["attempts"] = 0
-                return {"success": False, "error": "locked", "retry_in_minutes": _LOCKOUT_MINUTES}
-            remaining_tries = _MAX_PIN_ATTEMPTS - state["attempts"]
-            return {"success": False, "error": "wrong_pin", "remaining_tries": remaining_tries}
+        # One upsert both records the attempt and reports any lockout set by
+        # another worker in the meantime.
+        state = Attempt._register_attempt(key, bool(found), now=now)
+        if state["locked_until"]:
+            return self._pin_locked_result(state["locked_until"], now)
+        if found:
+            return {"success": True}
+        remaining_tries = _MAX_PIN_ATTEMPTS - state["attempts"]
+        return {"success": False, "error": "wrong_pin", "remaining_tries": remaining_tries}
+
+    def _pin_locked_result(self, locked_until, now):
+        remaining = int((locked_until - now).total_seconds() / 60) + 1
+        return {"success": False, "error": "locked", "retry_in_minutes": remaining}
 
     # -------------------------------------------------------------------------
     # Check-out
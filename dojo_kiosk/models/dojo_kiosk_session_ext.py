@@ -0,0 +1,91 @@
+"""
+Invalidate the kiosk bootstrap snapshots when the data they contain changes:
+session scheduling/state and registered seat counts.  Only sessions close
+enough to now to appear in a kiosk's day list count, so recurrence generation
+and other writes to far-off sessions leave the snapshots alone.  Enrollment
+changes are also published as roster deltas (member added / removed) to the
+kiosk bus channels.
+"""
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .dojo_kiosk_service import _ROSTER_STREAM_WINDOW_HOURS
+
+# Session fields rendered in the bootstrap session list.
+_SESSION_BOOTSTRAP_FIELDS = {
+    "template_id", "company_id", "instructor_profile_id",
+    "start_datetime", "end_datetime", "capacity", "state",
+}
+
+
+def _invalidate_bootstrap_for(env, starts):
+    """Bump the bootstrap version if any of the session *starts* falls in the
+    kiosk day window (today's sessions in any timezone start within it)."""
+    now = fields.Datetime.now()
+    window = timedelta(hours=_ROSTER_STREAM_WINDOW_HOURS)
+    if any(start and abs(start - now) <= window for start in starts):
+        env["dojo.kiosk.config"]._bump_bootstrap_version()
+
+
+class DojoClassSessionKioskExt(models.Model):
+    _inherit = "dojo.class.session"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        sessions = super().create(vals_list)
+        _invalidate_bootstrap_for(self.env, sessions.mapped("start_datetime"))
+        return sessions
+
+    def write(self, vals):
+        if not _SESSION_BOOTSTRAP_FIELDS & set(vals):
+            return super().write(vals)
+        starts = self.mapped("start_datetime")
+        result = super().write(vals)
+        _invalidate_bootstrap_for(self.env, starts + self.mapped("start_datetime"))
+        return result
+
+    def unlink(self):
+        _invalidate_bootstrap_for(self.env, self.mapped("start_datetime"))
+        return super().unlink()
+
+
+class DojoClassEnrollmentKioskExt(models.Model):
+    _inherit = "dojo.class.enrollment"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        enrollments = super().create(vals_list)
+        _invalidate_bootstrap_for(self.env, enrollments.session_id.mapped("start_datetime"))
+        self.env["dojo.kiosk.service"]._notify_roster_changes([
+            (enr.session_id, enr.member_id, "member_added", enr.attendance_state)
+            for enr in enrollments if enr.status == "registered"
+        ])
+        return enrollments
+
+    def write(self, vals):
+        if "status" not in vals and "session_id" not in vals:
+            return super().write(vals)
+        before = {enr.id: (enr.session_id, enr.status) for enr in self}
+        starts = self.session_id.mapped("start_datetime")
+        result = super().write(vals)
+        _invalidate_bootstrap_for(self.env, starts + self.session_id.mapped("start_datetime"))
+        changes = []
+        for enr in self:
+            old_session, old_status = before[enr.id]
+            was_on = old_status == "registered"
+            is_on = enr.status == "registered"
+            if was_on and (not is_on or old_session != enr.session_id):
+                changes.append((old_session, enr.member_id, "member_removed", False))
+            if is_on and (not was_on or old_session != enr.session_id):
+                changes.append((enr.session_id, enr.member_id, "member_added", enr.attendance_state))
+        self.env["dojo.kiosk.service"]._notify_roster_changes(changes)
+        return result
+
+    def unlink(self):
+        _invalidate_bootstrap_for(self.env, self.session_id.mapped("start_datetime"))
+        self.env["dojo.kiosk.service"]._notify_roster_changes([
+            (enr.session_id, enr.member_id, "member_removed", False)
+            for enr in self if enr.status == "registered"
+        ])
+        return super().unlink()
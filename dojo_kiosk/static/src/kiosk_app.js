@@ -12,6 +12,10 @@ const KIOSK_TOKEN = window.KIOSK_TOKEN || null;
 
 // ─── Utilities ────────────────────────────────────────────────────────────────
 
+// Raised for a JSON-RPC error reply: the server was reached and said no.
+// Any other exception from jsonPost means the request did not get through.
+class KioskServerError extends Error {}
+
 async function jsonPost(url, params = {}) {
     if (KIOSK_TOKEN) params = { token: KIOSK_TOKEN, ...params };
     const resp = await fetch(url, {
@@ -20,10 +24,107 @@ async function jsonPost(url, params = {}) {
         body: JSON.stringify({ jsonrpc: "2.0", method: "call", params }),
     });
     const data = await resp.json();
-    if (data.error) throw new Error(data.error.data?.message || data.error.message);
+    if (data.error) throw new KioskServerError(data.error.data?.message || data.error.message);
     return data.result;
 }
 
+// ─── Offline check-in queue ───────────────────────────────────────────────────
+// Check-ins that fail for network reasons are stored locally with a client UUID
+// and flushed in bulk to /kiosk/checkin/sync, which applies each UUID once.
+
+const CHECKIN_QUEUE_KEY = `dojo_kiosk_checkin_queue_${KIOSK_TOKEN || ""}`;
+
+function loadCheckinQueue() {
+    try {
+        return JSON.parse(window.localStorage.getItem(CHECKIN_QUEUE_KEY)) || [];
+    } catch {
+        return [];
+    }
+}
+
+function saveCheckinQueue(queue) {
+    window.localStorage.setItem(CHECKIN_QUEUE_KEY, JSON.stringify(queue));
+}
+
+function newUuid() {
+    if (window.crypto && window.crypto.randomUUID) return window.crypto.randomUUID();
+    return "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, (c) => {
+        const r = (Math.random() * 16) | 0;
+        return (c === "x" ? r : (r & 0x3) | 0x8).toString(16);
+    });
+}
+
+function queueCheckin(memberId, sessionId, label = {}) {
+    const queue = loadCheckinQueue();
+    queue.push({
+        uuid: newUuid(),
+        member_id: memberId,
+        session_id: sessionId,
+        // Local only (ignored by the server): to report and undo a rejection
+        member_name: label.memberName || "",
+        session_name: label.sessionName || "",
+        previous_state: label.previousState || "",
+        // UTC "YYYY-MM-DD HH:MM:SS", the server's datetime format
+        timestamp: new Date().toISOString().slice(0, 19).replace("T", " "),
+    });
+    saveCheckinQueue(queue);
+}
+
+/**
+ * Send the queued check-ins to /kiosk/checkin/sync and drop the settled ones.
+ * Returns the queued events the server rejected, each with its `error`.
+ */
+async function flushCheckinQueue() {
+    const queue = loadCheckinQueue();
+    if (!queue.length) return [];
+    const res = await jsonPost("/kiosk/checkin/sync", { events: queue });
+    if (!res || !res.success) return [];
+    const results = (res.results || []).filter(r => r.error !== "in_progress");
+    const settled = new Set(results.map(r => r.uuid));
+    const byUuid = new Map(queue.map(e => [e.uuid, e]));
+    // Re-read: taps queued while the request was in flight must be kept
+    saveCheckinQueue(loadCheckinQueue().filter(e => !settled.has(e.uuid)));
+    return results
+        .filter(r => !r.success && byUuid.has(r.uuid))
+        .map(r => ({ ...byUuid.get(r.uuid), error: r.error || "Check-in rejected." }));
+}
+
+/**
+ * Subscribe to the kiosk roster bus channels over Odoo's /websocket endpoint.
+ * Calls onEvents(events) for every "dojo.kiosk/roster_delta" notification and
+ * reconnects with backoff. Returns a function that closes the stream.
+ */
+function startRosterStream(channels, onEvents) {
+    let ws = null;
+    let lastId = 0;
+    let retryMs = 1000;
+    let stopped = false;
+    const connect = () => {
+        const proto = window.location.protocol === "https:" ? "wss" : "ws";
+        ws = new WebSocket(`${proto}://${window.location.host}/websocket`);
+        ws.onopen = () => {
+            retryMs = 1000;
+            ws.send(JSON.stringify({ event_name: "subscribe", data: { channels, last: lastId } }));
+        };
+        ws.onmessage = (ev) => {
+            let notifications;
+            try { notifications = JSON.parse(ev.data); } catch { return; }
+            for (const notif of notifications || []) {
+                lastId = Math.max(lastId, notif.id || 0);
+                const msg = notif.message || {};
+                if (msg.type === "dojo.kiosk/roster_delta") onEvents((msg.payload || {}).events || []);
+            }
+        };
+        ws.onclose = () => {
+            if (stopped) return;
+            setTimeout(connect, retryMs);
+            retryMs = Math.min(retryMs * 2, 30_000);
+        };
+    };
+    connect();
+    return () => { stopped = true; if (ws) ws.close(); };
+}
+
 function avatarUrl(memberId) {
     return `/web/image/dojo.member/${memberId}/image_128`;
 }
@@ -1532,6 +1633,17 @@ class KioskApp extends Component {
                                 <button class="k-sessions-toast__dismiss" t-on-click="() => this.state.sessionDoneError = null">✕</button>
                             </div>
                         </t>
+                        <t t-if="state.syncRejections.length">
+                            <div class="k-sessions-toast k-sessions-toast--error">
+                                <span>
+                                    Offline check-ins not recorded:
+                                    <t t-foreach="state.syncRejections" t-as="rej" t-key="rej.uuid">
+                                        <br/><t t-esc="rej.label"/>
+                                    </t>
+                                </span>
+                                <button class="k-sessions-toast__dismiss" t-on-click="() => this.state.syncRejections = []">✕</button>
+                            </div>
+                        </t>
                         <div class="k-sessions-list">
                             <t t-foreach="filteredSessions()" t-as="session" t-key="session.id">
                                 <InstructorSessionCard
@@ -1673,6 +1785,7 @@ class KioskApp extends Component {
             instructorMode: false,
             showPin: false,
             sessionDoneError: null,
+            syncRejections: [],
             profileMember: null,
             profileSessionId: null,
             removeAttendancePending: null,
@@ -1698,9 +1811,16 @@ class KioskApp extends Component {
         this._idleTimer = null;
         this._doneErrorTimer = null;
         this._interactionHandler = this._resetIdleTimer.bind(this);
+        this._stopRosterStream = null;
+        this._flushingQueue = false;
+        this._queueTimer = null;
+        this._onlineHandler = () => this._flushCheckinQueue();
 
         onMounted(() => {
             this._bootstrap();
+            this._flushCheckinQueue();
+            this._queueTimer = setInterval(() => this._flushCheckinQueue(), 30_000);
+            window.addEventListener("online", this._onlineHandler);
             this._startBarcodeListener();
             document.addEventListener("click", this._interactionHandler, true);
             document.addEventListener("keydown", this._interactionHandler, true);
@@ -1713,6 +1833,9 @@ class KioskApp extends Component {
             document.removeEventListener("keydown", this._interactionHandler, true);
             document.removeEventListener("touchstart", this._interactionHandler, true);
             clearTimeout(this._idleTimer);
+            if (this._stopRosterStream) this._stopRosterStream();
+            clearInterval(this._queueTimer);
+            window.removeEventListener("online", this._onlineHandler);
         });
     }
 
@@ -1742,12 +1865,22 @@ class KioskApp extends Component {
             this.state.theme = "dark";
         }
         try {
-            const data = await jsonPost("/kiosk/api/bootstrap");
+            // Conditional GET: the browser revalidates with If-None-Match, so an
+            // unchanged snapshot costs a bodiless 304.
+            const resp = await fetch(`/kiosk/api/bootstrap/${encodeURIComponent(KIOSK_TOKEN || "")}`, {
+                cache: "no-cache",
+            });
+            const data = resp.ok ? await resp.json() : await jsonPost("/kiosk/api/bootstrap");
             if (data && !data.error) {
                 this.state.announcements = data.announcements || [];
                 this.state.marketing_cards = data.marketing_cards || [];
                 this.state.sessions = data.sessions || [];
                 this.state.showTitle = data.show_title !== false;
+                if (data.roster_channels && data.roster_channels.length && !this._stopRosterStream) {
+                    this._stopRosterStream = startRosterStream(
+                        data.roster_channels, (events) => this._applyRosterEvents(events)
+                    );
+                }
                 if (data.theme_mode && data.theme_mode !== this.state.theme) {
                     this.onTheme(data.theme_mode);
                 }
@@ -1821,6 +1954,26 @@ class KioskApp extends Component {
         }
     }
 
+    _applyRosterEvents(events) {
+        // Deltas are idempotent: re-applying an event leaves the roster unchanged.
+        for (const ev of events) {
+            const roster = this.state.sessionRosters[ev.session_id];
+            if (!roster) continue;
+            const idx = roster.findIndex(r => r.member_id === ev.member_id);
+            if (ev.kind === "member_added") {
+                if (idx === -1 && ev.entry) roster.push(ev.entry);
+            } else if (ev.kind === "member_removed") {
+                if (idx !== -1) roster.splice(idx, 1);
+            } else if (idx !== -1) {
+                roster[idx].attendance_state = ev.attendance_state;
+            }
+            const session = this.state.sessions.find(s => s.id === ev.session_id);
+            if (session && (ev.kind === "member_added" || ev.kind === "member_removed")) {
+                session.seats_taken = roster.length;
+            }
+        }
+    }
+
     _updateSessionRosterEntry(sessionId, memberId, changes) {
         const roster = this.state.sessionRosters[sessionId];
         if (!roster) return;
@@ -1934,15 +2087,71 @@ class KioskApp extends Component {
                 this.state.searchQuery = "";
                 this.state.searchResults = [];
             }, 3500);
-        } catch {
+        } catch (e) {
+            if (e instanceof KioskServerError) {
+                // Reached the server, which refused: show it, never queue it
+                modal.result = {
+                    success: false,
+                    sessionName: session.template_name || session.name,
+                    programName: session.program_name || "",
+                    error: e.message || "Check-in failed.",
+                };
+                setTimeout(() => {
+                    this.state.checkinModal = null;
+                    this.state.searchQuery = "";
+                    this.state.searchResults = [];
+                }, 3500);
+                return;
+            }
+            // Offline: keep the tap and sync it once the server is reachable
+            const entry = (this.state.sessionRosters[session.id] || [])
+                .find(r => r.member_id === member.member_id);
+            queueCheckin(member.member_id, session.id, {
+                memberName: member.name || "",
+                sessionName: session.template_name || session.name || "",
+                previousState: entry ? entry.attendance_state || "" : "",
+            });
+            this._updateSessionRosterEntry(session.id, member.member_id, { attendance_state: "present" });
             modal.result = {
-                success: false,
-                sessionName: "",
-                programName: "",
-                error: "Network error. Please try again.",
+                success: true,
+                sessionName: session.template_name || session.name,
+                programName: session.program_name || "",
+                error: "",
             };
-            setTimeout(() => { this.state.checkinModal = null; }, 3500);
+            setTimeout(() => {
+                this.state.checkinModal = null;
+                this.state.searchQuery = "";
+                this.state.searchResults = [];
+            }, 3500);
+        }
+    }
+
+    async _flushCheckinQueue() {
+        if (this._flushingQueue) return;
+        this._flushingQueue = true;
+        let rejected = [];
+        try {
+            rejected = await flushCheckinQueue();
+        } catch (e) {
+            // Still offline — retried on the next tick
+        } finally {
+            this._flushingQueue = false;
+        }
+        if (!rejected.length) return;
+        // Undo the optimistic "present" and tell the instructor why
+        for (const ev of rejected) {
+            console.warn("Kiosk: offline check-in rejected", ev);
+            this._updateSessionRosterEntry(ev.session_id, ev.member_id, {
+                attendance_state: ev.previous_state || "",
+            });
         }
+        this.state.syncRejections = [
+            ...this.state.syncRejections,
+            ...rejected.map(ev => ({
+                uuid: ev.uuid,
+                label: `${ev.member_name || "Member"} — ${ev.session_name || "session"}: ${ev.error}`,
+            })),
+        ];
     }
 
     clearCheckinResult() {
@@ -6,6 +6,33 @@ import json
 from datetime import datetime, timedelta
 
 
+# Odoo's color-index palette, used for the program card accents.
+_PROGRAM_COLORS = [
+    '#714B67', '#017E84', '#0D6EFD', '#17A2B8', '#28A745',
+    '#FFC107', '#DC3545', '#6F42C1', '#E83E8C', '#FD7E14',
+    '#20C997', '#6C757D',
+]
+
+
+# /my/dojo/json/home sections → (payload builder, accepts member_id).
+_HOME_SECTIONS = {
+    'schedule': ('_schedule_payload', True),
+    'enrollments': ('_enrollments_payload', True),
+    'attendance': ('_attendance_payload', True),
+    'auto_enroll': ('_auto_enroll_payload', True),
+    'belt': ('_belt_payload', True),
+    'belt_history': ('_belt_history_payload', True),
+    'programs': ('_programs_payload', True),
+    'household': ('_household_payload', False),
+    'billing': ('_billing_payload', False),
+}
+# Sent when no ``sections`` are requested; billing is loaded on its own.
+_HOME_DEFAULT_SECTIONS = (
+    'schedule', 'enrollments', 'attendance', 'household', 'programs',
+    'belt_history', 'auto_enroll',
+)
+
+
 class DojoMemberPortal(CustomerPortal):
     """Portal controller for Dojo member-facing pages under /my."""
 
@@ -52,7 +79,10 @@ class DojoMemberPortal(CustomerPortal):
         Students (role == 'student') are strictly limited to their own record.
         Parents and 'both' roles see the entire household.
         """
-        member = self._get_current_member()
+        return self._household_member_ids_for(self._get_current_member())
+
+    def _household_member_ids_for(self, member):
+        """``_get_household_member_ids`` for an already resolved *member*."""
         if not member:
             return []
         # Students may only ever see their own data — never siblings or parents
@@ -62,27 +92,43 @@ class DojoMemberPortal(CustomerPortal):
             return member.household_id.member_ids.ids
         return [member.id]
 
-    def _get_student_members(self):
+    def _get_student_members(self, scope=None):
         """Return dojo.member records that are students in the current household.
 
         Only meaningful for parents; returns an empty RecordSet for students.
+        Pass an already resolved ``_portal_scope()`` as *scope* to skip the
+        member lookup.
         """
-        member = self._get_current_member()
+        scope = scope or self._portal_scope()
+        member = scope['member']
         if not member or member.role == 'student':
             return request.env['dojo.member'].sudo().browse([])
         all_members = request.env['dojo.member'].sudo().browse(
-            self._get_household_member_ids()
+            scope['household_member_ids']
         )
         return all_members.filtered(lambda m: m.role in ('student', 'both'))
 
-    def _resolve_view_member_ids(self, member_id=None):
+    def _portal_scope(self):
+        """Resolve the current member and their visible household once.
+
+        Returns ``{'member': dojo.member or None, 'household_member_ids': [...]}``,
+        which the ``_*_payload`` builders take instead of re-resolving both.
+        """
+        member = self._get_current_member()
+        return {
+            'member': member,
+            'household_member_ids': self._household_member_ids_for(member),
+        }
+
+    def _resolve_view_member_ids(self, member_id=None, scope=None):
         """Return the list of member IDs to use for a JSON data request.
 
         If ``member_id`` is provided and the caller is a parent, validate that
         the requested member belongs to their household and return [member_id].
         Students always get only their own ID regardless of params.
         """
-        member = self._get_current_member()
+        scope = scope or self._portal_scope()
+        member = scope['member']
         if not member:
             return []
         if member.role == 'student':
@@ -92,11 +138,14 @@ class DojoMemberPortal(CustomerPortal):
                 mid = int(member_id)
             except (TypeError, ValueError):
                 mid = None
-            if mid:
-                hm_ids = self._get_household_member_ids()
-                if mid in hm_ids:
-                    return [mid]
-        return self._get_household_member_ids()
+            if mid and mid in scope['household_member_ids']:
+                return [mid]
+        return scope['household_member_ids']
+
+    def _json_response(self, data):
+        return request.make_response(
+            json.dumps(data), headers=[('Content-Type', 'application/json')]
+        )
 
     def _get_household_invoice_ids(self):
         """Return all account.move IDs for invoices tied to household subscriptions."""
@@ -135,13 +184,14 @@ class DojoMemberPortal(CustomerPortal):
     # ── /my/dojo  (unified portal page) ─────────────────────────────────
     @http.route('/my/dojo', type='http', auth='user', website=True)
     def portal_dojo_home(self, tab='programs', saved=None, upgraded=None, invoice_warning=None, **kwargs):
-        member = self._get_current_member()
+        scope = self._portal_scope()
+        member = scope['member']
         if not member:
             return request.render('dojo_members_portal.portal_no_member', {})
         env = request.env
         is_parent = member.role in ('parent', 'both')
         is_student_only = member.role == 'student'
-        household_member_ids = self._get_household_member_ids()
+        household_member_ids = scope['household_member_ids']
 
         attendance_count = env['dojo.attendance.log'].sudo().search_count([
             ('member_id', 'in', household_member_ids),
@@ -156,7 +206,9 @@ class DojoMemberPortal(CustomerPortal):
         members_json = json.dumps([{'id': m.id, 'name': m.name, 'role': m.role or ''} for m in household_members])
 
         # Student members for the household switcher (parents only)
-        student_members = self._get_student_members() if is_parent else env['dojo.member'].sudo().browse([])
+        student_members = (
+            self._get_student_members(scope) if is_parent else env['dojo.member'].sudo().browse([])
+        )
         students_json = json.dumps([{'id': m.id, 'name': m.name} for m in student_members])
 
         belt = self._get_belt_context(member)
@@ -202,51 +254,74 @@ class DojoMemberPortal(CustomerPortal):
         return request.redirect('/my/dojo?tab=attendance')
 
     # ── JSON data endpoints for the OWL activities component ──────────────
+    @http.route('/my/dojo/json/home', type='http', auth='user')
+    def portal_json_home(self, sections=None, member_id=None, **kwargs):
+        """Return several portal sections in one response.
+
+        ``sections`` is a comma-separated subset of ``_HOME_SECTIONS`` (unknown
+        names are ignored); the result is ``{section: payload}`` with the same
+        payloads as the matching ``/my/dojo/json/<section>`` endpoints.  The
+        member and household are resolved once for all of them.
+        """
+        if sections:
+            names = [name.strip() for name in sections.split(',') if name.strip()]
+        else:
+            names = _HOME_DEFAULT_SECTIONS
+        scope = self._portal_scope()
+        data = {}
+        for name in names:
+            if name in data or name not in _HOME_SECTIONS:
+                continue
+            method, takes_member = _HOME_SECTIONS[name]
+            builder = getattr(self, method)
+            data[name] = builder(scope, member_id) if takes_member else builder(scope)
+        return self._json_response(data)
+
     @http.route('/my/dojo/json/belt', type='http', auth='user')
     def portal_json_belt(self, member_id=None, **kwargs):
+        return self._json_response(self._belt_payload(self._portal_scope(), member_id))
+
+    def _belt_payload(self, scope, member_id=None):
         """Return belt rank context for a member. Parents can request any household member."""
-        current = self._get_current_member()
+        current = scope['member']
         if not current:
-            return request.make_response(
-                json.dumps({'error': 'not found'}),
-                headers=[('Content-Type', 'application/json')],
-            )
+            return {'error': 'not found'}
         # Resolve target member
         target = current
         if member_id and current.role != 'student':
             try:
                 mid = int(member_id)
-                hm_ids = self._get_household_member_ids()
+                hm_ids = scope['household_member_ids']
                 if mid in hm_ids:
                     target = request.env['dojo.member'].sudo().browse(mid)
             except (TypeError, ValueError):
                 pass
         belt = self._get_belt_context(target)
-        return request.make_response(
-            json.dumps({
-                'member_id': target.id,
-                'member_name': target.name or '',
-                'current_rank': (
-                    {
-                        'id': belt['current_rank'].id,
-                        'name': belt['current_rank'].name,
-                        'color': getattr(belt['current_rank'], 'color', None) or '#cccccc',
-                    } if belt.get('current_rank') else None
-                ),
-                'next_rank': (
-                    {'id': belt['next_rank'].id, 'name': belt['next_rank'].name}
-                    if belt.get('next_rank') else None
-                ),
-                'rank_pct': belt.get('rank_pct', 0),
-            }),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {
+            'member_id': target.id,
+            'member_name': target.name or '',
+            'current_rank': (
+                {
+                    'id': belt['current_rank'].id,
+                    'name': belt['current_rank'].name,
+                    'color': getattr(belt['current_rank'], 'color', None) or '#cccccc',
+                } if belt.get('current_rank') else None
+            ),
+            'next_rank': (
+                {'id': belt['next_rank'].id, 'name': belt['next_rank'].name}
+                if belt.get('next_rank') else None
+            ),
+            'rank_pct': belt.get('rank_pct', 0),
+        }
 
     @http.route('/my/dojo/json/schedule', type='http', auth='user')
     def portal_json_schedule(self, member_id=None, **kwargs):
-        member = self._get_current_member()
+        return self._json_response(self._schedule_payload(self._portal_scope(), member_id))
+
+    def _schedule_payload(self, scope, member_id=None):
+        member = scope['member']
         is_parent = member.role in ('parent', 'both') if member else True
-        household_member_ids = self._resolve_view_member_ids(member_id)
+        household_member_ids = self._resolve_view_member_ids(member_id, scope)
         household_members = request.env['dojo.member'].sudo().browse(household_member_ids)
 
         # Scope sessions to programs covered by each member's active subscription.
@@ -262,10 +337,7 @@ class DojoMemberPortal(CustomerPortal):
                 program_member_map.setdefault(prog_id, []).append(m.id)
 
         if not program_member_map:
-            return request.make_response(
-                json.dumps({'sessions': [], 'can_enroll': is_parent}),
-                headers=[('Content-Type', 'application/json')],
-            )
+            return {'sessions': [], 'can_enroll': is_parent}
 
         domain = [
             ('state', '=', 'open'),
@@ -300,14 +372,14 @@ class DojoMemberPortal(CustomerPortal):
                 'eligible_member_ids': eligible_member_ids,
                 'credits_per_class': credits_per_class,
             })
-        return request.make_response(
-            json.dumps({'sessions': data, 'can_enroll': is_parent}),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {'sessions': data, 'can_enroll': is_parent}
 
     @http.route('/my/dojo/json/enrollments', type='http', auth='user')
     def portal_json_enrollments(self, member_id=None, **kwargs):
-        member_ids = self._resolve_view_member_ids(member_id)
+        return self._json_response(self._enrollments_payload(self._portal_scope(), member_id))
+
+    def _enrollments_payload(self, scope, member_id=None):
+        member_ids = self._resolve_view_member_ids(member_id, scope)
         enrollments = request.env['dojo.class.enrollment'].sudo().search(
             [('member_id', 'in', member_ids)],
             limit=200,
@@ -339,15 +411,15 @@ class DojoMemberPortal(CustomerPortal):
                 'status': e.status or '',
                 'attendance_state': e.attendance_state or '',
             })
-        return request.make_response(
-            json.dumps({'enrollments': data}),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {'enrollments': data}
 
     # ── Auto-Enroll Preferences ────────────────────────────────────────────
 
     @http.route('/my/dojo/json/auto-enroll', type='http', auth='user')
     def portal_json_auto_enroll(self, member_id=None, **kwargs):
+        return self._json_response(self._auto_enroll_payload(self._portal_scope(), member_id))
+
+    def _auto_enroll_payload(self, scope, member_id=None):
         """Return auto-enroll status for ALL active recurring class templates.
 
         Each entry represents one (member, template) pair.  If the member has an
@@ -355,17 +427,14 @@ class DojoMemberPortal(CustomerPortal):
         (active=True, permanent, no specific days) is synthesised so the UI always
         shows every available recurring class.
         """
-        member_ids = self._resolve_view_member_ids(member_id)
+        member_ids = self._resolve_view_member_ids(member_id, scope)
         household_members = request.env['dojo.member'].sudo().browse(member_ids)
         # Parents are guardians, not class participants — only query students.
         household_members = household_members.filtered(
             lambda m: m.role in ('student', 'both')
         )
         if not household_members:
-            return request.make_response(
-                json.dumps({'preferences': []}),
-                headers=[('Content-Type', 'application/json')],
-            )
+            return {'preferences': []}
 
         # Only recurring templates the students are actually enrolled in
         enrolled_tmpl_ids = set()
@@ -444,10 +513,7 @@ class DojoMemberPortal(CustomerPortal):
                 pref = pref_by_key.get((m.id, tmpl.id))
                 data.append(_row(m, tmpl, pref))
 
-        return request.make_response(
-            json.dumps({'preferences': data}),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {'preferences': data}
 
     @http.route('/my/dojo/auto-enroll', type='http', auth='user', methods=['POST'])
     def portal_post_auto_enroll(self, **post):
@@ -546,7 +612,10 @@ class DojoMemberPortal(CustomerPortal):
 
     @http.route('/my/dojo/json/attendance', type='http', auth='user')
     def portal_json_attendance(self, member_id=None, **kwargs):
-        member_ids = self._resolve_view_member_ids(member_id)
+        return self._json_response(self._attendance_payload(self._portal_scope(), member_id))
+
+    def _attendance_payload(self, scope, member_id=None):
+        member_ids = self._resolve_view_member_ids(member_id, scope)
         logs = request.env['dojo.attendance.log'].sudo().search(
             [('member_id', 'in', member_ids)],
             order='checkin_datetime desc',
@@ -575,23 +644,20 @@ class DojoMemberPortal(CustomerPortal):
                 'status': log.status or 'present',
                 'note': log.note or '',
             })
-        return request.make_response(
-            json.dumps({'logs': data}),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {'logs': data}
 
     @http.route('/my/dojo/json/household', type='http', auth='user')
     def portal_json_household(self, **kwargs):
-        member = self._get_current_member()
+        return self._json_response(self._household_payload(self._portal_scope()))
+
+    def _household_payload(self, scope):
+        member = scope['member']
         if not member:
-            return request.make_response(
-                json.dumps({'error': 'No member found'}),
-                headers=[('Content-Type', 'application/json')],
-            )
+            return {'error': 'No member found'}
         is_parent = member.role in ('parent', 'both')
         household = member.sudo().household_id
         hm_records = request.env['dojo.member'].sudo().browse(
-            self._get_household_member_ids()
+            scope['household_member_ids']
         )
         members_data = []
         for m in hm_records:
@@ -632,14 +698,11 @@ class DojoMemberPortal(CustomerPortal):
                 'credit_confirmed': getattr(sub, 'credit_confirmed', 0) if sub else 0,
                 'plan': plan_data,
             })
-        return request.make_response(
-            json.dumps({
-                'can_edit': is_parent,
-                'household_name': household.name if household else '',
-                'members': members_data,
-            }),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {
+            'can_edit': is_parent,
+            'household_name': household.name if household else '',
+            'members': members_data,
+        }
 
     @http.route('/my/dojo/enroll', type='http', auth='user', methods=['POST'])
     def portal_enroll(self, session_id=None, member_id=None, **kwargs):
@@ -752,218 +815,247 @@ class DojoMemberPortal(CustomerPortal):
 
     # ── Private helpers ────────────────────────────────────────────────────
     def _build_programs_for_member(self, target):
-        """Build programs data list for a given dojo.member record.
+        """Build programs data list for a given dojo.member record."""
+        return self._build_programs_for_members(target).get(target.id, [])
+
+    def _build_programs_for_members(self, members):
+        """Build the program cards of several dojo.member records at once.
 
-        Uses ``dojo.program.enrollment`` as the authoritative source for which
-        programs the member belongs to (active and historical).  Class-template
-        associations are still populated from the course roster / session history
-        so the card can show which classes are included.
+        Returns ``{member_id: [card, ...]}``.  Uses ``dojo.program.enrollment``
+        as the authoritative source for which programs a member belongs to
+        (active and historical).  Class-template associations are still
+        populated from the course roster / session history so the card can
+        show which classes are included.
+
+        Enrollments, templates, belt paths and rank history are read once for
+        the whole set, so a household costs the same handful of queries as a
+        single member.
         """
         env = request.env
+        members = members.sudo().exists()
+        cards = {member.id: [] for member in members}
+        if not members:
+            return cards
 
         # ── Source: program enrollment records ──────────────────────────────
-        enrollments = env['dojo.program.enrollment'].sudo().search([
-            ('member_id', '=', target.id),
-        ], order='is_active desc, enrolled_date desc')
-
-        if not enrollments:
-            return []
-
-        # Deduplicate programs: for each unique program keep is_active=True if any
+        # For each member and unique program keep is_active=True if any
         # enrollment for that program is currently active.
-        program_active_map = {}  # program_id → {'program': record, 'is_active': bool}
-        for enr in enrollments:
-            pid = enr.program_id.id
-            if pid not in program_active_map:
-                program_active_map[pid] = {
+        program_active_map = {}  # member_id → {program_id: {'program', 'is_active'}}
+        for enr in env['dojo.program.enrollment'].sudo().search_fetch(
+            [('member_id', 'in', members.ids)],
+            ['member_id', 'program_id', 'is_active'],
+            order='is_active desc, enrolled_date desc',
+        ):
+            programs = program_active_map.setdefault(enr.member_id.id, {})
+            pdata = programs.get(enr.program_id.id)
+            if pdata is None:
+                programs[enr.program_id.id] = {
                     'program': enr.program_id,
                     'is_active': enr.is_active,
                 }
             elif enr.is_active:
-                program_active_map[pid]['is_active'] = True
+                pdata['is_active'] = True
+        if not program_active_map:
+            return cards
 
         # ── Class templates shown in each program card ───────────────────────
         # Still inferred from roster + session history (independent of enrollments)
-        roster_templates = target.enrolled_template_ids
-        enrollment_recs = env['dojo.class.enrollment'].sudo().search([
-            ('member_id', '=', target.id),
-            ('status', '!=', 'cancelled'),
-        ])
-        enrollment_templates = enrollment_recs.mapped('session_id.template_id')
-        all_templates = roster_templates | enrollment_templates
-
-        templates_by_program = {}
-        for t in all_templates:
-            if t.program_id:
-                pid = t.program_id.id
-                if pid not in templates_by_program:
-                    templates_by_program[pid] = []
-                if t.id not in [x.id for x in templates_by_program[pid]]:
-                    templates_by_program[pid].append(t)
+        member_templates = {member.id: list(member.enrolled_template_ids) for member in members}
+        for enr in env['dojo.class.enrollment'].sudo().search_fetch(
+            [('member_id', 'in', members.ids), ('status', '!=', 'cancelled')],
+            ['member_id', 'session_id'],
+        ):
+            if enr.session_id.template_id:
+                member_templates[enr.member_id.id].append(enr.session_id.template_id)
+
+        templates_by_program = {}  # member_id → {program_id: {template_id: template}}
+        for member_id, templates in member_templates.items():
+            by_program = templates_by_program[member_id] = {}
+            for t in templates:
+                if t.program_id:
+                    by_program.setdefault(t.program_id.id, {}).setdefault(t.id, t)
 
         # ── Belt path metadata ────────────────────────────────────────────────
-        ODOO_COLORS = [
-            '#714B67', '#017E84', '#0D6EFD', '#17A2B8', '#28A745',
-            '#FFC107', '#DC3545', '#6F42C1', '#E83E8C', '#FD7E14',
-            '#20C997', '#6C757D',
-        ]
-        current_rank = getattr(target, 'current_rank_id', None) or None
-        test_pending = bool(getattr(target, 'test_invite_pending', False))
-        all_rank_history = getattr(target, 'rank_history_ids', env['dojo.member.rank'].sudo().browse([]))
-        all_company_ranks = env['dojo.belt.rank'].sudo().search(
-            [('company_id', '=', target.company_id.id), ('active', '=', True)],
+        company_ids = members.company_id.ids
+        if not all(members.mapped('company_id')):
+            company_ids.append(False)
+        company_ranks = {}  # company_id → [rank_id, ...] ordered by sequence
+        for rank in env['dojo.belt.rank'].sudo().search(
+            [('company_id', 'in', company_ids), ('active', '=', True)],
             order='sequence asc',
-        )
-
-        programs_data = []
-        for pdata in program_active_map.values():
-            prog = pdata['program']
-            is_active = pdata['is_active']
-            prog_belts = prog.belt_rank_ids.sorted(lambda r: r.sequence)
-            belt_path = prog_belts if prog_belts else all_company_ranks
-            path_ids = belt_path.ids
-            current_in_path = next_in_path = None
-            rank_pct = 0
-            if current_rank and path_ids:
-                if current_rank.id in path_ids:
-                    idx = path_ids.index(current_rank.id)
-                else:
-                    history_rank_ids = set(
-                        target.rank_history_ids.mapped('rank_id').ids
-                    ) if hasattr(target, 'rank_history_ids') else set()
-                    achieved_in_path = [
-                        i for i, rid in enumerate(path_ids)
-                        if rid in history_rank_ids
-                    ]
-                    idx = max(achieved_in_path) if achieved_in_path else -1
-                if idx >= 0:
-                    total = len(path_ids)
-                    current_in_path = belt_path[idx]
-                    next_in_path = belt_path[idx + 1] if idx + 1 < total else None
-                    rank_pct = int(((idx + 1) / total) * 100) if total else 0
-            prog_color = ODOO_COLORS[(prog.color or 0) % len(ODOO_COLORS)] if prog.color else '#6C757D'
-            programs_data.append({
-                'id': prog.id,
-                'name': prog.name or '',
-                'code': prog.code or '',
-                'color': prog_color,
-                'is_active': is_active,
-                'templates': [
-                    {'id': t.id, 'name': t.name or '', 'level': t.level or 'all'}
-                    for t in templates_by_program.get(prog.id, [])
-                ],
-                'belt_path': [
-                    {'id': r.id, 'name': r.name or '', 'color': r.color or '#cccccc', 'sequence': r.sequence}
-                    for r in belt_path
-                ],
-                'current_rank_id': current_in_path.id if current_in_path else None,
-                'current_rank_name': current_in_path.name if current_in_path else None,
-                'current_rank_color': (current_in_path.color or '#cccccc') if current_in_path else None,
-                'next_rank_id': next_in_path.id if next_in_path else None,
-                'next_rank_name': next_in_path.name if next_in_path else None,
-                'rank_pct': rank_pct,
-                'rank_position': (path_ids.index(current_in_path.id) + 1) if current_in_path else 0,
-                'rank_total': len(path_ids),
-                'test_invite_pending': test_pending,
-                'rank_history': [
-                    {
-                        'rank_name': h.rank_id.name if h.rank_id else '',
-                        'rank_color': h.rank_id.color if h.rank_id else '#cccccc',
-                        'date_awarded': fields.Date.to_string(h.date_awarded) if h.date_awarded else None,
-                        'awarded_by': h.awarded_by.name if h.awarded_by else None,
-                    }
-                    for h in all_rank_history.sorted(lambda r: r.date_awarded or fields.Date.today(), reverse=True)
-                    # If the rank record has an explicit program, match by program;
-                    # otherwise fall back to belt-path membership for legacy records.
-                    if h.rank_id and (
-                        (h.program_id and h.program_id.id == prog.id)
-                        or (not h.program_id and h.rank_id.id in path_ids)
-                    )
-                ],
-            })
-        return programs_data
+        ):
+            company_ranks.setdefault(rank.company_id.id, []).append(rank.id)
+        BeltRank = env['dojo.belt.rank'].sudo()
+        program_belts = {}  # program_id → dojo.belt.rank ordered by sequence
+
+        history_by_member = self._rank_history_by_member(members)
+
+        for member in members:
+            current_rank = getattr(member, 'current_rank_id', None) or None
+            test_pending = bool(getattr(member, 'test_invite_pending', False))
+            history = history_by_member.get(member.id, [])
+            history_rank_ids = {h.rank_id.id for h in history if h.rank_id}
+            all_company_ranks = BeltRank.browse(company_ranks.get(member.company_id.id, []))
+            programs_data = cards[member.id]
+            for pdata in program_active_map.get(member.id, {}).values():
+                prog = pdata['program']
+                is_active = pdata['is_active']
+                if prog.id not in program_belts:
+                    program_belts[prog.id] = prog.belt_rank_ids.sorted(lambda r: r.sequence)
+                prog_belts = program_belts[prog.id]
+                belt_path = prog_belts if prog_belts else all_company_ranks
+                path_ids = belt_path.ids
+                path_positions = {rid: i for i, rid in enumerate(path_ids)}
+                current_in_path = next_in_path = None
+                rank_pct = 0
+                if current_rank and path_ids:
+                    if current_rank.id in path_positions:
+                        idx = path_positions[current_rank.id]
+                    else:
+                        achieved_in_path = [
+                            path_positions[rid] for rid in history_rank_ids
+                            if rid in path_positions
+                        ]
+                        idx = max(achieved_in_path) if achieved_in_path else -1
+                    if idx >= 0:
+                        total = len(path_ids)
+                        current_in_path = belt_path[idx]
+                        next_in_path = belt_path[idx + 1] if idx + 1 < total else None
+                        rank_pct = int(((idx + 1) / total) * 100) if total else 0
+                prog_color = (
+                    _PROGRAM_COLORS[(prog.color or 0) % len(_PROGRAM_COLORS)]
+                    if prog.color else '#6C757D'
+                )
+                programs_data.append({
+                    'id': prog.id,
+                    'name': prog.name or '',
+                    'code': prog.code or '',
+                    'color': prog_color,
+                    'is_active': is_active,
+                    'templates': [
+                        {'id': t.id, 'name': t.name or '', 'level': t.level or 'all'}
+                        for t in templates_by_program[member.id].get(prog.id, {}).values()
+                    ],
+                    'belt_path': [
+                        {'id': r.id, 'name': r.name or '', 'color': r.color or '#cccccc', 'sequence': r.sequence}
+                        for r in belt_path
+                    ],
+                    'current_rank_id': current_in_path.id if current_in_path else None,
+                    'current_rank_name': current_in_path.name if current_in_path else None,
+                    'current_rank_color': (current_in_path.color or '#cccccc') if current_in_path else None,
+                    'next_rank_id': next_in_path.id if next_in_path else None,
+                    'next_rank_name': next_in_path.name if next_in_path else None,
+                    'rank_pct': rank_pct,
+                    'rank_position': (path_positions[current_in_path.id] + 1) if current_in_path else 0,
+                    'rank_total': len(path_ids),
+                    'test_invite_pending': test_pending,
+                    'rank_history': [
+                        self._belt_history_row(h)
+                        for h in history
+                        # If the rank record has an explicit program, match by program;
+                        # otherwise fall back to belt-path membership for legacy records.
+                        if h.rank_id and (
+                            (h.program_id and h.program_id.id == prog.id)
+                            or (not h.program_id and h.rank_id.id in path_positions)
+                        )
+                    ],
+                })
+        return cards
+
+    def _rank_history_by_member(self, members):
+        """Return {member_id: [dojo.member.rank, ...]} newest award first."""
+        today = fields.Date.today()
+        history_by_member = {}
+        for h in request.env['dojo.member.rank'].sudo().search(
+            [('member_id', 'in', members.ids)]
+        ).sorted(lambda r: r.date_awarded or today, reverse=True):
+            history_by_member.setdefault(h.member_id.id, []).append(h)
+        return history_by_member
+
+    def _belt_history_row(self, h):
+        return {
+            'rank_name': h.rank_id.name if h.rank_id else '',
+            'rank_color': h.rank_id.color if h.rank_id else '#cccccc',
+            'date_awarded': fields.Date.to_string(h.date_awarded) if h.date_awarded else None,
+            'awarded_by': h.awarded_by.name if h.awarded_by else None,
+        }
 
     def _build_belt_history_for_member(self, target):
         """Build belt rank award history list for a given dojo.member record."""
-        history = getattr(target, 'rank_history_ids', request.env['dojo.member.rank'].sudo().browse([]))
-        data = []
-        for h in history.sorted(lambda r: r.date_awarded or fields.Date.today(), reverse=True):
-            data.append({
-                'rank_name': h.rank_id.name if h.rank_id else '',
-                'rank_color': h.rank_id.color if h.rank_id else '#cccccc',
-                'date_awarded': fields.Date.to_string(h.date_awarded) if h.date_awarded else None,
-                'awarded_by': h.awarded_by.name if h.awarded_by else None,
-            })
-        return data
+        return self._build_belt_history_for_members(target).get(target.id, [])
+
+    def _build_belt_history_for_members(self, members):
+        """Build belt rank award history lists as ``{member_id: [row, ...]}``."""
+        members = members.sudo().exists()
+        history_by_member = self._rank_history_by_member(members)
+        return {
+            member.id: [self._belt_history_row(h) for h in history_by_member.get(member.id, [])]
+            for member in members
+        }
 
     # ── /my/dojo/json/programs ──────────────────────────────────────────────
     @http.route('/my/dojo/json/programs', type='http', auth='user')
     def portal_json_programs(self, member_id=None, **kwargs):
+        return self._json_response(self._programs_payload(self._portal_scope(), member_id))
+
+    def _programs_payload(self, scope, member_id=None):
         """Return programs the member is enrolled in with per-program belt path.
 
         For parent users without a member_id, returns all household students'
         programs grouped: {programs: [], students: [{id, name, programs, belt_history}]}
         """
-        current = self._get_current_member()
+        current = scope['member']
         if not current:
-            return request.make_response(
-                json.dumps({'programs': [], 'students': []}),
-                headers=[('Content-Type', 'application/json')],
-            )
-        def _json(d):
-            return request.make_response(
-                json.dumps(d), headers=[('Content-Type', 'application/json')]
-            )
+            return {'programs': [], 'students': []}
         # Parent without a specific student selected → return all students' data
         if not member_id and current.role != 'student':
-            hm_ids = self._get_household_member_ids()
-            students_data = []
-            for mid in hm_ids:
-                m = request.env['dojo.member'].sudo().browse(mid)
-                if not m.exists() or m.role not in ('student', 'both'):
-                    continue
-                students_data.append({
+            students = request.env['dojo.member'].sudo().browse(
+                scope['household_member_ids']
+            ).exists().filtered(lambda m: m.role in ('student', 'both'))
+            programs = self._build_programs_for_members(students)
+            belt_history = self._build_belt_history_for_members(students)
+            students_data = [
+                {
                     'id': m.id,
                     'name': m.name or '',
-                    'programs': self._build_programs_for_member(m),
-                    'belt_history': self._build_belt_history_for_member(m),
-                })
-            return _json({'programs': [], 'students': students_data})
+                    'programs': programs[m.id],
+                    'belt_history': belt_history[m.id],
+                }
+                for m in students
+            ]
+            return {'programs': [], 'students': students_data}
         # Specific member or student self-view
         target = current
         if member_id and current.role != 'student':
             try:
                 mid = int(member_id)
-                hm_ids = self._get_household_member_ids()
+                hm_ids = scope['household_member_ids']
                 if mid in hm_ids:
                     target = request.env['dojo.member'].sudo().browse(mid)
             except (TypeError, ValueError):
                 pass
-        return _json({'programs': self._build_programs_for_member(target), 'students': []})
+        return {'programs': self._build_programs_for_member(target), 'students': []}
 
     # ── /my/dojo/json/belt-history ──────────────────────────────────────────
     @http.route('/my/dojo/json/belt-history', type='http', auth='user')
     def portal_json_belt_history(self, member_id=None, **kwargs):
+        return self._json_response(self._belt_history_payload(self._portal_scope(), member_id))
+
+    def _belt_history_payload(self, scope, member_id=None):
         """Return rank award history for a member."""
-        current = self._get_current_member()
+        current = scope['member']
         if not current:
-            return request.make_response(
-                json.dumps({'history': []}),
-                headers=[('Content-Type', 'application/json')],
-            )
+            return {'history': []}
         target = current
         if member_id and current.role != 'student':
             try:
                 mid = int(member_id)
-                hm_ids = self._get_household_member_ids()
+                hm_ids = scope['household_member_ids']
                 if mid in hm_ids:
                     target = request.env['dojo.member'].sudo().browse(mid)
             except (TypeError, ValueError):
                 pass
-        return request.make_response(
-            json.dumps({'history': self._build_belt_history_for_member(target)}),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {'history': self._build_belt_history_for_member(target)}
 
     # ── /my/dojo/unenroll ──────────────────────────────────────────────────
     @http.route('/my/dojo/unenroll', type='http', auth='user', methods=['POST'])
@@ -1089,13 +1181,13 @@ class DojoMemberPortal(CustomerPortal):
     # ── /my/dojo/json/billing  (parents only) ──────────────────────────────
     @http.route('/my/dojo/json/billing', type='http', auth='user')
     def portal_json_billing(self, **kwargs):
-        member = self._get_current_member()
+        return self._json_response(self._billing_payload(self._portal_scope()))
+
+    def _billing_payload(self, scope):
+        member = scope['member']
         if not member or member.role not in ('parent', 'both'):
-            return request.make_response(
-                json.dumps({'error': 'Not authorised'}),
-                headers=[('Content-Type', 'application/json')],
-            )
-        member_ids = self._get_household_member_ids()
+            return {'error': 'Not authorised'}
+        member_ids = scope['household_member_ids']
         env = request.env
 
         # Active subscription for any household member
@@ -1174,15 +1266,12 @@ class DojoMemberPortal(CustomerPortal):
                 if token:
                     payment_method_data = {'name': token.payment_details or token.display_name or 'Card on file'}
 
-        return request.make_response(
-            json.dumps({
-                'subscription': sub_data,
-                'plans': plans_data,
-                'invoices': invoices_data,
-                'payment_method': payment_method_data,
-            }),
-            headers=[('Content-Type', 'application/json')],
-        )
+        return {
+            'subscription': sub_data,
+            'plans': plans_data,
+            'invoices': invoices_data,
+            'payment_method': payment_method_data,
+        }
 
     # ── Billing action endpoints (parents only) ───────────────────────────
     def _get_household_active_sub(self):
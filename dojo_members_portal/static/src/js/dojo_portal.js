@@ -60,6 +60,18 @@
             .catch(function()  { return {}; });
     }
 
+    /* Several /my/dojo/json/<section> payloads in one round trip; a section
+       that failed or was not returned comes back as {}. */
+    function fetchSections(sections, memberId) {
+        var url = "/my/dojo/json/home?sections=" + sections.join(",");
+        if (memberId) url += "&member_id=" + memberId;
+        return fetchJson(url).then(function(d){
+            var out = {};
+            sections.forEach(function(name){ out[name] = (d && d[name]) || {}; });
+            return out;
+        });
+    }
+
     /* ── Card builders ──────────────────────────────────────────────────── */
     function sessionCard(s) {
         var lvl = b(LEVEL, s.level);
@@ -712,14 +724,10 @@
                     .then(function(res){
                         if (res.ok) {
                             // Refresh all relevant state, then close overlay and re-render
-                            Promise.all([
-                                fetchJson("/my/dojo/json/enrollments"),
-                                fetchJson("/my/dojo/json/schedule"),
-                                fetchJson("/my/dojo/json/household"),
-                            ]).then(function(results) {
-                                state.enrollments = (results[0] && results[0].enrollments) || state.enrollments;
-                                state.sessions    = (results[1] && results[1].sessions)    || state.sessions;
-                                if (results[2] && results[2].members) state.household = results[2];
+                            fetchSections(["enrollments", "schedule", "household"]).then(function(r) {
+                                state.enrollments = r.enrollments.enrollments || state.enrollments;
+                                state.sessions    = r.schedule.sessions       || state.sessions;
+                                if (r.household.members) state.household = r.household;
                                 closeOverlay();
                                 if (onUpdate) onUpdate();
                             });
@@ -1238,23 +1246,16 @@
             state.selectedStudentBelt = null;
             state.loading = true;
             render(root, state, isParent, members, students, isStudentOnly);
-            var qs = studentId ? '?member_id=' + studentId : '';
-            Promise.all([
-                fetchJson('/my/dojo/json/schedule'     + qs),
-                fetchJson('/my/dojo/json/enrollments'  + qs),
-                fetchJson('/my/dojo/json/attendance'   + qs),
-                fetchJson('/my/dojo/json/programs'     + qs),
-                studentId ? fetchJson('/my/dojo/json/belt?member_id='         + studentId) : Promise.resolve(null),
-                studentId ? fetchJson('/my/dojo/json/belt-history?member_id=' + studentId) : Promise.resolve(null),
-                fetchJson('/my/dojo/json/auto-enroll' + qs),
-            ]).then(function(r) {
-                state.sessions            = r[0].sessions    || [];
-                state.enrollments         = r[1].enrollments || [];
-                state.logs                = r[2].logs        || [];
-                state.programs            = r[3].programs    || [];
-                state.selectedStudentBelt = r[4];
-                state.beltHistory         = r[5] ? (r[5].history || []) : [];
-                state.autoEnrollPrefs     = r[6] ? (r[6].preferences || []) : [];
+            var sections = ['schedule', 'enrollments', 'attendance', 'programs', 'auto_enroll'];
+            if (studentId) sections.push('belt', 'belt_history');
+            fetchSections(sections, studentId).then(function(r) {
+                state.sessions            = r.schedule.sessions       || [];
+                state.enrollments         = r.enrollments.enrollments || [];
+                state.logs                = r.attendance.logs         || [];
+                state.programs            = r.programs.programs       || [];
+                state.selectedStudentBelt = studentId ? r.belt : null;
+                state.beltHistory         = studentId ? (r.belt_history.history || []) : [];
+                state.autoEnrollPrefs     = r.auto_enroll.preferences || [];
                 state.loading = false;
                 render(root, state, isParent, members, students, isStudentOnly);
             });
@@ -1281,14 +1282,10 @@
                     .then(function(res){
                         if (res.ok) {
                             // Refresh enrollments, sessions and household credits then re-render
-                            Promise.all([
-                                fetchJson('/my/dojo/json/enrollments'),
-                                fetchJson('/my/dojo/json/schedule'),
-                                fetchJson('/my/dojo/json/household'),
-                            ]).then(function(results) {
-                                state.enrollments = (results[0] && results[0].enrollments) || state.enrollments;
-                                state.sessions    = (results[1] && results[1].sessions)    || state.sessions;
-                                if (results[2] && results[2].members) state.household = results[2];
+                            fetchSections(['enrollments', 'schedule', 'household']).then(function(r) {
+                                state.enrollments = r.enrollments.enrollments || state.enrollments;
+                                state.sessions    = r.schedule.sessions       || state.sessions;
+                                if (r.household.members) state.household = r.household;
                                 render(root, state, isParent, members, students, isStudentOnly);
                             });
                         } else { btn.disabled = false; btn.textContent = 'Cancel'; alert(res.error || 'Could not cancel.'); }
@@ -1612,27 +1609,31 @@
         var brand = document.querySelector(".o_portal_navbar .navbar-brand");
         if (brand) brand.textContent = TAB_TITLES[state.activeTab] || "Dojo Portal";
 
-        Promise.all([
-            fetchJson("/my/dojo/json/schedule"),
-            fetchJson("/my/dojo/json/enrollments"),
-            fetchJson("/my/dojo/json/attendance"),
-            fetchJson("/my/dojo/json/household"),
-            fetchJson("/my/dojo/json/programs"),
-            fetchJson("/my/dojo/json/belt-history"),
-            isParent ? fetchJson("/my/dojo/json/billing") : Promise.resolve(null),
-            fetchJson("/my/dojo/json/auto-enroll"),
-        ]).then(function(results){
-            state.sessions        = results[0].sessions    || [];
-            state.enrollments     = results[1].enrollments || [];
-            state.logs            = results[2].logs        || [];
-            state.household       = results[3];
-            state.programs        = results[4].programs    || [];
-            state.studentPrograms = results[4].students    || [];
-            state.beltHistory     = results[5].history     || [];
-            state.billing         = results[6];
-            state.autoEnrollPrefs = results[7] ? (results[7].preferences || []) : [];
+        // Everything but billing arrives in one request; billing (parents only)
+        // is rarely opened, so it follows in the background unless it is the
+        // tab being opened.
+        var sections = ["schedule", "enrollments", "attendance", "household",
+                        "programs", "belt_history", "auto_enroll"];
+        var billingFirst = isParent && state.activeTab === "billing";
+        if (billingFirst) sections.push("billing");
+        fetchSections(sections).then(function(r){
+            state.sessions        = r.schedule.sessions       || [];
+            state.enrollments     = r.enrollments.enrollments || [];
+            state.logs            = r.attendance.logs         || [];
+            state.household       = r.household;
+            state.programs        = r.programs.programs       || [];
+            state.studentPrograms = r.programs.students       || [];
+            state.beltHistory     = r.belt_history.history    || [];
+            state.autoEnrollPrefs = r.auto_enroll.preferences || [];
+            if (billingFirst) state.billing = r.billing;
             state.loading         = false;
             render(root, state, isParent, members, students, isStudentOnly);
+            if (isParent && !billingFirst) {
+                fetchJson("/my/dojo/json/billing").then(function(d){
+                    state.billing = d;
+                    render(root, state, isParent, members, students, isStudentOnly);
+                });
+            }
         });
     }
 
@@ -14,6 +14,7 @@
         "data/ir_cron.xml",
         "views/dojo_program_enrollment_views.xml",
         "views/dojo_subscription_views.xml",
+        "views/dojo_billing_run_views.xml",
     ],
     "post_init_hook": "populate_program_enrollments",
     "application": True,
@@ -7,3 +7,5 @@ from . import dojo_class_template_inherit
 from . import dojo_class_enrollment_inherit
 from . import dojo_member_weekly_counter
 from . import dojo_program_enrollment
+from . import dojo_member_week_usage
+from . import dojo_billing_run
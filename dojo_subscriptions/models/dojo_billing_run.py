@@ -0,0 +1,394 @@
+"""
+Chunked, parallel subscription billing runs.
+
+The daily invoice cron no longer bills every household group in one long
+transaction.  It plans a dojo.billing.run for the day: the due groups (one
+per billing partner + company) are split into dojo.billing.run.chunk rows of
+_BILLING_CHUNK_SIZE groups each.  A bounded pool of worker crons
+(_BILLING_WORKER_CRONS) then claims chunks with SELECT ... FOR UPDATE SKIP
+LOCKED, so the Stripe round-trips made by the dojo_stripe override overlap
+across workers instead of running back to back.
+
+A claim is a lease, committed right away: the chunk goes to 'running' until
+lease_until.  Each group is then billed in its own savepoint and committed
+together with its outcome in group_results, so an invoice (and the charge
+behind it) is never rolled back by a later group of the same chunk.  A
+worker that dies leaves its chunk 'running'; once the lease runs out another
+worker re-claims it (up to _BILLING_CHUNK_MAX_ATTEMPTS times) and resumes
+after the last committed group.  Groups that raised go to 'error' and leave
+the chunk 'failed'; action_retry_failed() queues them again.
+
+Double billing is prevented twice over: groups with a recorded outcome are
+never billed again by their chunk, and every group is re-checked against the
+invoiced-today anti-join right before it is billed.  Only chunks of today's
+run are claimed; pending chunks of an earlier day are expired, their
+subscriptions being planned again by today's run.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Household billing groups per chunk (one transaction each).
+_BILLING_CHUNK_SIZE = 25
+# Worker crons sharing the chunk queue; the pool size is the length of this tuple.
+_BILLING_WORKER_CRONS = (
+    "dojo_subscriptions.ir_cron_dojo_billing_worker_1",
+    "dojo_subscriptions.ir_cron_dojo_billing_worker_2",
+    "dojo_subscriptions.ir_cron_dojo_billing_worker_3",
+    "dojo_subscriptions.ir_cron_dojo_billing_worker_4",
+)
+# A worker stops claiming new chunks after this long and re-triggers itself.
+_BILLING_WORKER_BUDGET_SECONDS = 300
+# A claimed chunk may be re-claimed once its lease (renewed after every
+# group) has run out; a chunk is given up after this many claims.
+_BILLING_CHUNK_LEASE_SECONDS = 600
+_BILLING_CHUNK_MAX_ATTEMPTS = 3
+
+
+class DojoBillingRun(models.Model):
+    _name = "dojo.billing.run"
+    _description = "Dojo Billing Run"
+    _order = "run_date desc, id desc"
+    _rec_name = "run_date"
+
+    run_date = fields.Date(required=True, readonly=True, index=True)
+    state = fields.Selection(
+        [("running", "Running"), ("done", "Done")],
+        default="running",
+        required=True,
+        readonly=True,
+    )
+    started_at = fields.Datetime(readonly=True, default=fields.Datetime.now)
+    finished_at = fields.Datetime(readonly=True)
+    chunk_ids = fields.One2many("dojo.billing.run.chunk", "run_id", string="Chunks", readonly=True)
+
+    # ── Metrics (aggregated from the chunks) ─────────────────────────────
+    chunk_count = fields.Integer(compute="_compute_metrics")
+    chunks_done = fields.Integer(compute="_compute_metrics", string="Chunks Processed")
+    group_count = fields.Integer(compute="_compute_metrics", string="Billing Groups")
+    invoiced_count = fields.Integer(compute="_compute_metrics", string="Groups Invoiced")
+    failed_count = fields.Integer(compute="_compute_metrics", string="Groups Failed")
+    failed_chunk_count = fields.Integer(compute="_compute_metrics", string="Chunks Failed")
+    duration_seconds = fields.Float(compute="_compute_metrics", string="Duration (s)")
+    throughput_per_minute = fields.Float(compute="_compute_metrics", string="Groups / Minute")
+    avg_chunk_ms = fields.Float(compute="_compute_metrics", string="Avg Chunk Latency (ms)")
+    max_chunk_ms = fields.Integer(compute="_compute_metrics", string="Max Chunk Latency (ms)")
+
+    @api.depends(
+        "chunk_ids.state", "chunk_ids.duration_ms", "chunk_ids.finished_at",
+        "chunk_ids.invoiced_count", "chunk_ids.failed_count", "started_at", "finished_at",
+    )
+    def _compute_metrics(self):
+        for run in self:
+            chunks = run.chunk_ids
+            processed = chunks.filtered(lambda c: c.state in ("done", "failed", "expired"))
+            latencies = processed.mapped("duration_ms")
+            run.chunk_count = len(chunks)
+            run.chunks_done = len(processed)
+            run.group_count = sum(chunks.mapped("group_count"))
+            run.invoiced_count = sum(processed.mapped("invoiced_count"))
+            run.failed_count = sum(processed.mapped("failed_count"))
+            run.failed_chunk_count = len(processed.filtered(lambda c: c.state in ("failed", "expired")))
+            run.avg_chunk_ms = sum(latencies) / len(latencies) if latencies else 0.0
+            run.max_chunk_ms = max(latencies) if latencies else 0
+            end = run.finished_at or max(processed.mapped("finished_at"), default=False)
+            duration = (end - run.started_at).total_seconds() if end and run.started_at else 0.0
+            run.duration_seconds = duration
+            groups_done = run.invoiced_count + run.failed_count
+            run.throughput_per_minute = groups_done * 60.0 / duration if duration else 0.0
+
+    # ── Planning ─────────────────────────────────────────────────────────
+
+    @api.model
+    def _start_run(self, today):
+        """Plan today's billing run (once per day) and start the worker pool.
+
+        The calling cron then works through the queue itself, so billing
+        also completes where only a single cron thread is available.
+        """
+        run = self.search([("run_date", "=", today)], limit=1)
+        if not run:
+            run = self._plan_run(today)
+        if not run:
+            return self.browse()
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
+        self._trigger_workers()
+        self._work_chunks(today)
+        return run
+
+    @api.model
+    def _plan_run(self, today):
+        """Create a run and its chunks for every group due on *today*.
+
+        Returns an empty recordset when nothing is due.
+        """
+        Subscription = self.env["dojo.member.subscription"]
+        groups = Subscription._group_for_invoicing(Subscription._due_for_invoicing(today))
+        if not groups:
+            return self.browse()
+        run = self.create({"run_date": today})
+        self.env["dojo.billing.run.chunk"].create([
+            {
+                "run_id": run.id,
+                "sequence": index,
+                "groups": [group.ids for group in groups[offset:offset + _BILLING_CHUNK_SIZE]],
+                "group_count": len(groups[offset:offset + _BILLING_CHUNK_SIZE]),
+            }
+            for index, offset in enumerate(range(0, len(groups), _BILLING_CHUNK_SIZE))
+        ])
+        _logger.info(
+            "Dojo billing: run %s planned %d groups in %d chunks.",
+            run.id, len(groups), len(run.chunk_ids),
+        )
+        return run
+
+    def action_retry_failed(self):
+        """Queue the failed chunks of today's run again; only their groups
+        that raised are billed again."""
+        today = fields.Date.today()
+        if any(run.run_date != today for run in self):
+            raise UserError(
+                "Only today's billing run can be retried; earlier runs' "
+                "subscriptions are billed by the next daily run."
+            )
+        chunks = self.chunk_ids.filtered(lambda c: c.state == "failed")
+        if not chunks:
+            return
+        chunks.write({"state": "pending", "attempts": 0, "lease_until": False})
+        chunks.run_id.write({"state": "running", "finished_at": False})
+        self._trigger_workers()
+
+    @api.model
+    def _trigger_workers(self):
+        for xmlid in _BILLING_WORKER_CRONS:
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            if cron and cron.active:
+                cron.sudo()._trigger()
+
+    # ── Workers ──────────────────────────────────────────────────────────
+
+    @api.model
+    def _cron_work(self):
+        """Entry point of the worker crons: drain today's pending chunks."""
+        self._work_chunks(fields.Date.today())
+
+    @api.model
+    def _work_chunks(self, today):
+        """Claim and process chunks of *today*'s run until the queue is empty
+        or the time budget runs out."""
+        Chunk = self.env["dojo.billing.run.chunk"]
+        commit = not self.env.registry.in_test_mode()
+        deadline = time.monotonic() + _BILLING_WORKER_BUDGET_SECONDS
+        while True:
+            if time.monotonic() > deadline:
+                # Let another pass (this worker or a sibling) pick up the rest.
+                self._trigger_workers()
+                break
+            chunk = Chunk._claim_next(today)
+            if not chunk:
+                break
+            if commit:
+                # Make the lease visible before any group is billed.
+                self.env.cr.commit()
+            chunk._process()
+            if commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        self._finalize_runs(today)
+        if commit:
+            self.env.cr.commit()
+
+    @api.model
+    def _finalize_runs(self, today):
+        """Expire the unfinished chunks of earlier days and close running runs
+        that have no pending or running chunk left."""
+        Chunk = self.env["dojo.billing.run.chunk"]
+        Chunk.flush_model()
+        self.env.cr.execute(
+            """
+            UPDATE dojo_billing_run_chunk c
+               SET state = 'expired',
+                   error = 'Not processed on its run date; billed by a later run.'
+              FROM dojo_billing_run r
+             WHERE r.id = c.run_id
+               AND r.run_date < %(today)s
+               AND (c.state = 'pending'
+                    OR (c.state = 'running' AND c.lease_until < %(now)s))
+            """,
+            {"today": today, "now": fields.Datetime.now()},
+        )
+        Chunk.invalidate_model(["state", "error"])
+        self.env.cr.execute(
+            """
+            SELECT r.id
+              FROM dojo_billing_run r
+             WHERE r.state = 'running'
+               AND NOT EXISTS (
+                    SELECT 1 FROM dojo_billing_run_chunk c
+                     WHERE c.run_id = r.id AND c.state IN ('pending', 'running')
+               )
+               FOR UPDATE SKIP LOCKED
+            """
+        )
+        runs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if runs:
+            runs.write({"state": "done", "finished_at": fields.Datetime.now()})
+            for run in runs:
+                _logger.info(
+                    "Dojo billing: run %s done — %d groups invoiced, %d failed, "
+                    "%.1f groups/min, avg chunk %.0f ms.",
+                    run.id, run.invoiced_count, run.failed_count,
+                    run.throughput_per_minute, run.avg_chunk_ms,
+                )
+
+
+class DojoBillingRunChunk(models.Model):
+    _name = "dojo.billing.run.chunk"
+    _description = "Dojo Billing Run Chunk"
+    _order = "run_id desc, sequence, id"
+    _log_access = False
+
+    run_id = fields.Many2one("dojo.billing.run", required=True, ondelete="cascade", index=True, readonly=True)
+    sequence = fields.Integer(readonly=True)
+    groups = fields.Json(
+        readonly=True,
+        help="Billing groups of this chunk, as lists of dojo.member.subscription ids.",
+    )
+    group_results = fields.Json(
+        readonly=True,
+        help="Outcome per group index: {'state': 'invoiced' | 'skipped' | "
+             "'declined' | 'error', 'error': message}.",
+    )
+    group_count = fields.Integer(readonly=True)
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+            ("expired", "Expired"),
+        ],
+        default="pending",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    attempts = fields.Integer(readonly=True)
+    lease_until = fields.Datetime(readonly=True)
+    invoiced_count = fields.Integer(readonly=True)
+    failed_count = fields.Integer(readonly=True)
+    started_at = fields.Datetime(readonly=True)
+    finished_at = fields.Datetime(readonly=True)
+    duration_ms = fields.Integer(string="Latency (ms)", readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def _claim_next(self, today):
+        """Lease and return the next chunk of *today*'s run that is pending,
+        or running under an expired lease; an empty recordset if none."""
+        self.flush_model()
+        now = fields.Datetime.now()
+        while True:
+            self.env.cr.execute(
+                """
+                SELECT c.id, c.attempts
+                  FROM dojo_billing_run_chunk c
+                  JOIN dojo_billing_run r ON r.id = c.run_id
+                 WHERE r.run_date = %(today)s
+                   AND (c.state = 'pending'
+                        OR (c.state = 'running' AND c.lease_until < %(now)s))
+                 ORDER BY c.run_id, c.sequence, c.id
+                 LIMIT 1
+                   FOR UPDATE OF c SKIP LOCKED
+                """,
+                {"today": today, "now": now},
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                return self.browse()
+            chunk_id, attempts = row
+            chunk = self.browse(chunk_id)
+            if attempts < _BILLING_CHUNK_MAX_ATTEMPTS:
+                break
+            _logger.error(
+                "Dojo billing: chunk %s of run %s given up after %d attempts.",
+                chunk.id, chunk.run_id.id, attempts,
+            )
+            chunk.write({
+                "state": "failed",
+                "error": "Worker lost %d times; retry from the billing run." % attempts,
+                "finished_at": now,
+            })
+            chunk.flush_recordset()
+        chunk.write({
+            "state": "running",
+            "attempts": attempts + 1,
+            "lease_until": now + timedelta(seconds=_BILLING_CHUNK_LEASE_SECONDS),
+            "started_at": chunk.started_at or now,
+        })
+        return chunk
+
+    def _process(self):
+        """Bill the groups of this leased chunk that have no outcome yet (or
+        raised before) and record per-group outcomes and metrics.
+
+        Commits after every group outside of tests, renewing the lease.
+        """
+        self.ensure_one()
+        Subscription = self.env["dojo.member.subscription"]
+        commit = not self.env.registry.in_test_mode()
+        started = time.monotonic()
+        today = self.run_id.run_date
+        results = dict(self.group_results or {})
+        for index, group_ids in enumerate(self.groups or []):
+            key = str(index)
+            if key in results and results[key]["state"] != "error":
+                continue
+            if fields.Date.today() != today:
+                # Past midnight: today's run owns these subscriptions now.
+                self.write({
+                    "state": "expired",
+                    "error": "Not processed on its run date; billed by a later run.",
+                    "finished_at": fields.Datetime.now(),
+                })
+                return
+            try:
+                with self.env.cr.savepoint():
+                    # Skip anything billed since planning (re-run, manual invoice).
+                    group_subs = Subscription._due_for_invoicing(today, group_ids)
+                    if not group_subs:
+                        outcome = {"state": "skipped"}
+                    elif Subscription._invoice_billing_group(group_subs, today):
+                        outcome = {"state": "invoiced"}
+                    else:
+                        outcome = {"state": "declined"}
+            except Exception as exc:
+                _logger.error(
+                    "Dojo billing: group %s of chunk %s (run %s) failed: %s",
+                    group_ids, self.id, self.run_id.id, exc, exc_info=True,
+                )
+                outcome = {"state": "error", "error": str(exc)}
+            results[key] = outcome
+            self.write({
+                "group_results": results,
+                "lease_until": fields.Datetime.now() + timedelta(seconds=_BILLING_CHUNK_LEASE_SECONDS),
+            })
+            if commit:
+                self.env.cr.commit()
+        states = [result["state"] for result in results.values()]
+        errors = [result["error"] for result in results.values() if result["state"] == "error"]
+        self.write({
+            "state": "failed" if errors else "done",
+            "error": "\n".join(errors) or False,
+            "lease_until": False,
+            "invoiced_count": states.count("invoiced"),
+            "failed_count": states.count("declined") + len(errors),
+            "finished_at": fields.Datetime.now(),
+            "duration_ms": (self.duration_ms or 0) + int((time.monotonic() - started) * 1000),
+        })
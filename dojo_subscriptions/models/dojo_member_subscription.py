@@ -299,72 +299,130 @@ class DojoMemberSubscription(models.Model):
 
     # ── Daily cron ────────────────────────────────────────────────────────
     @api.model
-    def _cron_generate_invoices(self):
-        """Generate consolidated household invoices for all active subscriptions due today.
+    def _due_for_invoicing(self, today, subscription_ids=None):
+        """Return active subscriptions due on or before *today* that have not
+        been invoiced today yet, optionally restricted to *subscription_ids*.
 
-        Subscriptions sharing a billing partner+company are grouped and billed
-        on a single invoice.  Single-sub households fall through to
-        action_generate_invoice() for backward compatibility.
+        One anti-join against account.move covers both the per-subscription
+        M2o link and the consolidated-invoice rel table, so a restarted cron
+        skips everything an earlier (partial) run already billed.
         """
-        from collections import defaultdict
-        today = fields.Date.today()
-        due = self.search([
-            ("state", "=", "active"),
-            ("next_billing_date", "!=", False),
-            ("next_billing_date", "<=", today),
-        ])
-        # Idempotency: drop subs already invoiced today (handles cron restart).
-        filtered = self.env['dojo.member.subscription']
-        for sub in due:
-            already_m2o = self.env['account.move'].search_count([
-                ('subscription_id', '=', sub.id),
-                ('invoice_date', '=', today),
-                ('move_type', '=', 'out_invoice'),
-                ('state', '!=', 'cancel'),
-            ])
-            already_m2m = self.env['account.move'].search_count([
-                ('dojo_subscription_ids', 'in', [sub.id]),
-                ('invoice_date', '=', today),
-                ('move_type', '=', 'out_invoice'),
-                ('state', '!=', 'cancel'),
-            ])
-            if not already_m2o and not already_m2m:
-                filtered |= sub
-        # Group by (billing_partner_id, company_id) to consolidate households.
-        groups = defaultdict(lambda: self.env['dojo.member.subscription'])
-        for sub in filtered:
+        self.env["account.move"].flush_model(
+            ["subscription_id", "invoice_date", "move_type", "state"]
+        )
+        self.flush_model(["state", "next_billing_date"])
+        self.env.cr.execute(
+            """
+            SELECT s.id
+              FROM dojo_member_subscription s
+             WHERE s.state = 'active'
+               AND (%(ids)s::int[] IS NULL OR s.id = ANY(%(ids)s::int[]))
+               AND s.next_billing_date IS NOT NULL
+               AND s.next_billing_date <= %(today)s
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM account_move m
+                     WHERE m.subscription_id = s.id
+                       AND m.invoice_date = %(today)s
+                       AND m.move_type = 'out_invoice'
+                       AND m.state != 'cancel'
+               )
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM dojo_invoice_sub_rel r
+                      JOIN account_move m ON m.id = r.invoice_id
+                     WHERE r.subscription_id = s.id
+                       AND m.invoice_date = %(today)s
+                       AND m.move_type = 'out_invoice'
+                       AND m.state != 'cancel'
+               )
+             ORDER BY s.id
+            """,
+            {
+                "today": today,
+                "ids": list(subscription_ids) if subscription_ids is not None else None,
+            },
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _billing_partners(self):
+        """Batch form of _billing_partner(): return {subscription_id: res.partner}.
+
+        Subscriptions without a billing partner are left out.
+        """
+        # Touch the whole recordset once so members, households and guardians
+        # are prefetched in a few queries instead of per subscription.
+        self.mapped("household_id.primary_guardian_id.partner_id")
+        self.mapped("member_id.partner_id")
+        partners = {}
+        for sub in self:
             partner = sub._billing_partner()
+            if partner:
+                partners[sub.id] = partner
+        return partners
+
+    @api.model
+    def _group_for_invoicing(self, subs):
+        """Group *subs* by (billing partner, company) for household consolidation.
+
+        Returns a list of recordsets in a stable order (by lowest sub id).
+        """
+        partners = subs._billing_partners()
+        groups = {}
+        for sub in subs:
+            partner = partners.get(sub.id)
             if not partner:
                 _logger.warning(
                     'Dojo billing: no billing partner for subscription %s — skipped.', sub.id
                 )
                 continue
             key = (partner.id, (sub.company_id or self.env.company).id)
-            groups[key] |= sub
-        for _key, group_subs in groups.items():
-            if len(group_subs) == 1:
-                # Single sub — use per-subscription invoice (M2o path).
-                sub = group_subs
-                try:
-                    sub.action_generate_invoice()
-                    if sub.billing_failure_count:
-                        sub._reset_billing_failures()
-                except Exception as exc:
-                    sub._handle_billing_failure(exc)
-            else:
-                # Multiple subs share a billing partner — consolidated invoice.
-                try:
+            groups.setdefault(key, []).append(sub.id)
+        return [self.browse(ids) for ids in groups.values()]
+
+    @api.model
+    def _invoice_billing_group(self, group_subs, today):
+        """Invoice one billing group inside a savepoint and update dunning state.
+
+        Returns True when the group was invoiced.
+        """
+        try:
+            with self.env.cr.savepoint():
+                if len(group_subs) == 1:
+                    # Single sub — use per-subscription invoice (M2o path).
+                    group_subs.action_generate_invoice()
+                else:
+                    # Multiple subs share a billing partner — consolidated invoice.
                     self._generate_household_invoice(group_subs, today)
-                    for sub in group_subs:
-                        if sub.billing_failure_count:
-                            sub._reset_billing_failures()
-                except Exception as exc:
-                    _logger.error(
-                        'Dojo billing: failed to generate consolidated invoice for group: %s',
-                        exc, exc_info=True,
-                    )
-                    for sub in group_subs:
-                        sub._handle_billing_failure(exc)
+        except Exception as exc:
+            if len(group_subs) > 1:
+                _logger.error(
+                    'Dojo billing: failed to generate consolidated invoice for group: %s',
+                    exc, exc_info=True,
+                )
+            for sub in group_subs:
+                sub._handle_billing_failure(exc)
+            return False
+        for sub in group_subs:
+            if sub.billing_failure_count:
+                sub._reset_billing_failures()
+        return True
+
+    @api.model
+    def _cron_generate_invoices(self):
+        """Generate consolidated household invoices for all active subscriptions due today.
+
+        Subscriptions sharing a billing partner+company are grouped and billed
+        on a single invoice.  Single-sub households fall through to
+        action_generate_invoice() for backward compatibility.
+
+        The due groups are planned into a dojo.billing.run whose chunks are
+        processed (and committed) independently by a pool of worker crons;
+        see dojo_billing_run.py.  A run that dies half-way resumes where it
+        stopped because _due_for_invoicing() excludes subscriptions invoiced
+        today.
+        """
+        self.env["dojo.billing.run"]._start_run(fields.Date.today())
 
     # ── Dunning ───────────────────────────────────────────────────────────
     def _handle_billing_failure(self, exc):
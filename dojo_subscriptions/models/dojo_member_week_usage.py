@@ -0,0 +1,193 @@
+"""
+Materialized per-member, per-ISO-week count of registered class enrollments.
+
+dojo.member.sessions_used_this_week reads this table (a primary-key lookup)
+instead of aggregating enrollments joined to their sessions on every read.
+Rows are maintained incrementally from enrollment create/write/unlink and
+session start changes; _cron_reconcile() rebuilds a window of weeks from the
+enrollments to correct any drift.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+# Weeks (relative to the current one) rebuilt by the reconciliation job.
+_RECONCILE_WEEKS_BACK = 1
+_RECONCILE_WEEKS_AHEAD = 10
+# Rows older than this many weeks are purged by the reconciliation job.
+_RETENTION_WEEKS = 12
+
+
+def _week_start(dt):
+    """Monday of the ISO week containing datetime/date *dt*."""
+    day = dt.date() if hasattr(dt, "date") else dt
+    return day - timedelta(days=day.weekday())
+
+
+class DojoMemberWeekUsage(models.Model):
+    _name = "dojo.member.week.usage"
+    _description = "Member Weekly Session Usage"
+    _log_access = False
+
+    member_id = fields.Many2one("dojo.member", required=True, ondelete="cascade", readonly=True)
+    week_start = fields.Date(required=True, readonly=True, help="Monday of the ISO week.")
+    session_count = fields.Integer(readonly=True)
+
+    _dojo_member_week_usage_uniq = models.Constraint(
+        "unique(member_id, week_start)",
+        "Only one usage row per member and week is allowed.",
+    )
+
+    def init(self):
+        # Populate on first install; later updates are incremental.
+        self.env.cr.execute("SELECT 1 FROM dojo_member_week_usage LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild_window(*self._reconcile_window())
+
+    # ── Reads ────────────────────────────────────────────────────────────
+
+    @api.model
+    def _usage_for(self, member_ids, week_start):
+        """Return {member_id: registered sessions} for the week starting *week_start*."""
+        if not member_ids:
+            return {}
+        self.env.cr.execute(
+            "SELECT member_id, GREATEST(session_count, 0) FROM dojo_member_week_usage "
+            "WHERE week_start = %s AND member_id IN %s",
+            [week_start, tuple(member_ids)],
+        )
+        return dict(self.env.cr.fetchall())
+
+    # ── Incremental maintenance ──────────────────────────────────────────
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Add ``{(member_id, week_start): delta}`` to the counters in one upsert."""
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        values = []
+        params = []
+        for (member_id, week_start), delta in deltas.items():
+            values.append("(%s, %s, %s)")
+            params += [member_id, week_start, delta]
+        self.env.cr.execute(
+            "INSERT INTO dojo_member_week_usage AS u (member_id, week_start, session_count) "
+            "VALUES %s "
+            "ON CONFLICT (member_id, week_start) "
+            "DO UPDATE SET session_count = u.session_count + EXCLUDED.session_count"
+            % ", ".join(values),
+            params,
+        )
+        self.invalidate_model(["session_count"])
+
+    @api.model
+    def _enrollment_keys(self, enrollments):
+        """Counter keys of the registered *enrollments*: {(member_id, week_start): n}."""
+        keys = defaultdict(int)
+        for enr in enrollments:
+            if enr.status == "registered" and enr.member_id and enr.session_id.start_datetime:
+                keys[(enr.member_id.id, _week_start(enr.session_id.start_datetime))] += 1
+        return keys
+
+    # ── Reconciliation ───────────────────────────────────────────────────
+
+    @api.model
+    def _reconcile_window(self):
+        this_week = _week_start(fields.Date.today())
+        return (
+            this_week - timedelta(weeks=_RECONCILE_WEEKS_BACK),
+            this_week + timedelta(weeks=_RECONCILE_WEEKS_AHEAD),
+        )
+
+    @api.model
+    def _rebuild_window(self, date_from, date_to):
+        """Recompute the counters of weeks in [date_from, date_to) from enrollments."""
+        self.env["dojo.class.enrollment"].flush_model(["member_id", "session_id", "status"])
+        self.env["dojo.class.session"].flush_model(["start_datetime"])
+        self.env.cr.execute(
+            "DELETE FROM dojo_member_week_usage WHERE week_start >= %s AND week_start < %s",
+            [date_from, date_to],
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO dojo_member_week_usage (member_id, week_start, session_count)
+                 SELECT e.member_id, date_trunc('week', s.start_datetime)::date, COUNT(*)
+                   FROM dojo_class_enrollment e
+                   JOIN dojo_class_session s ON s.id = e.session_id
+                  WHERE e.status = 'registered'
+                    AND s.start_datetime >= %s
+                    AND s.start_datetime < %s
+               GROUP BY 1, 2
+            ON CONFLICT (member_id, week_start)
+            DO UPDATE SET session_count = EXCLUDED.session_count
+            """,
+            [date_from, date_to],
+        )
+        self.invalidate_model(["session_count"])
+
+    @api.model
+    def _cron_reconcile(self):
+        """Daily job — rebuild recent/upcoming weeks and purge old rows."""
+        date_from, date_to = self._reconcile_window()
+        self._rebuild_window(date_from, date_to)
+        self.env.cr.execute(
+            "DELETE FROM dojo_member_week_usage WHERE week_start < %s",
+            [_week_start(fields.Date.today()) - timedelta(weeks=_RETENTION_WEEKS)],
+        )
+
+
+class DojoClassEnrollmentWeekUsage(models.Model):
+    _inherit = "dojo.class.enrollment"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        Usage = self.env["dojo.member.week.usage"]
+        Usage._apply_deltas(Usage._enrollment_keys(records))
+        return records
+
+    def write(self, vals):
+        if not {"status", "member_id", "session_id"} & set(vals):
+            return super().write(vals)
+        Usage = self.env["dojo.member.week.usage"]
+        before = Usage._enrollment_keys(self)
+        result = super().write(vals)
+        deltas = Usage._enrollment_keys(self)
+        for key, count in before.items():
+            deltas[key] -= count
+        Usage._apply_deltas(deltas)
+        return result
+
+    def unlink(self):
+        Usage = self.env["dojo.member.week.usage"]
+        deltas = {key: -count for key, count in Usage._enrollment_keys(self).items()}
+        result = super().unlink()
+        Usage._apply_deltas(deltas)
+        return result
+
+
+class DojoClassSessionWeekUsage(models.Model):
+    _inherit = "dojo.class.session"
+
+    def write(self, vals):
+        if "start_datetime" not in vals:
+            return super().write(vals)
+        Usage = self.env["dojo.member.week.usage"]
+        before = Usage._enrollment_keys(self.enrollment_ids)
+        result = super().write(vals)
+        deltas = Usage._enrollment_keys(self.enrollment_ids)
+        for key, count in before.items():
+            deltas[key] -= count
+        Usage._apply_deltas(deltas)
+        return result
+
+    def unlink(self):
+        # Enrollments go with the session through ON DELETE CASCADE, bypassing
+        # the enrollment unlink() above.
+        Usage = self.env["dojo.member.week.usage"]
+        deltas = {key: -count for key, count in Usage._enrollment_keys(self.enrollment_ids).items()}
+        result = super().unlink()
+        Usage._apply_deltas(deltas)
+        return result
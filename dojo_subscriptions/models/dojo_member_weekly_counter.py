@@ -45,26 +45,14 @@ class DojoMemberWeeklyCounter(models.Model):
                 member.sessions_allowed_per_week = 0
 
     # No @api.depends — recomputed fresh every time the field is read (no triggers
-    # needed; enrollment records in dojo.class.enrollment are counted via search).
+    # needed; the count is a primary-key lookup in dojo.member.week.usage, which
+    # is maintained incrementally from enrollment writes).
     @api.depends()
     def _compute_sessions_used_this_week(self):
         if not self.ids:
             return
         today = date.today()
         week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
-        week_start_str = "%s 00:00:00" % week_start
-        week_end_str = "%s 23:59:59" % week_end
-        groups = self.env['dojo.class.enrollment'].read_group(
-            [
-                ('member_id', 'in', self.ids),
-                ('status', '=', 'registered'),
-                ('session_id.start_datetime', '>=', week_start_str),
-                ('session_id.start_datetime', '<=', week_end_str),
-            ],
-            fields=['member_id'],
-            groupby=['member_id'],
-        )
-        counts = {g['member_id'][0]: g['member_id_count'] for g in groups}
+        counts = self.env["dojo.member.week.usage"].sudo()._usage_for(self.ids, week_start)
         for member in self:
             member.sessions_used_this_week = counts.get(member.id, 0)